@@ -0,0 +1,380 @@
+"""
+Approximate nearest-neighbour search (IVF) for large catalogs.
+
+An exact cosine scan touches every row of the TF-IDF matrix, which is fine
+for the 5k Kaggle catalog but not for hundreds of thousands of titles.
+IVFIndex partitions the rows with spherical k-means; a query is scored
+against the partition centroids first, then exactly against the rows of the
+nprobe closest partitions only. Centroids are kept sparse (their
+CENTROID_TERMS largest weights), so the index is small and works directly
+on the same L2-normalised rows as the exact path in similarity.
+
+The recommender picks the backend with MOVIE_BUDDY_SEARCH=exact|ivf (see
+recommender.SEARCH_BACKEND). Recall and latency against the exact path:
+
+    python ann.py                          # on the current catalog
+    python ann.py --synthetic 1000000      # on a synthetic 1M-title catalog
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import similarity
+
+# Centroid weights kept per partition
+CENTROID_TERMS = 256
+# Partitions scored exactly per query
+NPROBE = 16
+# Spherical k-means settings
+KMEANS_ITERATIONS = 8
+TRAIN_ROWS_PER_LIST = 32
+
+
+def default_n_lists(n_rows):
+    """Number of partitions for a catalog of n_rows (about 4 * sqrt(N))."""
+    return int(max(1, min(n_rows // 4, 4 * np.sqrt(n_rows))))
+
+
+def _normalize(matrix):
+    from sklearn.preprocessing import normalize
+
+    return normalize(matrix, norm="l2", copy=False).tocsr()
+
+
+def _prune_rows(matrix, terms):
+    """Keep the `terms` largest entries of every row of a CSR matrix."""
+    from scipy.sparse import csr_matrix
+
+    data, indices, indptr = [], [], [0]
+    for row in range(matrix.shape[0]):
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        values = matrix.data[start:end]
+        cols = matrix.indices[start:end]
+        if len(values) > terms:
+            keep = np.argpartition(-values, terms - 1)[:terms]
+            values, cols = values[keep], cols[keep]
+        data.append(values)
+        indices.append(cols)
+        indptr.append(indptr[-1] + len(values))
+    return csr_matrix(
+        (np.concatenate(data).astype(np.float32), np.concatenate(indices).astype(np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=matrix.shape,
+    )
+
+
+def assign(matrix, centroids, block_bytes=similarity.DEFAULT_BLOCK_BYTES):
+    """
+    Closest centroid of every row
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): L2-normalised rows
+    centroids (scipy.sparse.csr_matrix): L2-normalised centroid rows
+
+    Returns:
+    numpy.ndarray: int32 centroid position per row
+    """
+    centroids_t = centroids.T.tocsc()
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    step = similarity.block_rows(centroids.shape[0], block_bytes)
+    for start in range(0, matrix.shape[0], step):
+        sims = (matrix[start:start + step] @ centroids_t).toarray()
+        labels[start:start + step] = sims.argmax(axis=1)
+    return labels
+
+
+def spherical_kmeans(matrix, n_lists, iterations=KMEANS_ITERATIONS, terms=CENTROID_TERMS, seed=0):
+    """
+    Cluster L2-normalised sparse rows by cosine similarity
+
+    Returns:
+    scipy.sparse.csr_matrix: n_lists sparse, L2-normalised centroids
+    """
+    from scipy.sparse import csr_matrix
+
+    rng = np.random.default_rng(seed)
+    nonempty = np.flatnonzero(np.diff(matrix.indptr))
+    if len(nonempty) == 0:
+        nonempty = np.arange(matrix.shape[0])
+    n_lists = min(n_lists, len(nonempty))
+    centroids = _prune_rows(matrix[rng.choice(nonempty, n_lists, replace=False)], terms)
+    for _ in range(iterations):
+        labels = assign(matrix, centroids)
+        membership = csr_matrix(
+            (np.ones(len(labels), dtype=np.float32), (labels, np.arange(len(labels)))),
+            shape=(n_lists, matrix.shape[0]),
+        )
+        sums = (membership @ matrix).tocsr()
+        # Reseed partitions that lost all their rows
+        empty = np.flatnonzero(np.diff(sums.indptr) == 0)
+        if len(empty):
+            sums = sums.tolil()
+            sums[empty] = matrix[rng.choice(nonempty, len(empty), replace=False)]
+            sums = sums.tocsr()
+        centroids = _normalize(_prune_rows(sums, terms))
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file index over the rows of a normalised feature matrix
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): L2-normalised rows being searched
+    centroids (scipy.sparse.csr_matrix): One sparse centroid per partition
+    offsets (numpy.ndarray): Partition p holds rows[offsets[p]:offsets[p + 1]]
+    rows (numpy.ndarray): Row positions grouped by partition
+    nprobe (int): Partitions searched per query
+    """
+
+    def __init__(self, matrix, centroids, offsets, rows, nprobe=NPROBE):
+        self.matrix = matrix
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.nprobe = nprobe
+
+    @classmethod
+    def build(cls, matrix, n_lists=None, nprobe=NPROBE, seed=0):
+        """
+        Partition the rows of matrix with spherical k-means
+
+        The centroids are trained on a sample of TRAIN_ROWS_PER_LIST rows per
+        partition, then every row is assigned to its closest centroid.
+        """
+        n_lists = n_lists or default_n_lists(matrix.shape[0])
+        rng = np.random.default_rng(seed)
+        n_train = min(matrix.shape[0], n_lists * TRAIN_ROWS_PER_LIST)
+        sample = np.sort(rng.choice(matrix.shape[0], n_train, replace=False))
+        centroids = spherical_kmeans(matrix[sample], n_lists, seed=seed)
+        labels = assign(matrix, centroids)
+        rows = np.argsort(labels, kind="stable").astype(np.int32)
+        counts = np.bincount(labels, minlength=centroids.shape[0])
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return cls(matrix, centroids, offsets, rows, nprobe=nprobe)
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    def arrays(self):
+        """Arrays to persist alongside the model (see from_arrays)."""
+        return {
+            "centroid_data": self.centroids.data,
+            "centroid_indices": self.centroids.indices,
+            "centroid_indptr": self.centroids.indptr,
+            "offsets": self.offsets,
+            "rows": self.rows,
+        }
+
+    @classmethod
+    def from_arrays(cls, matrix, arrays, nprobe=NPROBE):
+        """Rebuild an index from arrays() output (e.g. memory-mapped .npy files)."""
+        from scipy.sparse import csr_matrix
+
+        n_lists = len(arrays["offsets"]) - 1
+        centroids = csr_matrix(
+            (arrays["centroid_data"], arrays["centroid_indices"], arrays["centroid_indptr"]),
+            shape=(n_lists, matrix.shape[1]),
+            copy=False,
+        )
+        return cls(matrix, centroids, arrays["offsets"], arrays["rows"], nprobe=nprobe)
+
+    def _dense(self, query):
+        # Sparse-matrix @ dense-vector is much cheaper than a sparse @ sparse product
+        vector = np.zeros(self.matrix.shape[1], dtype=np.float32)
+        vector[query.indices] = query.data
+        return vector
+
+    def _candidates(self, vector, nprobe):
+        scores = self.centroids @ vector
+        nprobe = min(nprobe, self.n_lists)
+        lists = np.argpartition(-scores, nprobe - 1)[:nprobe]
+        return np.concatenate([self.rows[self.offsets[p]:self.offsets[p + 1]] for p in lists])
+
+    def candidates(self, query, nprobe=None):
+        """Row positions in the nprobe partitions closest to a (1 x terms) or dense query."""
+        vector = query if isinstance(query, np.ndarray) else self._dense(query)
+        return self._candidates(vector, nprobe or self.nprobe)
+
+    def search(self, query, k, nprobe=None, exclude=None):
+        """
+        Approximate top-k rows for a sparse (1 x terms) query vector
+
+        Parameters:
+        query (scipy.sparse.csr_matrix): L2-normalised query row
+        k (int): Number of results wanted
+        nprobe (int): Partitions to search (default: self.nprobe)
+        exclude (int or array-like): Row positions to leave out, e.g. the query's own row
+
+        Returns:
+        tuple: (indices, scores) as numpy arrays, best first
+        """
+        return self.search_vector(self._dense(query), k, nprobe=nprobe, exclude=exclude)
+
+    def search_vector(self, vector, k, nprobe=None, exclude=None):
+        """Same as search() for a dense float32 query vector (e.g. several seeds combined)."""
+        candidates = self._candidates(vector, nprobe or self.nprobe)
+        if exclude is not None:
+            candidates = candidates[~np.isin(candidates, exclude)]
+        scores = self.matrix[candidates] @ vector
+        best = similarity.top_k(scores, k)
+        return candidates[best], scores[best]
+
+    def search_row(self, row, k, nprobe=None):
+        """Approximate top-k neighbours of an indexed row, excluding the row itself."""
+        return self.search(self.matrix[row], k, nprobe=nprobe, exclude=row)
+
+    def top_k_all(self, k, nprobe=None, block_bytes=similarity.DEFAULT_BLOCK_BYTES):
+        """
+        Approximate top-k neighbour table for every row
+
+        Gives the same results as search_row() for each row, but batched:
+        every row first picks its nprobe partitions, then each partition is
+        scored in one product against all the rows that probe it, and the
+        results are merged into a running top-k per row.
+
+        Returns:
+        tuple: (neighbors int32 [N, k], scores float32 [N, k]), -1 / -inf padded
+        """
+        n = self.matrix.shape[0]
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        neighbors = np.full((n, k), -1, dtype=np.int32)
+        scores = np.full((n, k), -np.inf, dtype=np.float32)
+        if k == 0:
+            return neighbors, scores
+
+        centroids_t = self.centroids.T.tocsc()
+        probes = np.empty((n, nprobe), dtype=np.int32)
+        step = similarity.block_rows(self.n_lists, block_bytes)
+        for start in range(0, n, step):
+            sims = (self.matrix[start:start + step] @ centroids_t).toarray()
+            probes[start:start + step] = np.argpartition(-sims, nprobe - 1, axis=1)[:, :nprobe]
+        # Invert: the rows probing each partition, grouped by partition
+        order = np.argsort(probes.ravel(), kind="stable")
+        probing = (order // nprobe).astype(np.int32)
+        probe_offsets = np.concatenate(([0], np.cumsum(np.bincount(probes.ravel(), minlength=self.n_lists))))
+
+        for part in range(self.n_lists):
+            members = self.rows[self.offsets[part]:self.offsets[part + 1]]
+            queries = probing[probe_offsets[part]:probe_offsets[part + 1]]
+            if len(members) == 0 or len(queries) == 0:
+                continue
+            members_t = self.matrix[members].T.tocsc()
+            step = similarity.block_rows(len(members) + k, block_bytes)
+            for start in range(0, len(queries), step):
+                block = queries[start:start + step]
+                sims = np.asarray((self.matrix[block] @ members_t).todense(), dtype=np.float32)
+                sims[members[None, :] == block[:, None]] = -np.inf
+                merged = np.concatenate([neighbors[block], np.broadcast_to(members, sims.shape)], axis=1)
+                merged_scores = np.concatenate([scores[block], sims], axis=1)
+                best = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+                neighbors[block] = np.take_along_axis(merged, best, axis=1)
+                scores[block] = np.take_along_axis(merged_scores, best, axis=1)
+
+        order = np.argsort(-scores, axis=1, kind="stable")
+        neighbors = np.take_along_axis(neighbors, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        neighbors[scores == -np.inf] = -1
+        return neighbors, scores
+
+    def nbytes(self):
+        """Size of the index structures (the searched matrix is not counted)."""
+        return int(similarity.sparse_nbytes(self.centroids) + self.offsets.nbytes + self.rows.nbytes)
+
+
+# --- Benchmark ---
+def synthetic_matrix(n_rows, n_terms=50000, n_topics=2000, terms_per_row=30, seed=0):
+    """
+    Random TF-IDF-like rows with topic structure, for benchmarking at scale
+
+    Every row draws most of its terms from one topic's small vocabulary and
+    the rest from a Zipf-distributed background vocabulary.
+    """
+    from scipy.sparse import csr_matrix
+
+    rng = np.random.default_rng(seed)
+    topic_terms = rng.integers(0, n_terms, size=(n_topics, 60))
+    topics = rng.integers(0, n_topics, size=n_rows)
+    n_topic = int(terms_per_row * 0.6)
+    n_background = terms_per_row - n_topic
+    topical = topic_terms[topics[:, None], rng.integers(0, 60, size=(n_rows, n_topic))]
+    background = np.minimum(rng.zipf(1.3, size=(n_rows, n_background)) - 1, n_terms - 1)
+    cols = np.concatenate([topical, background], axis=1).ravel()
+    rows = np.repeat(np.arange(n_rows), terms_per_row)
+    values = rng.random(len(cols), dtype=np.float32) + 0.1
+    matrix = csr_matrix((values, (rows, cols)), shape=(n_rows, n_terms), dtype=np.float32)
+    matrix.sum_duplicates()
+    # Down-weight common terms as TF-IDF does
+    df = np.bincount(matrix.indices, minlength=n_terms)
+    idf = np.log((1 + n_rows) / (1 + df)).astype(np.float32) + 1
+    matrix.data *= idf[matrix.indices]
+    return _normalize(matrix)
+
+
+def benchmark(matrix, k=10, queries=200, nprobes=(4, 8, 16, 32), n_lists=None, seed=0):
+    """
+    Recall@k and per-query latency of the IVF index against the exact scan
+
+    Returns:
+    list: One dict per configuration with recall, p50_ms and p99_ms
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(matrix.shape[0], min(queries, matrix.shape[0]), replace=False)
+
+    def timed(fn):
+        latencies, results = [], []
+        for row in rows[:20]:
+            fn(row)  # warm up caches before timing
+        for row in rows:
+            start = time.perf_counter()
+            results.append(fn(row))
+            latencies.append((time.perf_counter() - start) * 1000)
+        return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+    exact, p50, p99 = timed(lambda row: similarity.top_k_for_row(matrix, row, k)[0])
+    report = [{"backend": "exact", "recall": 1.0, "p50_ms": p50, "p99_ms": p99}]
+
+    start = time.perf_counter()
+    index = IVFIndex.build(matrix, n_lists=n_lists, seed=seed)
+    build_s = time.perf_counter() - start
+    for nprobe in nprobes:
+        approx, p50, p99 = timed(lambda row: index.search_row(row, k, nprobe=nprobe)[0])
+        hits = sum(len(np.intersect1d(a, e)) for a, e in zip(approx, exact))
+        wanted = sum(len(e) for e in exact)
+        report.append({
+            "backend": f"ivf nlist={index.n_lists} nprobe={nprobe}",
+            "recall": hits / max(wanted, 1),
+            "p50_ms": p50,
+            "p99_ms": p99,
+            "build_s": build_s,
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recall@K and latency of IVF search versus the exact scan")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="benchmark a synthetic catalog of N titles")
+    parser.add_argument("--k", type=int, default=10, help="neighbours per query")
+    parser.add_argument("--queries", type=int, default=200, help="number of query titles")
+    parser.add_argument("--nlist", type=int, help="number of partitions (default: about 4 * sqrt(N))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32], help="partitions searched per query")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        matrix = synthetic_matrix(args.synthetic)
+    else:
+        import recommender
+
+        matrix = recommender.get_model().tfidf
+    print(f"{matrix.shape[0]:,} titles, {matrix.nnz:,} non-zeros, k={args.k}, {args.queries} queries")
+    for result in benchmark(matrix, k=args.k, queries=args.queries, nprobes=args.nprobe, n_lists=args.nlist):
+        build = f"  (built in {result['build_s']:.1f}s)" if "build_s" in result else ""
+        print(f"{result['backend']:<28} recall@{args.k}={result['recall']:.3f}  "
+              f"p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms{build}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
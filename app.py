@@ -1,6 +1,7 @@
 import streamlit as st
-import requests
-from recommender import get_recommendations
+import metrics
+import startup
+from assets import stylesheet_links
 import base64
 import random
 import time
@@ -13,394 +14,47 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# --- Timing of this rerun (shown in the sidebar debug panel when metrics are enabled) ---
+metrics.begin_trace()
+rerun_started = time.perf_counter()
+
 # --- Session state initialization (put this at the top, after imports) ---
 if "search_movie" not in st.session_state:
     st.session_state["search_movie"] = ""
 if "trigger_search" not in st.session_state:
     st.session_state["trigger_search"] = False
 
+# --- Recommender model: one read-only instance per process, shared by every session ---
+# Imported and loaded in a background thread (see startup.py), so the shell
+# below renders straight away; model-backed parts appear once it is ready
+@st.cache_resource(show_spinner=False)
+def model_loading():
+    return startup.BackgroundLoad(startup.load_recommender)
+
+loading = model_loading()
+if loading.ready:
+    try:
+        shared_model = loading.result()
+    except Exception:
+        model_loading.clear()  # retry the load on the next run
+        raise
+    import response_cache
+    from recommender import field_weights, filter_options, resolve_title, suggest_titles
+    from tmdb_api import fetch_posters, is_placeholder
+    # Rebuilt models are swapped in by a background thread; this rerun keeps the current one
+    shared_model.reload_if_changed()
+
 # --- Enhanced CSS with animations and better interactivity ---
 def add_bg_and_styling():
-    st.markdown("""
-    <link href="https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;800&display=swap" rel="stylesheet">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.2/css/all.min.css">
-    <style>
-        html, body, .stApp {
-            font-family: 'Poppins', sans-serif !important;
-            background: linear-gradient(135deg, #0f0f23 0%, #1a1a2e 50%, #16213e 100%) !important;
-            color: #f8f9fa;
-            overflow-x: hidden;
-        }
-        
-        /* Animated background particles */
-        .background-animation {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            pointer-events: none;
-            z-index: -1;
-            opacity: 0.1;
-        }
-        
-        /* Main title with enhanced animation */
-        .main-title {
-            font-size: 3rem;
-            font-weight: 800;
-            background: linear-gradient(45deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4);
-            background-size: 400% 400%;
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            text-align: center;
-            margin: 1.2rem 0 0.7rem 0;
-            animation: gradientShift 3s ease-in-out infinite;
-            text-shadow: 0 0 18px rgba(255, 107, 107, 0.2);
-            letter-spacing: 1.2px;
-        }
-        
-        @keyframes gradientShift {
-            0%, 100% { background-position: 0% 50%; }
-            50% { background-position: 100% 50%; }
-        }
-        
-        /* Floating animation for subtitle */
-        .subtitle {
-            color: #b8c6db;
-            font-size: 1.1rem;
-            text-align: center;
-            margin-bottom: 1.2rem;
-            animation: float 3s ease-in-out infinite;
-            font-weight: 300;
-        }
-        
-        @keyframes float {
-            0%, 100% { transform: translateY(0px); }
-            50% { transform: translateY(-10px); }
-        }
-        
-        /* Search container with glassmorphism */
-        .search-container {
-            background: rgba(255, 255, 255, 0.08);
-            backdrop-filter: blur(14px);
-            border: 1px solid rgba(255, 255, 255, 0.13);
-            border-radius: 16px;
-            padding: 1.2rem 1rem 1.2rem 1rem;
-            margin: 1.2rem auto 0.7rem auto;
-            max-width: 700px;
-            box-shadow: 0 4px 18px rgba(0, 0, 0, 0.13);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .search-container::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.07), transparent);
-            animation: shimmer 3s infinite;
-        }
-        
-        @keyframes shimmer {
-            0% { left: -100%; }
-            100% { left: 100%; }
-        }
-        
-        /* Enhanced input styling */
-        .stTextInput > div > div > input {
-            background: rgba(255, 255, 255, 0.04) !important;
-            border: 2px solid rgba(255, 107, 107, 0.5) !important;
-            color: #fff !important;
-            border-radius: 30px !important;
-            padding: 0.7rem 2rem 0.7rem 2rem !important;
-            font-size: 1.05rem !important;
-            transition: all 0.2s ease !important;
-            backdrop-filter: blur(7px) !important;
-        }
-        
-        .stTextInput > div > div > input:focus {
-            border: 2px solid #ff6b6b !important;
-            box-shadow: 0 0 10px rgba(255, 107, 107, 0.2) !important;
-            background: rgba(255, 255, 255, 0.07) !important;
-        }
-        
-        .search-icon {
-            position: absolute;
-            left: 2rem;
-            top: 50%;
-            transform: translateY(-50%);
-            color: #ff6b6b;
-            font-size: 1.5rem;
-            z-index: 10;
-            animation: pulse 2s infinite;
-        }
-        
-        @keyframes pulse {
-            0%, 100% { opacity: 0.7; }
-            50% { opacity: 1; }
-        }
-        
-        /* Button with hover effects */
-        .stButton > button {
-            background: linear-gradient(45deg, #ff6b6b, #4ecdc4) !important;
-            color: white !important;
-            font-weight: 600 !important;
-            border: none !important;
-            padding: 0.7rem 1.5rem !important;
-            border-radius: 30px !important;
-            font-size: 1.05rem !important;
-            transition: all 0.2s ease !important;
-            box-shadow: 0 4px 12px rgba(255, 107, 107, 0.18) !important;
-            position: relative !important;
-            overflow: hidden !important;
-            text-transform: uppercase !important;
-            letter-spacing: 0.7px !important;
-        }
-        
-        .stButton > button:hover {
-            transform: translateY(-2px) scale(1.03) !important;
-            box-shadow: 0 8px 18px rgba(255, 107, 107, 0.25) !important;
-        }
-        
-        .stButton > button::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
-            transition: left 0.5s;
-        }
-        
-        .stButton > button:hover::before {
-            left: 100%;
-        }
-        
-        /* Sidebar styling */
-        .sidebar-content {
-            background: rgba(255, 255, 255, 0.04);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255, 255, 255, 0.07);
-            border-radius: 10px;
-            padding: 1rem;
-            margin: 0.7rem 0;
-            transition: all 0.2s ease;
-        }
-        
-        .sidebar-content:hover {
-            background: rgba(255, 255, 255, 0.09);
-            transform: translateY(-1px);
-        }
-        
-        /* Enhanced sample movie buttons */
-        .stButton > button {
-            background: linear-gradient(135deg, rgba(255, 107, 107, 0.15), rgba(78, 205, 196, 0.15)) !important;
-            color: #e2e8f0 !important;
-            font-weight: 500 !important;
-            border: 1px solid rgba(255, 107, 107, 0.3) !important;
-            border-radius: 12px !important;
-            padding: 0.8rem 1rem !important;
-            transition: all 0.3s ease !important;
-            font-size: 0.9rem !important;
-            backdrop-filter: blur(10px) !important;
-        }
-        
-        .stButton > button:hover {
-            background: linear-gradient(135deg, rgba(255, 107, 107, 0.25), rgba(78, 205, 196, 0.25)) !important;
-            border-color: rgba(255, 107, 107, 0.6) !important;
-            transform: translateY(-2px) !important;
-            box-shadow: 0 8px 25px rgba(255, 107, 107, 0.2) !important;
-        }
-        
-        /* Main search button styling */
-        .stButton[data-testid="find_similar_btn"] > button {
-            background: linear-gradient(45deg, #ff6b6b, #4ecdc4) !important;
-            color: white !important;
-            font-weight: 600 !important;
-            border: none !important;
-            padding: 1.2rem 2.5rem !important;
-            border-radius: 50px !important;
-            font-size: 1.2rem !important;
-            transition: all 0.3s ease !important;
-            box-shadow: 0 10px 30px rgba(255, 107, 107, 0.3) !important;
-            text-transform: uppercase !important;
-            letter-spacing: 1px !important;
-        }
-        
-        .stButton[data-testid="find_similar_btn"] > button:hover {
-            transform: translateY(-3px) scale(1.05) !important;
-            box-shadow: 0 15px 40px rgba(255, 107, 107, 0.5) !important;
-        }
-        
-        /* Movie cards with enhanced styling */
-        .movie-card {
-            background: rgba(255, 255, 255, 0.04);
-            backdrop-filter: blur(8px);
-            border: 1px solid rgba(255, 255, 255, 0.07);
-            border-radius: 12px;
-            padding: 1rem 1.2rem;
-            margin: 0.7rem 0;
-            transition: all 0.2s ease;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .movie-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            right: 0;
-            height: 3px;
-            background: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1);
-            transform: translateX(-100%);
-            transition: transform 0.5s ease;
-        }
-        
-        .movie-card:hover {
-            transform: translateY(-3px) scale(1.01);
-            box-shadow: 0 8px 18px rgba(0, 0, 0, 0.13);
-            background: rgba(255, 255, 255, 0.08);
-        }
-        
-        .movie-card:hover::before {
-            transform: translateX(0);
-        }
-        
-        .movie-title {
-            color: #ff6b6b;
-            font-size: 1.1rem;
-            font-weight: 700;
-            margin-bottom: 0.5rem;
-            display: flex;
-            align-items: center;
-            gap: 0.4rem;
-        }
-        
-        .movie-overview {
-            color: #e2e8f0;
-            font-size: 0.97rem;
-            line-height: 1.5;
-            opacity: 0.92;
-            margin-bottom: 0.2rem;
-        }
-        
-        /* Loading animation */
-        .loading-container {
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            padding: 1.2rem;
-        }
-        
-        .loading-spinner {
-            width: 50px;
-            height: 50px;
-            border: 3px solid rgba(255, 107, 107, 0.3);
-            border-top: 3px solid #ff6b6b;
-            border-radius: 50%;
-            animation: spin 1s linear infinite;
-        }
-        
-        @keyframes spin {
-            0% { transform: rotate(0deg); }
-            100% { transform: rotate(360deg); }
-        }
-        
-        /* Success message styling */
-        .success-message {
-            background: rgba(76, 175, 80, 0.13);
-            border: 1px solid rgba(76, 175, 80, 0.22);
-            border-radius: 8px;
-            padding: 0.7rem 1rem;
-            margin: 0.7rem 0;
-            text-align: center;
-            font-weight: 500;
-        }
-        
-        /* Footer enhancement */
-        .footer {
-            text-align: center;
-            color: #94a3b8;
-            font-size: 0.95rem;
-            margin-top: 1.2rem;
-            padding: 1.2rem 0 0.5rem 0;
-            background: rgba(255, 255, 255, 0.01);
-            border-top: 1px solid rgba(255, 255, 255, 0.07);
-        }
-        
-        /* Responsive adjustments */
-        @media (max-width: 768px) {
-            .main-title {
-                font-size: 1.7rem;
-            }
-            .search-container {
-                padding: 0.7rem 0.5rem;
-                margin: 0.7rem;
-            }
-            .stTextInput > div > div > input {
-                padding: 0.5rem 1.2rem 0.5rem 1.2rem !important;
-                font-size: 0.95rem !important;
-            }
-        }
-        
-        /* Hide Streamlit branding */
-        .stApp > header {
-            background-color: transparent;
-        }
-        
-        .stApp > div > div > div > div > div > section > div {
-            padding-top: 1rem;
-        }
-        
-        /* Custom scrollbar */
-        ::-webkit-scrollbar {
-            width: 8px;
-        }
-        
-        ::-webkit-scrollbar-track {
-            background: rgba(255, 255, 255, 0.1);
-        }
-        
-        ::-webkit-scrollbar-thumb {
-            background: rgba(255, 107, 107, 0.5);
-            border-radius: 4px;
-        }
-        
-        ::-webkit-scrollbar-thumb:hover {
-            background: rgba(255, 107, 107, 0.7);
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(stylesheet_links(), unsafe_allow_html=True)
 
 add_bg_and_styling()
 
 # --- Animated background particles ---
 st.markdown("""
-<div class="background-animation">
-    <svg width="100%" height="100%" xmlns="http://www.w3.org/2000/svg">
-        <defs>
-            <pattern id="star" viewBox="0 0 20 20" width="20" height="20" patternUnits="userSpaceOnUse">
-                <circle cx="10" cy="10" r="1" fill="#ff6b6b" opacity="0.3">
-                    <animate attributeName="opacity" values="0.3;1;0.3" dur="3s" repeatCount="indefinite"/>
-                </circle>
-            </pattern>
-        </defs>
-        <rect width="100%" height="100%" fill="url(#star)"/>
-    </svg>
-</div>
+<div class="background-animation"></div>
 """, unsafe_allow_html=True)
 
-# --- Utility: Generate a placeholder poster image ---
-def placeholder_poster(movie_title):
-    color = "%06x" % random.randint(0, 0xFFFFFF)
-    return f"https://via.placeholder.com/300x450/{color}/FFFFFF?text={movie_title.replace(' ', '+')}"
-
 # --- API key handling ---
 if 'TMDB_API_KEY' not in st.session_state:
     try:
@@ -408,26 +62,6 @@ if 'TMDB_API_KEY' not in st.session_state:
     except Exception:
         st.session_state.TMDB_API_KEY = None
 
-# --- Fetch movie poster with error handling ---
-def fetch_poster(movie_title):
-    """Fetch poster from TMDb or return a placeholder."""
-    API_KEY = st.session_state.get('TMDB_API_KEY')
-    if not API_KEY or API_KEY == "your_tmdb_api_key_here":
-        return placeholder_poster(movie_title)
-    try:
-        url = f"https://api.themoviedb.org/3/search/movie?api_key={API_KEY}&query={movie_title}"
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        if 'success' in data and data['success'] is False:
-            return placeholder_poster(movie_title)
-        if 'results' in data and data['results']:
-            poster_path = data['results'][0].get('poster_path', '')
-            if poster_path:
-                return f"https://image.tmdb.org/t/p/w500{poster_path}"
-        return placeholder_poster(movie_title)
-    except Exception:
-        return placeholder_poster(movie_title)
-
 # --- Show API warning if needed ---
 if not st.session_state.TMDB_API_KEY or st.session_state.TMDB_API_KEY == "your_tmdb_api_key_here":
     st.info("💡 **Pro Tip:** Set up your TMDb API key for movie posters! [Go to API Setup](./3_API_Setup)")
@@ -573,132 +207,42 @@ with st.sidebar:
                     st.session_state.trigger_search = True
                     st.rerun()
 
+    # Per-field weights and result filters need the model
+    weights, filters = {}, {}
+    if loading.ready:
+        # Per-field weights (only for models built with the multi-field features)
+        weights = field_weights()
+        if weights:
+            with st.expander("🎛️ Tune recommendations"):
+                st.caption("How much each field counts when comparing movies")
+                for field, default in weights.items():
+                    weights[field] = st.slider(field.title(), 0.0, 1.0, default, 0.05, key=f"weight_{field}")
+
+        # Result filters; settings left at their full range are not applied
+        options = filter_options()
+        filters = {}
+        with st.expander("🔎 Filter results"):
+            if options["year"][0] < options["year"][1]:
+                years = st.slider("Release year", *options["year"], value=options["year"], key="filter_year")
+                if years != options["year"]:
+                    filters["year"] = years
+            if options["runtime"][0] < options["runtime"][1]:
+                runtime = st.slider("Runtime (minutes)", *options["runtime"], value=options["runtime"], key="filter_runtime")
+                if runtime != options["runtime"]:
+                    filters["runtime"] = runtime
+            filters["genres"] = st.multiselect("Genres (any of)", options["genres"], key="filter_genres")
+            filters["languages"] = st.multiselect("Original language", options["languages"], key="filter_languages")
+            filters["min_votes"] = st.number_input("Minimum votes", min_value=0, value=0, step=50, key="filter_votes") or None
+
+    # Filled at the end of the script, once this rerun's spans are known
+    debug_panel = st.empty() if metrics.ENABLED else None
+
 # --- Main content ---
 st.markdown("<h1 class='main-title'><i class='fa-solid fa-film'></i> Movie Buddy</h1>", unsafe_allow_html=True)
 st.markdown("<p class='subtitle'><i class='fa-solid fa-sparkles'></i> Discover your next favorite film with AI-powered recommendations</p>", unsafe_allow_html=True)
 
 # --- Enhanced search section ---
 st.markdown("""
-<style>
-.animated-gradient-box {
-    border-radius: 24px;
-    background: rgba(30, 34, 54, 0.7);
-    box-shadow: 0 6px 32px 0 rgba(0,0,0,0.18);
-    border: 3px solid;
-    border-image: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4, #ff6b6b) 1;
-    animation: borderMove 4s linear infinite;
-    padding: 1.7rem 1.2rem 1.7rem 1.2rem;
-    margin: 1.5rem auto 0.5rem auto;
-    max-width: 700px;
-    position: relative;
-    overflow: hidden;
-    transition: box-shadow 0.3s;
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-}
-@keyframes borderMove {
-    0% { border-image-source: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4, #ff6b6b); }
-    100% { border-image-source: linear-gradient(270deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4, #ff6b6b); }
-}
-.pulse-icon {
-    display: inline-block;
-    animation: pulseIcon 1.5s infinite;
-}
-@keyframes pulseIcon {
-    0%, 100% { transform: scale(1); filter: drop-shadow(0 0 0 #ff6b6b); }
-    50% { transform: scale(1.18); filter: drop-shadow(0 0 8px #ff6b6b); }
-}
-.gradient-title {
-    font-size: 1.7rem;
-    font-weight: 900;
-    background: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4);
-    background-size: 200% 200%;
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    background-clip: text;
-    text-shadow: 0 2px 12px rgba(255,107,107,0.10);
-    animation: gradientShift 3s ease-in-out infinite;
-    display: inline-block;
-    margin-left: 0.5rem;
-    position: relative;
-}
-.gradient-title::after {
-    content: '';
-    display: block;
-    height: 4px;
-    width: 80%;
-    margin: 0.3rem auto 0 auto;
-    border-radius: 2px;
-    background: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4);
-    animation: underlineAnim 2.5s linear infinite;
-}
-@keyframes underlineAnim {
-    0% { width: 0; opacity: 0.2; }
-    30% { width: 80%; opacity: 1; }
-    100% { width: 0; opacity: 0.2; }
-}
-@keyframes gradientShift {
-    0%, 100% { background-position: 0% 50%; }
-    50% { background-position: 100% 50%; }
-}
-.fadein-subtitle {
-    color: #b8c6db;
-    font-size: 1.01rem;
-    margin-top: 0.5rem;
-    opacity: 0;
-    animation: fadeInSubtitle 1.2s 0.5s forwards;
-    font-weight: 400;
-}
-@keyframes fadeInSubtitle {
-    to { opacity: 1; }
-}
-/* Glassmorphism for results */
-.results-glass {
-    background: rgba(255,255,255,0.08);
-    border-radius: 18px;
-    box-shadow: 0 4px 24px rgba(0,0,0,0.13);
-    padding: 1.2rem 1.2rem 0.7rem 1.2rem;
-    margin: 1.2rem auto 0.7rem auto;
-    max-width: 900px;
-    backdrop-filter: blur(10px);
-    border: 1.5px solid rgba(255,255,255,0.13);
-    position: relative;
-}
-/* Recommendation card animation */
-@keyframes fadeInCard {
-    from { opacity: 0; transform: translateY(30px) scale(0.97); }
-    to { opacity: 1; transform: translateY(0) scale(1); }
-}
-.movie-card {
-    animation: fadeInCard 0.7s cubic-bezier(.39,.575,.56,1) both;
-    transition: box-shadow 0.2s, background 0.2s, transform 0.2s;
-}
-.movie-card:hover {
-    box-shadow: 0 8px 32px rgba(255,107,107,0.13), 0 2px 8px rgba(78,205,196,0.10);
-    background: rgba(255,255,255,0.13);
-    transform: translateY(-3px) scale(1.01);
-}
-.stButton > button, .stButton > button:focus {
-    outline: none !important;
-    box-shadow: 0 2px 10px rgba(255,107,107,0.10) !important;
-}
-.stButton > button:hover {
-    background: linear-gradient(90deg, #ff6b6b, #4ecdc4) !important;
-    color: #fff !important;
-    transform: scale(1.04) !important;
-}
-/* Footer gradient border */
-.footer {
-    border-top: 3px solid;
-    border-image: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #96ceb4, #ff6b6b) 1;
-    margin-top: 2.5rem;
-    padding-top: 1.2rem;
-    background: rgba(30,34,54,0.7);
-    border-radius: 0 0 18px 18px;
-    box-shadow: 0 -2px 12px rgba(0,0,0,0.08);
-}
-</style>
 <div class="animated-gradient-box">
     <div style="text-align: center;">
         <span class="pulse-icon"><i class="fa-solid fa-search" style="color: #ff6b6b; font-size: 1.7rem;"></i></span>
@@ -708,6 +252,20 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# --- Row of clickable titles (autocomplete and "did you mean" suggestions) ---
+def title_buttons(titles, key_prefix, caption):
+    if not titles:
+        return
+    st.markdown(f"<p style='color: #94a3b8; font-size: 0.9rem; margin-bottom: 0.4rem;'>{caption}</p>", unsafe_allow_html=True)
+    cols = st.columns(len(titles))
+    # Keyed by position: two movies can share a title
+    for i, (col, title) in enumerate(zip(cols, titles)):
+        with col:
+            if st.button(title, key=f"{key_prefix}_{i}", use_container_width=True):
+                st.session_state.search_movie = title
+                st.session_state.trigger_search = True
+                st.rerun()
+
 # --- Fix accessibility: provide a non-empty label and hide it
 movie_input = st.text_input(
     "Movie Title",  # Non-empty label for accessibility
@@ -718,6 +276,14 @@ movie_input = st.text_input(
     label_visibility="collapsed"
 )
 
+# --- Completions for what has been typed so far ---
+typed = movie_input.strip()
+if metrics.ENABLED:
+    metrics.observe("app.first_paint", time.perf_counter() - rerun_started)
+if typed and loading.ready:
+    completions = [t for t in suggest_titles(typed, limit=10) if t.casefold() != typed.casefold()]
+    title_buttons(completions[:5], "complete", "🔎 Suggestions:")
+
 # --- Add quick suggestions
 st.markdown("""
 <div style="text-align: center; margin-top: 1rem;">
@@ -734,6 +300,14 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Results section ---
+if not loading.ready:
+    # The shell is on screen: follow the model load, then rerun with the full UI
+    bar = st.progress(0.0, text="Loading the recommender model...")
+    while not loading.wait(0.1):
+        fraction, message = loading.progress
+        bar.progress(fraction, text=message)
+    st.rerun()
+
 if st.session_state.trigger_search:
     st.session_state.trigger_search = False
     movie_to_search = st.session_state.search_movie
@@ -744,7 +318,11 @@ else:
 if movie_to_search.strip():
     # Only show loading animation while waiting for results
     with st.spinner(''):
-        results = get_recommendations(movie_to_search, num=6)
+        match = resolve_title(movie_to_search)
+        # One model for the whole page, so its cards are cached under the version they came from
+        model = shared_model.get()
+        # Complete pages (posters included) are cached across sessions
+        results = response_cache.get_page(match["title"], num=6, weights=weights or None, filters=filters, model=model) if match["title"] else []
     if not results:
         st.markdown("""
         <div class="results-glass">
@@ -763,31 +341,50 @@ if movie_to_search.strip():
             </div>
         </div>
         """.format(movie_to_search), unsafe_allow_html=True)
+        title_buttons(match["alternatives"], "dym_missing", "🤔 Did you mean:")
     else:
         # Success message
         st.markdown(f"""
         <div class="results-glass success-message">
             <i class="fa-solid fa-check-circle" style="margin-right: 8px;"></i>
-            <strong>Found {len(results)} amazing movies similar to "{movie_to_search}"!</strong>
+            <strong>Found {len(results)} amazing movies similar to "{match['title']}"!</strong>
         </div>
         """, unsafe_allow_html=True)
+        if not match["exact"]:
+            st.caption(f'Showing results for "{match["title"]}" — no exact match for "{movie_to_search}".')
+            title_buttons(match["alternatives"], "dym_found", "🤔 Did you mean:")
         # Display movie recommendations in cards
         st.markdown("<div class='results-glass'>", unsafe_allow_html=True)
         st.markdown("### 🎯 <span style='font-weight:700;'>Your Personalized Recommendations</span>", unsafe_allow_html=True)
-        cols = st.columns(2)
-        for i, movie in enumerate(results):
-            with cols[i % 2]:
-                st.markdown(f"""
-                <div class="movie-card">
-                    <div class="movie-title">
-                        <i class="fa-solid fa-clapperboard"></i>
-                        {movie['title']}
-                    </div>
-                    <div class="movie-overview">
-                        {movie['overview'][:250]}{'...' if len(movie['overview']) > 250 else ''}
+        # Prefetched posters come with the results; with a TMDb key the rest
+        # are fetched concurrently
+        api_key = st.session_state.TMDB_API_KEY
+        missing = [movie['title'] for movie in results if not movie.get('poster')]
+        if missing and api_key and api_key != "your_tmdb_api_key_here":
+            posters = fetch_posters(missing)
+            for movie in results:
+                movie['poster'] = movie.get('poster') or posters.get(movie['title'])
+            # Placeholders mean a lookup missed its deadline or found nothing: try again next time
+            if not any(is_placeholder(poster) for poster in posters.values()):
+                response_cache.put_page(match["title"], 6, weights or None, filters, results, model.version)
+        with metrics.span("app.render_results"):
+            cols = st.columns(2)
+            for i, movie in enumerate(results):
+                poster = movie.get('poster')
+                poster_html = f'<img class="movie-poster" src="{poster}" alt="">' if poster else ''
+                with cols[i % 2]:
+                    st.markdown(f"""
+                    <div class="movie-card">
+                        {poster_html}
+                        <div class="movie-title">
+                            <i class="fa-solid fa-clapperboard"></i>
+                            {movie['title']}
+                        </div>
+                        <div class="movie-overview">
+                            {movie['overview'][:250]}{'...' if len(movie['overview']) > 250 else ''}
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
+                    """, unsafe_allow_html=True)
         st.markdown("</div>", unsafe_allow_html=True)
 else:
     st.warning("⚠️ Please enter a movie title to get recommendations!")
@@ -806,4 +403,15 @@ st.markdown("""
         Built with ❤️ using Streamlit & Machine Learning | © 2025
     </div>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+# --- Debug panel: spans of this rerun and process-wide counters ---
+if debug_panel is not None:
+    metrics.observe("app.rerun", time.perf_counter() - rerun_started)
+    with debug_panel.container():
+        with st.expander("🐞 Debug: timings"):
+            for name, seconds, depth in metrics.trace():
+                st.text(f"{'  ' * depth}{name}: {seconds * 1000:.1f} ms")
+            snapshot = metrics.snapshot()
+            st.json({name: snapshot[name] for name in ("counters", "response_cache", "tmdb_cache", "tmdb_scheduler") if name in snapshot},
+                    expanded=False)
\ No newline at end of file
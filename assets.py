@@ -0,0 +1,96 @@
+"""
+Static styling assets for the Streamlit UI.
+
+The app's CSS lives in static/css/ and the background star in static/img/.
+At startup the stylesheets are concatenated, minified and written once to
+static/build/app.<hash>.css, which Streamlit serves from /app/static/
+(enableStaticServing in .streamlit/config.toml). Each rerun then only emits
+a few <link> tags instead of resending the whole stylesheet; the content
+hash in the file name lets browsers cache it indefinitely.
+
+    python assets.py    # build the stylesheet and report bytes per rerun
+"""
+import functools
+import hashlib
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+BUILD_DIR = os.path.join(STATIC_DIR, "build")
+# URL prefix under which Streamlit serves STATIC_DIR
+STATIC_URL = "app/static"
+
+# Concatenated in this order into the built stylesheet
+STYLESHEETS = ("css/base.css", "css/search.css")
+EXTERNAL_STYLESHEETS = (
+    "https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;800&display=swap",
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.2/css/all.min.css",
+)
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_SPACE = re.compile(r"\s+")
+_PUNCTUATION = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """
+    Strip comments and redundant whitespace from a stylesheet
+
+    Spaces before ":" are kept, since "a :hover" and "a:hover" differ.
+    """
+    css = _COMMENT.sub("", css)
+    css = _SPACE.sub(" ", css)
+    css = _PUNCTUATION.sub(r"\1", css)
+    css = css.replace(": ", ":").replace(";}", "}")
+    return css.strip()
+
+
+def _read_sources():
+    parts = []
+    for name in STYLESHEETS:
+        with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as fh:
+            parts.append(fh.read())
+    return "\n".join(parts)
+
+
+@functools.lru_cache(maxsize=None)
+def build_stylesheet():
+    """
+    Minify the app stylesheets into a content-hashed file (once per process)
+
+    Returns:
+    str: URL path of the built stylesheet, relative to the app root
+    """
+    css = minify_css(_read_sources())
+    digest = hashlib.sha256(css.encode("utf-8")).hexdigest()[:12]
+    name = f"app.{digest}.css"
+    path = os.path.join(BUILD_DIR, name)
+    if not os.path.exists(path):
+        os.makedirs(BUILD_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(css)
+        os.replace(tmp_path, path)
+    return f"{STATIC_URL}/build/{name}"
+
+
+def stylesheet_links():
+    """HTML <link> tags for the fonts, icons and built app stylesheet."""
+    hrefs = EXTERNAL_STYLESHEETS + (build_stylesheet(),)
+    return "".join(f'<link rel="stylesheet" href="{href}">' for href in hrefs)
+
+
+def main():
+    with open(os.path.join(STATIC_DIR, "img", "star.svg"), encoding="utf-8") as fh:
+        svg = fh.read()
+    # What every rerun used to inline: these same stylesheets and the star SVG
+    inline = len(_read_sources().encode("utf-8")) + len(svg.encode("utf-8"))
+    links = len(stylesheet_links().encode("utf-8"))
+    minified = len(minify_css(_read_sources()).encode("utf-8"))
+    print(f"Built {build_stylesheet()} ({minified:,} bytes, fetched once and cached)")
+    print(f"Styling bytes per rerun: {inline:,} of inline CSS and SVG before, {links:,} of <link> tags now")
+
+
+if __name__ == "__main__":
+    main()
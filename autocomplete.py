@@ -0,0 +1,121 @@
+"""
+Prefix index for as-you-type title suggestions.
+
+Normalised titles are kept in one sorted array, so the titles starting with
+a prefix form a contiguous range found with two bisections. Completions are
+ranked by popularity (vote_count). Ranges too large to rank per keystroke
+("t", "th", "the ", ...) have their top completions precomputed when the
+index is built, so every query touches at most HEAVY_RANGE entries.
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+from title_index import normalize_title
+
+# Ranges longer than this have their top completions precomputed
+HEAVY_RANGE = 256
+# Completions kept per precomputed prefix (the largest limit callers may ask for)
+MAX_COMPLETIONS = 10
+# Leading articles dropped to add a second entry, so "dark" finds "The Dark Knight"
+ARTICLES = ("the ", "a ", "an ")
+
+_END = "\uffff"
+
+
+class PrefixIndex:
+    """
+    Popularity-ranked prefix search over a fixed list of titles
+
+    Parameters:
+    titles (list of str): Catalog titles, indexed by row position
+    weights (array-like): Popularity per row (e.g. vote_count)
+    """
+
+    def __init__(self, titles, weights=None):
+        weights = np.zeros(len(titles), dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+        entries = []
+        # Row of the first title with each normalised form, so remakes are suggested once
+        first_rows = {}
+        self.canonical = np.arange(len(titles), dtype=np.int32)
+        for row, title in enumerate(titles):
+            key = normalize_title(title)
+            if not key:
+                continue
+            self.canonical[row] = first_rows.setdefault(key, row)
+            entries.append((key, row))
+            for article in ARTICLES:
+                if key.startswith(article) and len(key) > len(article):
+                    entries.append((key[len(article):], row))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.rows = np.fromiter((row for _, row in entries), dtype=np.int32, count=len(entries))
+        self.weights = weights[self.rows] if len(entries) else np.zeros(0, dtype=np.float32)
+        self.heavy = {}
+        self._precompute("", 0, len(self.keys))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _range(self, prefix):
+        return bisect_left(self.keys, prefix), bisect_left(self.keys, prefix + _END)
+
+    def _rank(self, lo, hi, limit):
+        """Rows of the best-weighted entries in keys[lo:hi], one per distinct title, best first."""
+        weights = self.weights[lo:hi]
+        # Over-fetch so that dropping duplicates (title + article alias, remakes) still fills the limit
+        take = min(len(weights), 3 * limit)
+        if take == 0:
+            return []
+        best = np.argpartition(-weights, take - 1)[:take]
+        best = best[np.argsort(-weights[best], kind="stable")]
+        rows, seen = [], set()
+        for row in self.rows[lo + best].tolist():
+            title = int(self.canonical[row])
+            if title not in seen:
+                seen.add(title)
+                rows.append(row)
+                if len(rows) == limit:
+                    break
+        return rows
+
+    def _precompute(self, prefix, lo, hi):
+        """Store the top completions of every prefix whose range exceeds HEAVY_RANGE."""
+        stack = [(prefix, lo, hi)]
+        while stack:
+            prefix, lo, hi = stack.pop()
+            if hi - lo <= HEAVY_RANGE:
+                continue
+            self.heavy[prefix] = self._rank(lo, hi, MAX_COMPLETIONS)
+            depth = len(prefix)
+            start = lo
+            # Titles equal to the prefix itself sort first and have no next character
+            while start < hi and len(self.keys[start]) == depth:
+                start += 1
+            while start < hi:
+                child = self.keys[start][:depth + 1]
+                end = bisect_left(self.keys, child + _END, start, hi)
+                stack.append((child, start, end))
+                start = end
+
+    def complete(self, prefix, limit=MAX_COMPLETIONS):
+        """
+        Most popular titles starting with prefix
+
+        Parameters:
+        prefix (str): Text typed so far (normalised like the titles)
+        limit (int): Maximum number of completions
+
+        Returns:
+        list: Row positions, most popular first
+        """
+        key = normalize_title(prefix)
+        if not key:
+            return []
+        # Keep a trailing space so "star " does not also complete "stardust"
+        if prefix.endswith(" "):
+            key += " "
+        if key in self.heavy and limit <= MAX_COMPLETIONS:
+            return self.heavy[key][:limit]
+        lo, hi = self._range(key)
+        return self._rank(lo, hi, limit)
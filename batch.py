@@ -0,0 +1,246 @@
+"""
+Batch recommendations for offline jobs, e.g. nightly recommendation emails.
+
+Seed titles (one per line, from a file or stdin) are resolved to catalog
+rows in one pass and split into chunks. Each chunk's top-K lists come from
+Model.similar_rows_batch: a single gather from the neighbour table, or
+blocked matrix products when the table is too short (or custom field
+weights are given). Chunks are spread over a process pool whose workers are
+forked after the model is loaded, so memory-mapped artifacts are shared
+rather than copied. Results stream out in input order as JSONL or Parquet.
+
+    python batch.py seeds.txt --num 10 --out recs.jsonl
+    cat seeds.txt | python batch.py - --workers 4 --format parquet --out recs.parquet
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import recommender
+import similarity
+
+# Seeds scored per task
+CHUNK_ROWS = 2048
+# Records per Parquet row group
+PARQUET_BATCH = 8192
+FORMATS = ("jsonl", "parquet")
+
+
+def read_seeds(source):
+    """Seed titles, one per line, from a file or stdin ("-"); blank lines are skipped."""
+    fh = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    try:
+        return [line.strip() for line in fh if line.strip()]
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def resolve_rows(model, titles):
+    """
+    Catalog rows of the seed titles
+
+    Exact (case-insensitive) matches are looked up first; other titles go
+    through the typo-tolerant index.
+
+    Returns:
+    tuple: (rows int64 array, -1 for unknown titles; exact bool array)
+    """
+    rows = np.full(len(titles), -1, dtype=np.int64)
+    exact = np.zeros(len(titles), dtype=bool)
+    for i, title in enumerate(titles):
+        row, exact[i], _ = model.title_index.resolve(title, alternatives=0)
+        if row is not None:
+            rows[i] = row
+    return rows, exact
+
+
+def _init_worker():
+    # Forked workers inherit the parent's model; spawned ones open it here
+    recommender.get_model()
+
+
+def _score_rows(rows, num, weights, block_bytes):
+    return recommender.get_model().similar_rows_batch(rows, num, weights=weights, block_bytes=block_bytes)
+
+
+def _pool(workers):
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker)
+
+
+def _records(model, titles, rows, exact, neighbors, scores):
+    # Look every id/score/title up in bulk; per-element memmap indexing dominates otherwise
+    ids = model.movie_ids
+    seed_ids = ids[np.maximum(rows, 0)].tolist() if ids is not None else [None] * len(rows)
+    rec_ids = ids[np.maximum(neighbors, 0)].tolist() if ids is not None else [[None] * neighbors.shape[1]] * len(rows)
+    scores = np.round(scores.astype(np.float64), 6).tolist()
+    seed_titles = model.titles.take(np.maximum(rows, 0))
+    width = neighbors.shape[1]
+    rec_titles = model.titles.take(np.maximum(neighbors, 0).ravel())
+    for n, (title, row, is_exact, seed_id, best, best_ids, best_scores) in enumerate(zip(
+            titles, rows.tolist(), exact.tolist(), seed_ids, neighbors.tolist(), rec_ids, scores)):
+        found = row >= 0
+        yield {
+            "query": title,
+            "title": seed_titles[n] if found else None,
+            "id": seed_id if found else None,
+            "exact": is_exact,
+            "recommendations": [
+                {"title": t, "id": i, "score": s}
+                for r, t, i, s in zip(best, rec_titles[n * width:(n + 1) * width], best_ids, best_scores) if r >= 0
+            ],
+        }
+
+
+def recommend_batch(titles, num=6, weights=None, workers=1, chunk_rows=CHUNK_ROWS,
+                    block_bytes=similarity.DEFAULT_BLOCK_BYTES):
+    """
+    Top-num recommendations for many seed titles
+
+    Parameters:
+    titles (list of str): Seed titles; unknown ones get an empty list
+    num (int): Recommendations per seed
+    weights (dict): Per-field weights (multi-field models only, see recommender.field_weights)
+    workers (int): Processes scoring chunks in parallel (1 scores in this process)
+    chunk_rows (int): Seeds per task
+    block_bytes (int): Memory budget for one dense block of scores per worker
+
+    Returns:
+    generator: One dict per seed, in input order, with "query", "title",
+    "id", "exact" and "recommendations" (dicts with "title", "id", "score")
+    """
+    model = recommender.get_model()
+    rows, exact = resolve_rows(model, titles)
+    chunks = [slice(start, start + chunk_rows) for start in range(0, len(titles), chunk_rows)]
+
+    def scored(chunk):
+        # Duplicate seeds (popular titles) are scored once per chunk
+        unique, inverse = np.unique(rows[chunk][rows[chunk] >= 0], return_inverse=True)
+        return chunk, unique, inverse
+
+    if workers <= 1:
+        for chunk in chunks:
+            chunk, unique, inverse = scored(chunk)
+            yield from _expand(model, titles, rows, exact, chunk, inverse,
+                               *_score_rows(unique, num, weights, block_bytes))
+        return
+
+    with _pool(workers) as pool:
+        # A bounded window of in-flight chunks keeps results streaming in order
+        pending = deque()
+        for chunk in chunks:
+            chunk, unique, inverse = scored(chunk)
+            pending.append((chunk, inverse, pool.submit(_score_rows, unique, num, weights, block_bytes)))
+            if len(pending) >= 2 * workers:
+                chunk, inverse, future = pending.popleft()
+                yield from _expand(model, titles, rows, exact, chunk, inverse, *future.result())
+        while pending:
+            chunk, inverse, future = pending.popleft()
+            yield from _expand(model, titles, rows, exact, chunk, inverse, *future.result())
+
+
+def _expand(model, titles, rows, exact, chunk, inverse, neighbors, scores):
+    """Map the per-unique-row results of a chunk back onto its seeds."""
+    chunk_rows = rows[chunk]
+    found = chunk_rows >= 0
+    full_neighbors = np.full((len(chunk_rows), neighbors.shape[1]), -1, dtype=np.int32)
+    full_scores = np.full(full_neighbors.shape, -np.inf, dtype=np.float32)
+    full_neighbors[found] = neighbors[inverse]
+    full_scores[found] = scores[inverse]
+    return _records(model, titles[chunk], chunk_rows, exact[chunk], full_neighbors, full_scores)
+
+
+# --- Output ---
+def write_jsonl(records, out):
+    count = 0
+    for record in records:
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _parquet_schema(pa):
+    recommendation = pa.struct([("title", pa.string()), ("id", pa.int64()), ("score", pa.float32())])
+    return pa.schema([
+        ("query", pa.string()),
+        ("title", pa.string()),
+        ("id", pa.int64()),
+        ("exact", pa.bool_()),
+        ("recommendations", pa.list_(recommendation)),
+    ])
+
+
+def write_parquet(records, path, batch_size=PARQUET_BATCH):
+    """Stream records into a Parquet file, one row group per batch (needs pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("batch: --format parquet needs pyarrow (pip install pyarrow)")
+
+    schema = _parquet_schema(pa)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch or count == 0:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recommendations for many seed titles at once")
+    parser.add_argument("source", help="file with one seed title per line, or - for stdin")
+    parser.add_argument("--num", type=int, default=6, help="recommendations per seed")
+    parser.add_argument("--out", default="-", help="output file (default: stdout, JSONL only)")
+    parser.add_argument("--format", choices=FORMATS, help="output format (default: from --out, else jsonl)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scoring processes")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="seeds per task")
+    parser.add_argument("--weights", type=json.loads, help='per-field weights as JSON, e.g. \'{"genres": 1}\'')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "jsonl")
+    if fmt == "parquet" and args.out == "-":
+        parser.error("--format parquet needs --out")
+
+    started = time.perf_counter()
+    titles = read_seeds(args.source)
+    records = recommend_batch(titles, num=args.num, weights=args.weights,
+                              workers=args.workers, chunk_rows=args.chunk)
+    if fmt == "parquet":
+        count = write_parquet(records, args.out)
+    elif args.out == "-":
+        try:
+            count = write_jsonl(records, sys.stdout)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader stopped early (e.g. `| head`): stop the pool and exit quietly,
+            # with stdout pointed at devnull so the interpreter's final flush cannot fail again
+            records.close()
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            return 0
+    else:
+        with open(args.out, "w", encoding="utf-8") as out:
+            count = write_jsonl(records, out)
+    print(f"batch: {count:,} seeds in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
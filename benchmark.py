@@ -0,0 +1,408 @@
+"""
+Offline benchmark suite for the recommendation and TMDb paths.
+
+Runs against synthetic catalogs (5k, 100k and 1M titles by default), never
+the network:
+
+- model build time (when the catalog's model is (re)built) and load time
+- get_recommendations latency: neighbour-table lookups, on-the-fly scans
+  (num beyond the table) and filtered queries
+- batch throughput (batch.recommend_batch)
+- title resolution (with typos) and autocomplete latency
+- poster fetching through tmdb_api against a local mock TMDb server with
+  injected latency, cold and cached
+
+Each catalog is measured in a fresh subprocess, so load times are cold and
+module-level settings (data and index directories) apply cleanly. Catalogs
+and their built models are kept under --workdir and reused, so runs from
+different commits measure the same data; results are written as JSON that
+`compare` diffs metric by metric.
+
+    python benchmark.py run [--sizes 5000,100000,1000000] [--out bench.json]
+    python benchmark.py compare base.json bench.json [--threshold 0.1]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKDIR = os.path.join(BASE_DIR, ".bench")
+SIZES = (5000, 100000, 1000000)
+# Bump when synthetic_catalog() changes, so cached catalogs are regenerated
+GENERATOR_VERSION = 1
+# Larger catalogs build their neighbour table with the IVF backend
+EXACT_BUILD_LIMIT = 20000
+QUERIES = 500
+BATCH_SEEDS = 10000
+# Injected mock TMDb latency (seconds) and result pages fetched
+TMDB_LATENCY = 0.05
+POSTER_PAGES = 30
+
+GENRES = ("Action", "Adventure", "Animation", "Comedy", "Crime", "Documentary", "Drama", "Family",
+          "Fantasy", "History", "Horror", "Music", "Mystery", "Romance", "Science Fiction",
+          "Thriller", "War", "Western")
+LANGUAGES = ("en", "fr", "es", "de", "ja", "it", "ko", "zh", "hi", "ru")
+
+
+def _words(n_words, rng):
+    """Pronounceable synthetic words, unique."""
+    consonants, vowels = list("bcdfghjklmnprstvz"), list("aeiou")
+    words = set()
+    while len(words) < n_words:
+        length = rng.integers(2, 5)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length)))
+    return sorted(words)
+
+
+def synthetic_catalog(n, path, seed=0, n_words=30000, overview_words=30):
+    """
+    Write tmdb_5000_movies.csv and tmdb_5000_credits.csv with n synthetic movies
+
+    Overview words follow a Zipf distribution over a synthetic vocabulary,
+    so TF-IDF weights look like those of real text.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(_words(n_words, rng))
+    ranks = np.arange(1, n_words + 1)
+    probabilities = 1 / ranks ** 1.1
+    probabilities /= probabilities.sum()
+    overview_ids = rng.choice(n_words, size=(n, overview_words), p=probabilities)
+    title_ids = rng.choice(n_words, size=(n, 2), p=probabilities)
+    overviews = [" ".join(vocabulary[row]) for row in overview_ids]
+    titles = [f"{vocabulary[a].title()} {vocabulary[b].title()} {i}" for i, (a, b) in enumerate(title_ids)]
+
+    def names(choices):
+        return json.dumps([{"id": i, "name": name} for i, name in enumerate(choices)])
+
+    genres = [names(rng.choice(GENRES, size=rng.integers(1, 4), replace=False)) for _ in range(n)]
+    keywords = [names(vocabulary[rng.choice(n_words, size=3, p=probabilities)]) for _ in range(n)]
+    movies = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "title": titles,
+        "overview": overviews,
+        "genres": genres,
+        "keywords": keywords,
+        "original_language": rng.choice(LANGUAGES, size=n, p=[0.55] + [0.05] * 9),
+        "release_date": [f"{year}-01-01" for year in rng.integers(1920, 2025, size=n)],
+        "runtime": rng.integers(70, 200, size=n).astype(float),
+        "vote_count": rng.zipf(1.5, size=n).clip(max=30000),
+        "vote_average": rng.uniform(1, 10, size=n).round(1),
+        "popularity": rng.exponential(10, size=n),
+    })
+    half = min(5000, n_words // 2)
+    people = np.array([f"{a.title()} {b.title()}" for a, b in zip(vocabulary[:half], vocabulary[half:2 * half])])
+    credits = pd.DataFrame({
+        "movie_id": movies["id"],
+        "title": titles,
+        "cast": [json.dumps([{"name": name, "order": i} for i, name in enumerate(rng.choice(people, 5))])
+                 for _ in range(n)],
+        "crew": [json.dumps([{"name": rng.choice(people), "job": "Director"}]) for _ in range(n)],
+    })
+    os.makedirs(path, exist_ok=True)
+    movies.to_csv(os.path.join(path, "tmdb_5000_movies.csv"), index=False)
+    credits.to_csv(os.path.join(path, "tmdb_5000_credits.csv"), index=False)
+
+
+# --- Mock TMDb ---
+class _MockHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        time.sleep(self.server.latency)
+        self.server.requests += 1
+        if self.server.throttle_every and self.server.requests % self.server.throttle_every == 0:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if url.path.endswith("/search/movie"):
+            query = parse_qs(url.query).get("query", [""])[0]
+            body = {"results": [{"id": 1, "title": query, "poster_path": f"/{abs(hash(query))}.jpg"}]}
+        elif "/movie/" in url.path:
+            movie_id = url.path.rsplit("/", 1)[1]
+            body = {"id": int(movie_id), "poster_path": f"/{movie_id}.jpg", "backdrop_path": None,
+                    "overview": f"Overview of movie {movie_id}", "release_date": "1999-03-31",
+                    "vote_average": 7.5, "runtime": 120}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockTMDb:
+    """
+    Local TMDb stand-in answering /search/movie and /movie/{id} after a fixed latency
+
+    Parameters:
+    latency (float): Seconds before each answer
+    throttle_every (int): Answer every n-th request with 429 and Retry-After: 0 (0 never)
+    """
+
+    def __init__(self, latency=TMDB_LATENCY, throttle_every=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _MockHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.throttle_every = throttle_every
+        self.server.requests = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/3"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# --- Measurements ---
+def latency_stats(samples):
+    """Summary of latencies in seconds, reported in milliseconds."""
+    millis = np.asarray(samples) * 1000
+    return {
+        "n": len(millis),
+        "mean_ms": round(float(millis.mean()), 4),
+        **{f"p{q}_ms": round(float(np.percentile(millis, q)), 4) for q in (50, 90, 99)},
+    }
+
+
+def timed(fn, inputs, warmup=10):
+    for value in inputs[:warmup]:
+        fn(value)
+    samples = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        samples.append(time.perf_counter() - start)
+    return latency_stats(samples)
+
+
+def _typo(title, rng):
+    chars = list(title)
+    i = int(rng.integers(0, len(chars) - 1))
+    chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    return "".join(chars)
+
+
+def measure_catalog(queries=QUERIES, batch_seeds=BATCH_SEEDS, seed=0):
+    """Recommender measurements in this process (data/index dirs come from the environment)."""
+    started = time.perf_counter()
+    import batch
+    import recommender
+
+    import_s = time.perf_counter() - started
+    started = time.perf_counter()
+    model = recommender.load_model()
+    load_s = time.perf_counter() - started
+    # Built on first use (or by Model.prepare()); timed apart so the latency samples below exclude it
+    started = time.perf_counter()
+    model.title_index.prepare()
+    title_index_s = time.perf_counter() - started
+    recommender.swap_model(model)
+    rng = np.random.default_rng(seed)
+    titles = [model.titles[row] for row in rng.choice(len(model.titles), queries, replace=False)]
+    filters = {"year": (1990, 2010), "genres": ["Drama", "Comedy"], "min_votes": 2}
+    results = {
+        "movies": len(model.titles),
+        "model_version": model.version,
+        "import_s": round(import_s, 4),
+        "load_s": round(load_s, 4),
+        "title_index_s": round(title_index_s, 4),
+        "footprint_bytes": sum(v for k, v in model.memory_footprint().items() if k.endswith("_bytes")),
+        "recommend": timed(lambda title: recommender.get_recommendations(title, num=6), titles),
+        "recommend_scan": timed(lambda title: recommender.get_recommendations(title, num=recommender.TOP_K + 10),
+                                titles[:100]),
+        "recommend_filtered": timed(lambda title: recommender.get_recommendations(title, num=6, filters=filters),
+                                    titles[:200]),
+        "resolve_typo": timed(recommender.resolve_title, [_typo(title, rng) for title in titles]),
+        "autocomplete": timed(lambda title: recommender.suggest_titles(title[:4]), titles),
+    }
+    seeds = [model.titles[row] for row in rng.integers(0, len(model.titles), batch_seeds)]
+    start = time.perf_counter()
+    count = sum(1 for _ in batch.recommend_batch(seeds, num=10))
+    results["batch_seeds_per_s"] = round(count / (time.perf_counter() - start), 1)
+    return results
+
+
+def measure_posters(latency=TMDB_LATENCY, pages=POSTER_PAGES):
+    """Poster fetch time per results page (6 titles) against the mock server, cold and cached."""
+    with MockTMDb(latency) as mock:
+        os.environ["TMDB_API_BASE"] = mock.url
+        # No disk cache: every cold page must reach the (mock) network
+        os.environ["MOVIE_BUDDY_TMDB_CACHE"] = ""
+        import streamlit as st
+        import tmdb_api
+        import tmdb_http
+
+        # The client-side rate limit would dominate a tight loop; measure the fetch path itself
+        tmdb_http.configure_rate_limit(10000, burst=1000)
+        st.session_state["TMDB_API_KEY"] = "benchmark"
+        page_titles = [[f"Movie {page}-{i}" for i in range(6)] for page in range(pages)]
+        cold = timed(tmdb_api.fetch_posters, page_titles, warmup=0)
+        cached = timed(tmdb_api.fetch_posters, page_titles, warmup=0)
+        return {"latency_s": latency, "cold_page": cold, "cached_page": cached, "requests": mock.server.requests}
+
+
+# --- Runner ---
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _run_child(args, env):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), *args], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def prepare_catalog(size, workdir):
+    """Generate (once) and build the catalog for size; returns (env, build seconds or None)."""
+    data_dir = os.path.join(workdir, f"catalog_{size}_v{GENERATOR_VERSION}")
+    if not os.path.exists(os.path.join(data_dir, "tmdb_5000_movies.csv")):
+        print(f"benchmark: generating {size:,} titles in {data_dir}", file=sys.stderr)
+        synthetic_catalog(size, data_dir)
+    env = dict(os.environ, MOVIE_BUDDY_DATA_DIR=data_dir, MOVIE_BUDDY_INDEX_DIR=os.path.join(data_dir, "artifacts"),
+               MOVIE_BUDDY_SEARCH="exact" if size <= EXACT_BUILD_LIMIT else "ivf")
+    if subprocess.run([sys.executable, "recommender.py", "check-index"], cwd=BASE_DIR, env=env,
+                      capture_output=True).returncode == 0:
+        return env, None
+    print(f"benchmark: building the {size:,}-title model", file=sys.stderr)
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "recommender.py", "build-index"], cwd=BASE_DIR, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+    return env, round(time.perf_counter() - started, 2)
+
+
+def run(sizes=SIZES, workdir=WORKDIR, queries=QUERIES, posters=True):
+    results = {
+        "commit": _git_commit(),
+        "created_at": time.time(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "catalogs": {},
+    }
+    for size in sizes:
+        env, build_s = prepare_catalog(size, workdir)
+        catalog = _run_child(["catalog", "--queries", str(queries)], env)
+        catalog["build_s"] = build_s
+        results["catalogs"][str(size)] = catalog
+        print(f"benchmark: {size:,} titles: load {catalog['load_s']:.3f}s, "
+              f"recommend p50 {catalog['recommend']['p50_ms']:.3f}ms, "
+              f"batch {catalog['batch_seeds_per_s']:,.0f} seeds/s", file=sys.stderr)
+    if posters:
+        results["posters"] = _run_child(["posters"], dict(os.environ))
+    return results
+
+
+# --- Comparison ---
+# Suffixes of the metrics compared between runs (counts and settings are not)
+METRIC_SUFFIXES = ("_ms", "_s", "_per_s", "_bytes")
+
+
+def flatten(results, prefix=""):
+    """Metrics of a results file as {"catalogs.5000.recommend.p50_ms": value}."""
+    flat = {}
+    for name, value in results.items():
+        key = f"{prefix}{name}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{key}."))
+        elif isinstance(value, (int, float)) and name.endswith(METRIC_SUFFIXES) and name != "latency_s":
+            flat[key] = value
+    return flat
+
+
+def compare(base, new, threshold=0.1):
+    """
+    Metric-by-metric change between two results files
+
+    Returns:
+    list: (metric, base, new, relative change, regressed) for metrics in both
+    """
+    base, new = flatten(base), flatten(new)
+    rows = []
+    for metric in sorted(set(base) & set(new)):
+        if not base[metric]:
+            continue
+        change = (new[metric] - base[metric]) / base[metric]
+        # Throughput should go up; times and sizes should go down
+        worse = -change if metric.endswith("_per_s") else change
+        rows.append((metric, base[metric], new[metric], change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Movie Buddy offline benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="benchmark synthetic catalogs and write JSON results")
+    run_parser.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated catalog sizes")
+    run_parser.add_argument("--queries", type=int, default=QUERIES, help="queries per latency measurement")
+    run_parser.add_argument("--workdir", default=WORKDIR, help="where catalogs and models are kept between runs")
+    run_parser.add_argument("--out", default="-", help="results file (default: stdout)")
+    run_parser.add_argument("--no-posters", action="store_true", help="skip the mock TMDb benchmark")
+    compare_parser = sub.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="relative change counted as a regression")
+    # Internal: measurements run in a fresh process each
+    catalog_parser = sub.add_parser("catalog")
+    catalog_parser.add_argument("--queries", type=int, default=QUERIES)
+    sub.add_parser("posters")
+    args = parser.parse_args(argv)
+
+    if args.command == "catalog":
+        print(json.dumps(measure_catalog(queries=args.queries)))
+        return 0
+    if args.command == "posters":
+        print(json.dumps(measure_posters()))
+        return 0
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as fh:
+            base = json.load(fh)
+        with open(args.new, encoding="utf-8") as fh:
+            new = json.load(fh)
+        rows = compare(base, new, args.threshold)
+        print(f"{base.get('commit')} -> {new.get('commit')}")
+        for metric, old, value, change, regressed in rows:
+            print(f"{'REGRESSED ' if regressed else '          '}{metric:<48} {old:>14,.4f} {value:>14,.4f} {change:+8.1%}")
+        return 1 if any(row[-1] for row in rows) else 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    results = run(sizes, args.workdir, args.queries, posters=not args.no_posters)
+    if args.out == "-":
+        print(json.dumps(results, indent=2))
+    else:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
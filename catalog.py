@@ -0,0 +1,416 @@
+"""
+Incremental catalog updates: add, update and delete movies without a refit.
+
+New and changed overviews are transformed with the stored vocabulary and
+IDF weights, and only the neighbour lists they touch are recomputed:
+
+- the lists of the added/updated movies themselves
+- lists that pointed at a deleted or updated movie
+- any other list that an added movie now beats (merged in place)
+
+Every change is also appended to catalog_changes.jsonl next to the CSVs, so
+a full rebuild reproduces the same catalog. A frozen vocabulary slowly stops
+describing the catalog, so each update measures the IDF drift and the share
+of out-of-vocabulary words in ingested overviews; once either passes its
+threshold the model is flagged for a full refit and `recommender.py
+check-index` fails until `build-index` has run (e.g. from a nightly
+`check-index || build-index` job).
+
+Updates rewrite the model directory atomically; run one writer at a time.
+
+    python catalog.py add new_releases.csv      # .csv, .jsonl or - (JSONL on stdin)
+    python catalog.py delete 19995 285
+    python catalog.py status
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+import ann
+import model_store
+import recommender
+import similarity
+from embeddings import Embeddings, quantize
+from features import FieldFeatures
+from filters import FilterIndex
+
+# Mean relative IDF change (weighted by document frequency) that triggers a refit
+IDF_DRIFT_THRESHOLD = 0.05
+# Share of ingested overview words missing from the vocabulary that triggers a refit
+OOV_THRESHOLD = 0.2
+
+
+def idf_drift(tfidf, idf):
+    """
+    How far the stored IDF weights are from the current catalog's
+
+    Parameters:
+    tfidf (scipy.sparse.csr_matrix): Current TF-IDF rows
+    idf (numpy.ndarray): IDF weights the vectorizer was fitted with
+
+    Returns:
+    float: Mean relative IDF change, weighted by current document frequency
+    """
+    df = np.bincount(tfidf.indices, minlength=len(idf))
+    if not df.any():
+        return 0.0
+    # Same smoothing as TfidfVectorizer(smooth_idf=True)
+    current = np.log((1 + tfidf.shape[0]) / (1 + df)) + 1
+    return float(np.average(np.abs(current - idf) / idf, weights=df))
+
+
+def status(path=recommender.MODEL_DIR):
+    """
+    Drift since the last full fit, and which thresholds it passed
+
+    Parameters:
+    path (str): Model directory
+
+    Returns:
+    dict|None: Model version, size, update count, drift figures and a
+    "reasons" list naming each passed threshold and its value; None when no
+    model is built
+    """
+    manifest = model_store.read_manifest(path)
+    if manifest is None:
+        return None
+    catalog = manifest.get("catalog") or {}
+    drift = catalog.get("idf_drift", 0.0)
+    oov_rate = catalog.get("oov_rate", 0.0)
+    reasons = []
+    if drift > IDF_DRIFT_THRESHOLD:
+        reasons.append(f"IDF drift {drift:.3f} passed the {IDF_DRIFT_THRESHOLD} threshold")
+    if oov_rate > OOV_THRESHOLD:
+        reasons.append(f"out-of-vocabulary words at {oov_rate:.1%} passed the {OOV_THRESHOLD:.0%} threshold")
+    if catalog.get("refit_due") and not reasons:
+        # Flagged under thresholds that have since been raised
+        reasons.append(f"flagged at the last update (IDF drift {drift:.3f}, "
+                       f"out-of-vocabulary words {oov_rate:.1%})")
+    return {
+        "model_version": manifest["model_version"],
+        "n_movies": manifest["n_movies"],
+        "updates": catalog.get("updates", 0),
+        "idf_drift": drift,
+        "oov_rate": oov_rate,
+        "refit_due": bool(catalog.get("refit_due")),
+        "reasons": reasons,
+    }
+
+
+def _oov_counts(vectorizer, overviews):
+    analyze = vectorizer.build_analyzer()
+    vocabulary = vectorizer.vocabulary_
+    words = oov = 0
+    for overview in overviews:
+        tokens = analyze(overview)
+        words += len(tokens)
+        oov += sum(1 for token in tokens if token not in vocabulary)
+    return oov, words
+
+
+def _clean(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+def _movie_record(movie):
+    record = {name: _clean(value) for name, value in movie.items()}
+    if record.get("id") is None or not record.get("title"):
+        raise ValueError(f"movie records need an id and a title: {movie!r}")
+    record["id"] = int(record["id"])
+    record["overview"] = record.get("overview") or ""
+    return record
+
+
+def _column_values(records, name, dtype):
+    fill = np.nan if np.issubdtype(dtype, np.floating) else 0
+    values = []
+    for record in records:
+        try:
+            values.append(fill if record.get(name) is None else dtype(record[name]))
+        except (TypeError, ValueError):
+            values.append(fill)
+    return np.asarray(values, dtype=dtype)
+
+
+def _pad(neighbors, scores, k):
+    """Widen a neighbour table to k columns (tiny catalogs return fewer)."""
+    missing = k - neighbors.shape[1]
+    if missing <= 0:
+        return neighbors, scores
+    return (
+        np.pad(neighbors, ((0, 0), (0, missing)), constant_values=-1),
+        np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf),
+    )
+
+
+def _ivf_labels(index, n_rows):
+    labels = np.empty(n_rows, dtype=np.int32)
+    labels[index.rows] = np.repeat(np.arange(index.n_lists, dtype=np.int32), np.diff(index.offsets))
+    return labels
+
+
+def _ivf_from_labels(matrix, centroids, labels):
+    rows = np.argsort(labels, kind="stable").astype(np.int32)
+    counts = np.bincount(labels, minlength=centroids.shape[0])
+    offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+    return ann.IVFIndex(matrix, centroids, offsets, rows)
+
+
+def apply_changes(upserts=(), deletes=(), path=recommender.MODEL_DIR, block_bytes=similarity.DEFAULT_BLOCK_BYTES):
+    """
+    Add, update and delete movies in a built model without refitting it
+
+    Deletes are applied before upserts; upserting an existing id replaces
+    that movie.
+
+    Parameters:
+    upserts (iterable of dict): Movies with at least "id" and "title", plus
+    any of "overview", "poster_path" and the numeric columns
+    deletes (iterable of int): TMDb ids to remove
+    path (str): Model directory to update
+
+    Returns:
+    dict: What changed, how many lists were recomputed or merged, the IDF
+    drift and whether a full refit is now due
+
+    Raises:
+    RuntimeError: If there is no model at path or it is stale against the CSVs
+    """
+    from scipy.sparse import csr_matrix, vstack
+
+    started = time.perf_counter()
+    artifacts = model_store.load_model(path)
+    if artifacts is None or recommender.artifacts_are_stale(artifacts["manifest"]):
+        raise RuntimeError(f"model artifacts in {path} are missing or stale; run `python recommender.py build-index`")
+    manifest = artifacts["manifest"]
+    upserts = [_movie_record(movie) for movie in upserts]
+    deletes = sorted({int(movie_id) for movie_id in deletes})
+
+    # --- Rows: drop deleted/replaced movies, append the upserted ones ---
+    ids = np.asarray(artifacts["columns"]["id"])
+    removed = np.isin(ids, deletes + [record["id"] for record in upserts])
+    kept = np.flatnonzero(~removed)
+    old_to_new = np.full(len(ids), -1, dtype=np.int64)
+    old_to_new[kept] = np.arange(len(kept))
+    new_rows = np.arange(len(kept), len(kept) + len(upserts))
+
+    vectorizer = model_store.load_vectorizer(artifacts["vocabulary"], artifacts["idf"])
+    overviews = [record["overview"] for record in upserts]
+    if upserts:
+        added = vectorizer.transform(overviews).astype(np.float32).tocsr()
+    else:
+        added = csr_matrix((0, artifacts["tfidf"].shape[1]), dtype=np.float32)
+    tfidf = vstack([artifacts["tfidf"][kept], added], format="csr")
+
+    texts = {
+        name: values.select(kept).extend([record.get(name) for record in upserts])
+        for name, values in artifacts["texts"].items()
+    }
+    columns = {
+        name: np.concatenate([values[kept], _column_values(upserts, name, values.dtype.type)])
+        for name, values in artifacts["columns"].items()
+    }
+
+    filters = FilterIndex.from_arrays(artifacts["filters"]).select(kept).extend(upserts)
+
+    # --- Representation used for the neighbour lists ---
+    dense = index = fields = None
+    search_matrix = tfidf
+    if artifacts["fields"] is not None:
+        old_fields = FieldFeatures.from_arrays(artifacts["fields"], len(ids))
+        if upserts:
+            field_rows = old_fields.transform(upserts, added)
+        else:
+            field_rows = csr_matrix((0, old_fields.matrix.shape[1]), dtype=np.float32)
+        fields = FieldFeatures(
+            vstack([old_fields.matrix[kept], field_rows], format="csr"),
+            old_fields.column_field, old_fields.vocabularies, old_fields.idf,
+        )
+        # The stored table uses the default field weights
+        search_matrix = fields.weighted_matrix()
+    if artifacts["embeddings"] is not None:
+        old = Embeddings.from_arrays(artifacts["embeddings"])
+        codes, scales = quantize(old.transform(added).reshape(-1, old.dim), manifest["params"].get("dtype", "int8"))
+        dense = Embeddings(
+            np.concatenate([old.codes[kept], codes]), np.concatenate([old.scales[kept], scales]), old.components
+        )
+    if artifacts["ann"] is not None:
+        old_index = ann.IVFIndex.from_arrays(artifacts["tfidf"], artifacts["ann"])
+        labels = _ivf_labels(old_index, len(ids))[kept]
+        if len(upserts):
+            labels = np.concatenate([labels, ann.assign(added, old_index.centroids)])
+        index = _ivf_from_labels(tfidf, old_index.centroids, labels)
+
+    def top_k(rows, k):
+        if dense is not None:
+            return dense.top_k_blocked(k, rows=rows)
+        if index is not None:
+            neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+            scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+            for i, row in enumerate(rows):
+                best, best_scores = index.search_row(row, k)
+                neighbors[i, :len(best)] = best
+                scores[i, :len(best)] = best_scores
+            return neighbors, scores
+        return similarity.top_k_blocked(search_matrix, k, rows=rows)
+
+    def scores_against(rows):
+        if dense is not None:
+            return dense.scores(dense.vectors(rows))
+        return np.asarray((search_matrix @ search_matrix[rows].T).todense(), dtype=np.float32)
+
+    # --- Neighbour lists ---
+    old_neighbors = np.asarray(artifacts["neighbors"])[kept]
+    k = old_neighbors.shape[1]
+    neighbors = np.where(old_neighbors >= 0, old_to_new[old_neighbors], -1).astype(np.int32)
+    scores = np.asarray(artifacts["neighbor_scores"][kept], dtype=np.float32)
+    # Lists that lost an entry to a deleted or replaced movie are recomputed
+    affected = np.flatnonzero(((neighbors < 0) & (old_neighbors >= 0)).any(axis=1))
+    recompute = np.concatenate([affected, new_rows])
+    neighbors = np.concatenate([neighbors, np.full((len(upserts), k), -1, dtype=np.int32)])
+    scores = np.concatenate([scores, np.full((len(upserts), k), -np.inf, dtype=np.float32)])
+    if len(recompute) and k:
+        neighbors[recompute], scores[recompute] = _pad(*top_k(recompute, k), k)
+
+    # Other lists only change where an added movie beats their current k-th entry
+    others = np.setdiff1d(np.arange(len(kept)), affected)
+    merged = 0
+    step = similarity.block_rows(tfidf.shape[0], block_bytes)
+    for start in range(0, len(new_rows) if k else 0, step):
+        chunk = new_rows[start:start + step]
+        sims = scores_against(chunk)[others]
+        better = np.flatnonzero((sims > scores[others, -1][:, None]).any(axis=1))
+        if not len(better):
+            continue
+        rows = others[better]
+        candidates = np.concatenate([neighbors[rows], np.broadcast_to(chunk, (len(rows), len(chunk)))], axis=1)
+        candidate_scores = np.concatenate([scores[rows], sims[better]], axis=1)
+        best = np.argpartition(-candidate_scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(candidate_scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        neighbors[rows] = np.take_along_axis(np.take_along_axis(candidates, best, axis=1), order, axis=1)
+        scores[rows] = np.take_along_axis(best_scores, order, axis=1)
+        merged += len(rows)
+
+    # --- Drift bookkeeping ---
+    previous = manifest.get("catalog", {})
+    oov, words = _oov_counts(vectorizer, overviews)
+    oov += previous.get("oov_words", 0)
+    words += previous.get("words", 0)
+    drift = idf_drift(tfidf, np.asarray(artifacts["idf"], dtype=np.float64))
+    oov_rate = oov / words if words else 0.0
+    catalog = {
+        "updates": previous.get("updates", 0) + 1,
+        "idf_drift": drift,
+        "oov_rate": oov_rate,
+        "oov_words": oov,
+        "words": words,
+        "refit_due": drift > IDF_DRIFT_THRESHOLD or oov_rate > OOV_THRESHOLD,
+    }
+
+    with open(recommender.CHANGES_JSONL, "a", encoding="utf-8") as fh:
+        for movie_id in deletes:
+            fh.write(json.dumps({"op": "delete", "id": movie_id}) + "\n")
+        for record in upserts:
+            fh.write(json.dumps({"op": "upsert", "movie": record}, ensure_ascii=False) + "\n")
+
+    manifest = model_store.save_model(
+        path,
+        vocabulary=artifacts["vocabulary"],
+        idf=artifacts["idf"],
+        tfidf=tfidf,
+        texts=texts,
+        columns=columns,
+        neighbors=neighbors,
+        neighbor_scores=scores,
+        fingerprint=recommender.dataset_fingerprint(),
+        params=manifest["params"],
+        ann=index.arrays() if index is not None else None,
+        embeddings=dense.arrays() if dense is not None else None,
+        fields=fields.arrays() if fields is not None else None,
+        filters=filters.arrays(),
+        catalog=catalog,
+    )
+    return {
+        "upserted": len(upserts),
+        "deleted": int(np.isin(ids, deletes).sum()),
+        "recomputed": len(recompute),
+        "merged": merged,
+        "seconds": time.perf_counter() - started,
+        "model_version": manifest["model_version"],
+        **{name: catalog[name] for name in ("idf_drift", "oov_rate", "refit_due")},
+    }
+
+
+def upsert_movies(movies, path=recommender.MODEL_DIR):
+    """Add new movies or replace existing ones (matched by id); see apply_changes."""
+    return apply_changes(upserts=movies, path=path)
+
+
+def delete_movies(ids, path=recommender.MODEL_DIR):
+    """Remove movies by TMDb id; see apply_changes."""
+    return apply_changes(deletes=ids, path=path)
+
+
+def read_movies(source):
+    """Movie records from a CSV or JSONL file, or JSONL on stdin ("-")."""
+    if source == "-":
+        return [json.loads(line) for line in sys.stdin if line.strip()]
+    if source.endswith(".csv"):
+        import pandas as pd
+
+        return pd.read_csv(source).to_dict("records")
+    with open(source, encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrementally update the Movie Buddy catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="add or update movies from a CSV/JSONL file (- for JSONL on stdin)")
+    add.add_argument("source")
+    delete = sub.add_parser("delete", help="remove movies by TMDb id")
+    delete.add_argument("ids", type=int, nargs="+")
+    sub.add_parser("status", help="report IDF drift since the last full fit")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        report = status()
+        if report is None:
+            print(f"No model in {recommender.MODEL_DIR}")
+            return 1
+        print(f"Model {report['model_version']}: {report['n_movies']} movies, "
+              f"{report['updates']} incremental updates since the last fit")
+        if report["updates"]:
+            print(f"IDF drift {report['idf_drift']:.3f} (threshold {IDF_DRIFT_THRESHOLD}), "
+                  f"out-of-vocabulary words {report['oov_rate']:.1%} (threshold {OOV_THRESHOLD:.0%})")
+        if report["refit_due"]:
+            print(f"Full refit due: {'; '.join(report['reasons'])}")
+        else:
+            print("No refit needed")
+        return 0
+
+    if args.command == "add":
+        report = upsert_movies(read_movies(args.source))
+    else:
+        report = delete_movies(args.ids)
+    print(f"Upserted {report['upserted']}, deleted {report['deleted']} in {report['seconds']:.2f}s "
+          f"({report['recomputed']} lists recomputed, {report['merged']} merged); "
+          f"model {report['model_version']}")
+    print(f"IDF drift {report['idf_drift']:.3f}, out-of-vocabulary words {report['oov_rate']:.1%}")
+    if report["refit_due"]:
+        print(f"Full refit due ({'; '.join(status()['reasons'])}): "
+              f"run `python recommender.py build-index`")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""
+Dense LSA embeddings with quantised storage.
+
+As an alternative to the sparse TF-IDF rows, every movie can be described by
+a fixed-size dense vector: a truncated SVD (LSA) of the TF-IDF matrix,
+L2-normalised. Vectors are stored quantised with one scale per vector:
+
+    int8      codes = round(v / scale), scale = max|v| / 127   (1 byte/dim)
+    float16   codes = v / scale,        scale = max|v|         (2 bytes/dim)
+
+so 1M movies at 128 dimensions take 128 MB as int8. Similarity is a
+vectorised matmul of the dequantised codes against the query vectors, done
+in blocks of rows so the float32 copy never exceeds a fixed size.
+
+    python recommender.py build-index --vectors lsa [--dim 128] [--dtype int8]
+    python embeddings.py --synthetic 100000     # footprint and agreement with float32
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+import similarity
+
+EMBEDDING_DIM = 128
+DTYPES = ("int8", "float16")
+# Rows dequantised per matmul block
+BLOCK_ROWS = 65536
+
+
+def fit_lsa(tfidf, dim=EMBEDDING_DIM, seed=0):
+    """
+    Truncated SVD of the TF-IDF matrix
+
+    Parameters:
+    tfidf (scipy.sparse.csr_matrix): L2-normalised TF-IDF rows
+    dim (int): Embedding size (capped by the matrix shape)
+
+    Returns:
+    tuple: (components float32 [dim, n_terms], vectors float32 [N, dim] with
+    L2-normalised rows)
+    """
+    from sklearn.decomposition import TruncatedSVD
+
+    dim = max(1, min(dim, tfidf.shape[0] - 1, tfidf.shape[1] - 1))
+    svd = TruncatedSVD(n_components=dim, algorithm="randomized", random_state=seed)
+    vectors = svd.fit_transform(tfidf).astype(np.float32)
+    return svd.components_.astype(np.float32), _normalize(vectors)
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def quantize(vectors, dtype="int8"):
+    """
+    Quantise float vectors with one scale per vector
+
+    Returns:
+    tuple: (codes in dtype [N, dim], scales float32 [N])
+    """
+    scales = np.abs(vectors).max(axis=1).astype(np.float32)
+    scales[scales == 0] = 1
+    if dtype == "int8":
+        scales /= 127
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    elif dtype == "float16":
+        codes = (vectors / scales[:, None]).astype(np.float16)
+    else:
+        raise ValueError(f"unsupported embedding dtype {dtype!r}, expected one of {DTYPES}")
+    return codes, scales
+
+
+class Embeddings:
+    """
+    Quantised movie vectors and the projection for new documents
+
+    Parameters:
+    codes (numpy.ndarray): int8 or float16 codes [N, dim]
+    scales (numpy.ndarray): float32 scale per vector
+    components (numpy.ndarray): LSA projection [dim, n_terms] (optional)
+    """
+
+    def __init__(self, codes, scales, components=None):
+        self.codes = codes
+        self.scales = scales
+        self.components = components
+
+    @classmethod
+    def fit(cls, tfidf, dim=EMBEDDING_DIM, dtype="int8", seed=0):
+        components, vectors = fit_lsa(tfidf, dim=dim, seed=seed)
+        codes, scales = quantize(vectors, dtype)
+        return cls(codes, scales, components)
+
+    def __len__(self):
+        return self.codes.shape[0]
+
+    @property
+    def dim(self):
+        return self.codes.shape[1]
+
+    def arrays(self):
+        """Arrays to persist alongside the model (see from_arrays)."""
+        return {"codes": self.codes, "scales": self.scales, "components": self.components}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["codes"], arrays["scales"], arrays.get("components"))
+
+    def vectors(self, rows):
+        """Dequantised float32 vectors of the given rows."""
+        return self.codes[rows].astype(np.float32) * self.scales[rows, None]
+
+    def transform(self, tfidf_rows):
+        """Project TF-IDF rows (e.g. of new movies) into the embedding space."""
+        return _normalize(np.asarray(tfidf_rows @ self.components.T, dtype=np.float32))
+
+    def scores(self, queries, block_rows=BLOCK_ROWS):
+        """
+        Cosine similarity of every movie against a batch of query vectors
+
+        Parameters:
+        queries (numpy.ndarray): float32 query vectors [m, dim]
+
+        Returns:
+        numpy.ndarray: float32 scores [N, m]
+        """
+        queries = np.asarray(queries, dtype=np.float32).T
+        out = np.empty((len(self), queries.shape[1]), dtype=np.float32)
+        for start in range(0, len(self), block_rows):
+            block = slice(start, start + block_rows)
+            np.matmul(self.codes[block].astype(np.float32), queries, out=out[block])
+            out[block] *= self.scales[block, None]
+        return out
+
+    def seed_scores(self, rows, seed_weights, candidates=None):
+        """Weighted sum of several movies' scores, from one combined query vector."""
+        query = np.asarray(seed_weights, dtype=np.float32) @ self.vectors(rows)
+        if candidates is not None:
+            return self.vectors(candidates) @ query
+        return self.scores(query[None, :])[:, 0]
+
+    def top_k_for_row(self, row, k, exclude_self=True):
+        """
+        The k movies most similar to row
+
+        Returns:
+        tuple: (indices, scores) as numpy arrays, best first
+        """
+        scores = self.scores(self.vectors([row]))[:, 0]
+        if exclude_self:
+            scores[row] = -np.inf
+        best = similarity.top_k(scores, k)
+        return best, scores[best]
+
+    def top_k_blocked(self, k, rows=None, block_bytes=similarity.DEFAULT_BLOCK_BYTES, exclude_self=True):
+        """
+        Top-k neighbours for many movies (default: every movie)
+
+        Returns:
+        tuple: (neighbors int32 [len(rows), k], scores float32 [len(rows), k])
+        """
+        n = len(self)
+        rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+        k = max(0, min(k, n - 1 if exclude_self else n))
+        neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+        scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+        if k == 0:
+            return neighbors, scores
+        step = similarity.block_rows(n, block_bytes)
+        for start in range(0, len(rows), step):
+            block = rows[start:start + step]
+            sims = self.scores(self.vectors(block)).T
+            if exclude_self:
+                sims[np.arange(len(block)), block] = -np.inf
+            part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+            part_scores = np.take_along_axis(sims, part, axis=1)
+            order = np.argsort(-part_scores, axis=1, kind="stable")
+            neighbors[start:start + len(block)] = np.take_along_axis(part, order, axis=1)
+            scores[start:start + len(block)] = np.take_along_axis(part_scores, order, axis=1)
+        return neighbors, scores
+
+    def nbytes(self):
+        """Size of the codes and scales (the projection is counted separately)."""
+        return int(self.codes.nbytes + self.scales.nbytes)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Footprint and quantisation error of LSA embeddings")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="use a synthetic catalog of N titles")
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM, help="embedding size")
+    parser.add_argument("--k", type=int, default=10, help="neighbours compared per query")
+    parser.add_argument("--queries", type=int, default=200, help="number of query titles")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        import ann
+
+        tfidf = ann.synthetic_matrix(args.synthetic)
+    else:
+        import recommender
+
+        tfidf = recommender.get_model().tfidf
+    start = time.perf_counter()
+    components, vectors = fit_lsa(tfidf, dim=args.dim)
+    print(f"{tfidf.shape[0]:,} titles, dim={vectors.shape[1]}, SVD in {time.perf_counter() - start:.1f}s")
+
+    reference = Embeddings(vectors, np.ones(len(vectors), dtype=np.float32))
+    rows = np.random.default_rng(0).choice(len(vectors), min(args.queries, len(vectors)), replace=False)
+    expected = [reference.top_k_for_row(row, args.k)[0] for row in rows]
+    print(f"float32   {reference.nbytes() / 2**20:8.1f} MB")
+    for dtype in DTYPES:
+        embeddings = Embeddings(*quantize(vectors, dtype), components)
+        latencies, hits = [], 0
+        for row, wanted in zip(rows, expected):
+            start = time.perf_counter()
+            best, _ = embeddings.top_k_for_row(row, args.k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += len(np.intersect1d(best, wanted))
+        print(f"{dtype:<9} {embeddings.nbytes() / 2**20:8.1f} MB  "
+              f"top-{args.k} agreement with float32 {hits / (len(rows) * args.k):.3f}  "
+              f"p50={np.percentile(latencies, 50):.1f}ms  p99={np.percentile(latencies, 99):.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
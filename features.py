@@ -0,0 +1,250 @@
+"""
+Multi-field movie features: overview, genres, keywords, top cast and director.
+
+Each field is its own sparse block with L2-normalised rows: the overview
+TF-IDF, and TF-IDF weighted one-hot names for genres, keywords, the top
+billed cast (credits CSV) and the director. The blocks are stacked side by
+side into one matrix, so for field weights w
+
+    score(q, d) = sum_f w_f * cos_f(q, d) / sum_f w_f
+
+is a single sparse product of that matrix with the query row, whose columns
+are scaled by their field weight. Weights only touch the query side, so they
+can change per request (e.g. from the UI sliders) without rebuilding any
+block.
+
+    python recommender.py build-index --vectors fields
+"""
+import json
+
+import numpy as np
+
+import similarity
+
+FIELDS = ("overview", "genres", "keywords", "cast", "director")
+DEFAULT_WEIGHTS = {"overview": 1.0, "genres": 0.5, "keywords": 0.7, "cast": 0.4, "director": 0.4}
+# Cast members per movie, in billing order
+TOP_CAST = 3
+
+
+def _identity(tokens):
+    return tokens
+
+
+def parse_names(value, limit=None, job=None, casefold=True):
+    """
+    Names from a TMDb JSON list column (genres, keywords, cast, crew)
+
+    Parameters:
+    value (str): JSON list of {"name": ...} objects; anything else gives []
+    limit (int): Keep only the first names (cast is sorted by billing order)
+    job (str): Keep only crew entries with this job, e.g. "Director"
+    casefold (bool): Casefold the names (for matching rather than display)
+
+    Returns:
+    list: Names
+    """
+    if not isinstance(value, str):
+        return []
+    try:
+        entries = json.loads(value)
+    except ValueError:
+        return []
+    if job is not None:
+        entries = [entry for entry in entries if entry.get("job") == job]
+    if entries and "order" in entries[0]:
+        entries = sorted(entries, key=lambda entry: entry.get("order", 0))
+    names = [str(entry["name"]) for entry in entries if entry.get("name")]
+    if casefold:
+        names = [name.casefold() for name in names]
+    return names[:limit]
+
+
+def field_tokens(movies):
+    """
+    Name lists per metadata field, one entry per movie
+
+    Parameters:
+    movies (iterable of dict-like): Rows with genres, keywords, cast and crew
+    columns (missing columns give empty lists)
+
+    Returns:
+    dict: Field name -> list of token lists
+    """
+    tokens = {field: [] for field in FIELDS[1:]}
+    for movie in movies:
+        tokens["genres"].append(parse_names(movie.get("genres")))
+        tokens["keywords"].append(parse_names(movie.get("keywords")))
+        tokens["cast"].append(parse_names(movie.get("cast"), limit=TOP_CAST))
+        tokens["director"].append(parse_names(movie.get("crew"), job="Director"))
+    return tokens
+
+
+def _vectorizer(vocabulary=None):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if vocabulary is not None:
+        vocabulary = {name: col for col, name in enumerate(vocabulary)}
+    return TfidfVectorizer(analyzer=_identity, dtype=np.float32, vocabulary=vocabulary)
+
+
+class FieldFeatures:
+    """
+    Per-field sparse blocks stacked into one matrix
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): [N, total columns], rows L2-normalised per block
+    column_field (numpy.ndarray): Position in FIELDS of every column
+    vocabularies (dict): Metadata field -> names in column order
+    idf (dict): Metadata field -> IDF weight per name
+    """
+
+    def __init__(self, matrix, column_field, vocabularies, idf):
+        self.matrix = matrix
+        self.column_field = column_field
+        self.vocabularies = vocabularies
+        self.idf = idf
+
+    @classmethod
+    def fit(cls, movies, overview_tfidf):
+        """
+        Build the blocks for a catalog
+
+        Parameters:
+        movies (pandas.DataFrame): Catalog rows (see field_tokens)
+        overview_tfidf (scipy.sparse.csr_matrix): Overview block, already fitted
+        """
+        from scipy.sparse import csr_matrix
+
+        tokens = field_tokens(movies.to_dict("records"))
+        blocks, vocabularies, idf = [overview_tfidf], {}, {}
+        for field in FIELDS[1:]:
+            vectorizer = _vectorizer()
+            try:
+                blocks.append(vectorizer.fit_transform(tokens[field]))
+                vocabularies[field] = list(vectorizer.get_feature_names_out())
+                idf[field] = vectorizer.idf_.astype(np.float32)
+            except ValueError:
+                # No names at all for this field (e.g. the credits CSV is missing)
+                blocks.append(csr_matrix((overview_tfidf.shape[0], 0), dtype=np.float32))
+                vocabularies[field] = []
+                idf[field] = np.zeros(0, dtype=np.float32)
+        return cls._stack(blocks, vocabularies, idf)
+
+    @classmethod
+    def _stack(cls, blocks, vocabularies, idf):
+        from scipy.sparse import hstack
+
+        column_field = np.concatenate([
+            np.full(block.shape[1], position, dtype=np.int8) for position, block in enumerate(blocks)
+        ])
+        matrix = hstack(blocks, format="csr", dtype=np.float32)
+        return cls(matrix, column_field, vocabularies, idf)
+
+    def transform(self, movies, overview_tfidf):
+        """
+        Feature rows for new movies, using the fitted vocabularies
+
+        Returns:
+        scipy.sparse.csr_matrix: Rows to append to self.matrix
+        """
+        from scipy.sparse import csr_matrix
+
+        tokens = field_tokens(movies)
+        blocks = [overview_tfidf]
+        for field in FIELDS[1:]:
+            if not self.vocabularies[field]:
+                blocks.append(csr_matrix((overview_tfidf.shape[0], 0), dtype=np.float32))
+                continue
+            vectorizer = _vectorizer(self.vocabularies[field])
+            vectorizer.idf_ = np.asarray(self.idf[field], dtype=np.float64)
+            blocks.append(vectorizer.transform(tokens[field]))
+        return self._stack(blocks, self.vocabularies, self.idf).matrix
+
+    def arrays(self):
+        """Arrays to persist alongside the model (see from_arrays)."""
+        arrays = {
+            "data": self.matrix.data,
+            "indices": self.matrix.indices,
+            # Same dtype as indices so scipy can wrap the memmaps without copying
+            "indptr": self.matrix.indptr.astype(self.matrix.indices.dtype),
+            "column_field": self.column_field,
+        }
+        for field in FIELDS[1:]:
+            arrays[f"vocabulary_{field}"] = np.asarray(self.vocabularies[field], dtype=str)
+            arrays[f"idf_{field}"] = self.idf[field]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, n_rows):
+        from scipy.sparse import csr_matrix
+
+        matrix = csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=(n_rows, len(arrays["column_field"])),
+            copy=False,
+        )
+        vocabularies = {field: arrays[f"vocabulary_{field}"].tolist() for field in FIELDS[1:]}
+        idf = {field: arrays[f"idf_{field}"] for field in FIELDS[1:]}
+        return cls(matrix, arrays["column_field"], vocabularies, idf)
+
+    def column_weights(self, weights=None):
+        """
+        Scale of every column for the given field weights, normalised to sum to 1
+
+        Parameters:
+        weights (dict): Field -> non-negative weight; missing fields use
+        DEFAULT_WEIGHTS, and all-zero weights fall back to the defaults
+        """
+        merged = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        values = np.array([max(0.0, float(merged[field])) for field in FIELDS], dtype=np.float32)
+        if values.sum() == 0:
+            values = np.array([DEFAULT_WEIGHTS[field] for field in FIELDS], dtype=np.float32)
+        return (values / values.sum())[self.column_field]
+
+    def weighted_matrix(self, weights=None):
+        """
+        The matrix with columns scaled by sqrt(weight), so that M @ M.T gives
+        the weighted scores; used to precompute a neighbour table.
+        """
+        scale = np.sqrt(self.column_weights(weights))
+        matrix = self.matrix.copy()
+        matrix.data = matrix.data * scale[matrix.indices]
+        return matrix
+
+    def scores(self, row, weights=None):
+        """Weighted similarity of one movie against every movie (one sparse product)."""
+        query = self.matrix[row]
+        query.data = query.data * self.column_weights(weights)[query.indices]
+        return np.asarray((self.matrix @ query.T).todense(), dtype=np.float32).ravel()
+
+    def seed_scores(self, rows, seed_weights, weights=None, candidates=None):
+        """
+        Weighted sum of several movies' scores (see similarity.seed_scores)
+
+        Parameters:
+        rows (array-like): Seed row positions
+        seed_weights (array-like): Weight per seed (negative to push results away)
+        weights (dict): Field weights, as for scores()
+        candidates (array-like): Only score these rows (default: every row)
+        """
+        query = self.matrix[rows].T @ np.asarray(seed_weights, dtype=np.float32)
+        query *= self.column_weights(weights)
+        target = self.matrix if candidates is None else self.matrix[candidates]
+        return np.asarray(target @ query, dtype=np.float32).ravel()
+
+    def top_k_for_row(self, row, k, weights=None, exclude_self=True):
+        """
+        The k movies most similar to row under the given field weights
+
+        Returns:
+        tuple: (indices, scores) as numpy arrays, best first
+        """
+        scores = self.scores(row, weights)
+        if exclude_self:
+            scores[row] = -np.inf
+        best = similarity.top_k(scores, k)
+        return best, scores[best]
+
+    def nbytes(self):
+        return similarity.sparse_nbytes(self.matrix)
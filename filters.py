@@ -0,0 +1,288 @@
+"""
+Precomputed indexes for filtered recommendations.
+
+Filters use metadata already in tmdb_5000_movies.csv:
+
+- release year, runtime and vote count have sorted-column indexes (the
+  rows ordered by value), so a range is two binary searches and one
+  scatter of the matching rows;
+- genres are a bitmap index, one bit per genre in a uint64 per movie;
+- the original language is a small integer code per movie.
+
+All conditions are combined into one boolean candidate mask. When enough
+of a movie's precomputed neighbours pass it, they are the answer;
+otherwise only the passing movies are scored before top-K selection. A
+filtered query always returns a full page, but a selective filter costs up
+to one scan of the catalog (like asking for more than TOP_K results)
+rather than a table lookup.
+
+    filters = {"year": (1990, 2005), "genres": ["Action"], "languages": ["en"],
+               "runtime": (90, 150), "min_votes": 100}
+"""
+import numbers
+
+import numpy as np
+
+from features import parse_names
+
+RANGE_COLUMNS = ("year", "runtime", "vote_count")
+# Filter keys accepted by FilterIndex.mask()
+FILTER_KEYS = ("year", "runtime", "min_votes", "genres", "languages")
+# Genres beyond this many (TMDb has 19) are not indexed
+MAX_GENRES = 64
+
+
+def release_year(value):
+    """Year of a "YYYY-MM-DD" release date, or NaN."""
+    try:
+        return float(str(value)[:4])
+    except ValueError:
+        return np.nan
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value
+
+
+class FilterError(ValueError):
+    """Filters that are malformed: an unknown name or a value of the wrong type."""
+
+
+def _bound(name, value):
+    if value is not None and (isinstance(value, bool) or not isinstance(value, numbers.Real)):
+        raise FilterError(f"{name} bounds must be numbers or null, got {value!r}")
+
+
+def _check_filter(name, value):
+    """Raise FilterError unless value has the shape mask() expects for filter name."""
+    if name in ("year", "runtime"):
+        if isinstance(value, (str, bytes)) or not isinstance(value, (list, tuple)) or len(value) != 2:
+            raise FilterError(f"{name} filter must be a (low, high) pair, got {value!r}")
+        for bound in value:
+            _bound(name, bound)
+    elif name == "min_votes":
+        _bound(name, value)
+    elif isinstance(value, (str, bytes)) or not isinstance(value, (list, tuple, set)):
+        raise FilterError(f"{name} filter must be a list of names, got {value!r}")
+    elif not all(isinstance(item, str) for item in value):
+        raise FilterError(f"{name} filter must only contain strings, got {value!r}")
+
+
+def normalize_filters(filters):
+    """
+    Validated, canonical form of the active filters
+
+    Filters that select the same movies get equal forms, so the result can
+    key a cache: ranges become (low, high) tuples in the order given, genres
+    (casefolded) and languages become sorted tuples, and empty values are
+    dropped.
+
+    Parameters:
+    filters (dict): As for FilterIndex.mask, or None
+
+    Returns:
+    dict: The active filters; empty if none restrict anything
+
+    Raises:
+    FilterError: On an unknown filter name or a value of the wrong type
+    (e.g. a single string for genres, a year that is not a pair)
+    """
+    if filters is not None and not isinstance(filters, dict):
+        raise FilterError(f"filters must be a dict, got {type(filters).__name__}")
+    unknown = set(filters or {}) - set(FILTER_KEYS)
+    if unknown:
+        raise FilterError(f"unknown filters {sorted(unknown)}, expected any of {FILTER_KEYS}")
+    active = {}
+    for name, value in (filters or {}).items():
+        if value is None or isinstance(value, (str, list, tuple, set)) and len(value) == 0:
+            continue
+        _check_filter(name, value)
+        if name in ("year", "runtime"):
+            value = tuple(value)
+        elif name == "genres":
+            value = tuple(sorted({genre.casefold() for genre in value}))
+        elif name == "languages":
+            value = tuple(sorted(set(value)))
+        active[name] = value
+    return active
+
+
+class FilterIndex:
+    """
+    Filterable metadata of every movie, with its indexes
+
+    Parameters:
+    values (dict): "year" and "runtime" (float32, NaN if unknown) and
+    "vote_count" (int32) per movie
+    orders (dict): Same keys -> row positions sorted by value (NaN last)
+    languages (list): Language codes, indexed by language_codes
+    language_codes (numpy.ndarray): int16 code per movie, -1 if unknown
+    genres (list): Genre names, indexed by bit position
+    genre_bits (numpy.ndarray): uint64 genre bitmap per movie
+    """
+
+    def __init__(self, values, orders, languages, language_codes, genres, genre_bits):
+        self.values = values
+        self.orders = orders
+        self.languages = languages
+        self.language_codes = language_codes
+        self.genres = genres
+        self.genre_bits = genre_bits
+
+    @classmethod
+    def build(cls, movies, languages=(), genres=()):
+        """
+        Index a catalog
+
+        Parameters:
+        movies (iterable of dict-like): Rows with release_date, runtime,
+        vote_count, original_language and genres (TMDb JSON) columns
+        languages, genres (list): Known vocabularies to extend (keeps codes stable)
+        """
+        languages, genres = list(languages), list(genres)
+        language_index = {code: i for i, code in enumerate(languages)}
+        genre_index = {name.casefold(): i for i, name in enumerate(genres)}
+        year, runtime, votes, codes, bits = [], [], [], [], []
+        for movie in movies:
+            year.append(release_year(movie.get("release_date")))
+            runtime.append(_number(movie.get("runtime")))
+            count = _number(movie.get("vote_count"))
+            votes.append(0 if np.isnan(count) else count)
+            language = movie.get("original_language")
+            if isinstance(language, str) and language:
+                if language not in language_index:
+                    language_index[language] = len(languages)
+                    languages.append(language)
+                codes.append(language_index[language])
+            else:
+                codes.append(-1)
+            mask = 0
+            for name in parse_names(movie.get("genres"), casefold=False):
+                key = name.casefold()
+                if key not in genre_index and len(genres) < MAX_GENRES:
+                    genre_index[key] = len(genres)
+                    genres.append(name)
+                if key in genre_index:
+                    mask |= 1 << genre_index[key]
+            bits.append(mask)
+        values = {
+            "year": np.asarray(year, dtype=np.float32),
+            "runtime": np.asarray(runtime, dtype=np.float32),
+            "vote_count": np.asarray(votes, dtype=np.int32),
+        }
+        return cls._from_values(values, languages, np.asarray(codes, dtype=np.int16),
+                                genres, np.asarray(bits, dtype=np.uint64))
+
+    @classmethod
+    def _from_values(cls, values, languages, language_codes, genres, genre_bits):
+        orders = {name: np.argsort(values[name], kind="stable").astype(np.int32) for name in RANGE_COLUMNS}
+        return cls(values, orders, languages, language_codes, genres, genre_bits)
+
+    def __len__(self):
+        return len(self.genre_bits)
+
+    def select(self, rows):
+        """Index of a subset of the movies, in the given row order."""
+        values = {name: np.asarray(column)[rows] for name, column in self.values.items()}
+        return self._from_values(values, self.languages, np.asarray(self.language_codes)[rows],
+                                 self.genres, np.asarray(self.genre_bits)[rows])
+
+    def extend(self, movies):
+        """Index with the given movies appended (new genres and languages are added)."""
+        added = self.build(movies, self.languages, self.genres)
+        values = {name: np.concatenate([self.values[name], added.values[name]]) for name in RANGE_COLUMNS}
+        return self._from_values(
+            values,
+            added.languages,
+            np.concatenate([self.language_codes, added.language_codes]),
+            added.genres,
+            np.concatenate([self.genre_bits, added.genre_bits]),
+        )
+
+    def arrays(self):
+        """Arrays to persist alongside the model (see from_arrays)."""
+        arrays = {"language_codes": self.language_codes, "genre_bits": self.genre_bits,
+                  "languages": np.asarray(self.languages, dtype=str), "genres": np.asarray(self.genres, dtype=str)}
+        for name in RANGE_COLUMNS:
+            arrays[f"values_{name}"] = self.values[name]
+            arrays[f"order_{name}"] = self.orders[name]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(
+            {name: arrays[f"values_{name}"] for name in RANGE_COLUMNS},
+            {name: arrays[f"order_{name}"] for name in RANGE_COLUMNS},
+            arrays["languages"].tolist(),
+            arrays["language_codes"],
+            arrays["genres"].tolist(),
+            arrays["genre_bits"],
+        )
+
+    def range_rows(self, name, low=None, high=None):
+        """Rows whose value lies in [low, high] (None is unbounded), via the sorted column."""
+        order = self.orders[name]
+        column = self.values[name]
+        # Unknown (NaN) values sort last and never match a range
+        known = len(order) - int(np.isnan(column).sum()) if column.dtype.kind == "f" else len(order)
+        sorted_values = column[order[:known]]
+        start = 0 if low is None else int(np.searchsorted(sorted_values, low, side="left"))
+        stop = known if high is None else int(np.searchsorted(sorted_values, high, side="right"))
+        return order[start:stop]
+
+    def options(self):
+        """Values to offer in a filter UI: genres, languages (most common first) and ranges."""
+        counts = np.bincount(self.language_codes[self.language_codes >= 0], minlength=len(self.languages))
+        ranges = {}
+        for name in ("year", "runtime"):
+            known = self.values[name][~np.isnan(self.values[name])]
+            ranges[name] = (int(known.min()), int(known.max())) if len(known) else (0, 0)
+        return {
+            "genres": sorted(self.genres),
+            "languages": [self.languages[i] for i in np.argsort(-counts, kind="stable")],
+            **ranges,
+        }
+
+    def mask(self, filters):
+        """
+        Candidate mask for a set of filters
+
+        Parameters:
+        filters (dict): Any of "year" and "runtime" ((low, high), either end
+        None for unbounded), "min_votes" (int), "genres" (movies with any of
+        these) and "languages" (movies in any of these); empty values are ignored
+
+        Returns:
+        numpy.ndarray or None: Boolean mask over the movies, or None if no
+        filter is active
+
+        Raises:
+        FilterError: On an invalid filter (see normalize_filters)
+        """
+        filters = normalize_filters(filters)
+        if not filters:
+            return None
+        mask = np.ones(len(self), dtype=bool)
+        for name in ("year", "runtime"):
+            if name in filters:
+                low, high = filters[name]
+                matching = np.zeros(len(self), dtype=bool)
+                matching[self.range_rows(name, low, high)] = True
+                mask &= matching
+        if "min_votes" in filters:
+            matching = np.zeros(len(self), dtype=bool)
+            matching[self.range_rows("vote_count", filters["min_votes"])] = True
+            mask &= matching
+        if "genres" in filters:
+            wanted = set(filters["genres"])
+            bits = sum(1 << i for i, name in enumerate(self.genres) if name.casefold() in wanted)
+            mask &= (self.genre_bits & np.uint64(bits)) != 0
+        if "languages" in filters:
+            wanted = set(filters["languages"])
+            codes = [i for i, code in enumerate(self.languages) if code in wanted]
+            mask &= np.isin(self.language_codes, codes)
+        return mask
@@ -0,0 +1,105 @@
+"""
+Load test for the recommendation API (service.py).
+
+Keeps --concurrency persistent HTTP connections busy for --duration seconds
+with GET /recommend requests for random seed titles, then reports the
+throughput and the latency distribution. Only the standard library is used,
+so it runs anywhere the service does.
+
+    python loadtest.py --url http://127.0.0.1:8000 --concurrency 32 --duration 10
+    python loadtest.py --titles seeds.txt --path /search   # title search instead
+"""
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+DEFAULT_TITLES = ["Inception", "The Dark Knight", "Interstellar", "The Matrix",
+                  "Pulp Fiction", "Avatar", "Titanic", "The Godfather"]
+
+
+def _worker(url, path, titles, deadline, latencies, errors, seed):
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    key = "q" if path == "/search" else "title"
+    while time.perf_counter() < deadline:
+        target = f"{path}?{urlencode({key: rng.choice(titles)})}"
+        start = time.perf_counter()
+        try:
+            connection.request("GET", target)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status < 500
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            ok = False
+        latencies.append(time.perf_counter() - start)
+        if not ok:
+            errors.append(1)
+    connection.close()
+
+
+def run(url, path="/recommend", titles=DEFAULT_TITLES, concurrency=16, duration=10.0):
+    """
+    Drive the service and measure it
+
+    Returns:
+    dict: requests, errors, req_per_s and p50/p90/p99 latencies in ms
+    """
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(url, path, titles, deadline, latencies, errors, i), daemon=True)
+        for i in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    millis = np.asarray(latencies) * 1000
+    return {
+        "path": path,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        **{f"p{q}_ms": round(float(np.percentile(millis, q)), 2) if len(millis) else None for q in (50, 90, 99)},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the Movie Buddy recommendation API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--path", default="/recommend", choices=("/recommend", "/search"))
+    parser.add_argument("--titles", help="file with one seed title per line (default: the sample movies)")
+    parser.add_argument("--concurrency", type=int, default=16, help="parallel connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    titles = DEFAULT_TITLES
+    if args.titles:
+        with open(args.titles, encoding="utf-8") as fh:
+            titles = [line.strip() for line in fh if line.strip()]
+    result = run(args.url, args.path, titles, args.concurrency, args.duration)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['requests']:,} requests ({result['errors']} errors) in {args.duration:.0f}s: "
+              f"{result['req_per_s']:,.1f} req/s, p50={result['p50_ms']}ms "
+              f"p90={result['p90_ms']}ms p99={result['p99_ms']}ms")
+    return 1 if result["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""
+Compact columnar storage for per-movie metadata.
+
+Result cards only need a few fields per movie (title, overview, poster
+path, plus numeric fields such as the id and vote count), so the model
+keeps them as columns instead of a DataFrame:
+
+- numeric fields are fixed-width NumPy arrays (col_<name>.npy, see
+  recommender.NUMERIC_COLUMNS);
+- each text field is a TextColumn: one concatenated UTF-8 buffer plus an
+  int64 offsets array (text_<name>_data.npy, text_<name>_offsets.npy).
+
+Both are memory-mapped from the model directory, so reading movie i is two
+offset lookups and one decode, nothing is parsed at load time, and every
+process on a host shares the same pages. A 1M-title catalog holds its text
+in about one byte per character plus 8 bytes per movie, instead of a
+Python str object (~50 bytes of overhead) per field per movie in each
+process.
+"""
+import numpy as np
+
+
+class TextColumn:
+    """
+    Strings of one text field, indexed by row
+
+    Parameters:
+    data (numpy.ndarray): uint8 buffer of the concatenated UTF-8 strings
+    offsets (numpy.ndarray): int64 [n + 1]; string i is data[offsets[i]:offsets[i + 1]]
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+        # Plain views: slicing np.memmap subclasses is several times slower
+        self._buffer = memoryview(np.asarray(data).view(np.ndarray)).cast("B")
+        self._offsets = np.asarray(offsets).view(np.ndarray)
+        self._count = len(self._offsets) - 1
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Column of the given strings; None (a missing value) is stored as ""."""
+        encoded = [(value or "").encode("utf-8") for value in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(*row.indices(len(self)))]
+        if row < 0:
+            row += self._count
+        if not 0 <= row < self._count:
+            raise IndexError(f"row {row} out of range for {self._count} strings")
+        start, end = self._offsets[row], self._offsets[row + 1]
+        return str(self._buffer[start:end], "utf-8")
+
+    def take(self, rows):
+        """
+        Strings at many rows at once (e.g. a page of results)
+
+        The bytes are gathered in one vectorised step and decoded in one go
+        when they are ASCII, which is several times faster than indexing
+        row by row.
+
+        Parameters:
+        rows (array-like): Non-negative row positions
+
+        Returns:
+        list: One str per row
+        """
+        column = self.select(rows)
+        data = column.data.tobytes()
+        bounds = column.offsets.tolist()
+        if column.data.size and column.data.max() >= 0x80:
+            return [data[start:end].decode("utf-8") for start, end in zip(bounds, bounds[1:])]
+        # ASCII: byte offsets are character offsets
+        text = data.decode("ascii")
+        return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def __iter__(self):
+        data = bytes(self._buffer)
+        bounds = self._offsets.tolist()
+        for start, end in zip(bounds, bounds[1:]):
+            yield data[start:end].decode("utf-8")
+
+    def tolist(self):
+        return list(self)
+
+    def select(self, rows):
+        """Column of a subset of the rows, in the given order (no decoding)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self._offsets[rows]
+        lengths = self._offsets[rows + 1] - starts
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Byte positions to gather: each selected string's start, then consecutive bytes
+        positions = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1], dtype=np.int64)
+        return TextColumn(np.asarray(self.data)[positions], offsets)
+
+    def extend(self, strings):
+        """Column with the given strings appended."""
+        added = self.from_strings(strings)
+        return TextColumn(np.concatenate([self.data, added.data]),
+                          np.concatenate([self._offsets, added.offsets[1:] + self._offsets[-1]]))
+
+    def arrays(self):
+        """Arrays to persist alongside the model (see from_arrays)."""
+        return {"data": self.data, "offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["data"], arrays["offsets"])
+
+    def nbytes(self):
+        return int(self.data.nbytes + self.offsets.nbytes)
+
+
+def as_text_column(values):
+    """A TextColumn for values, which may already be one."""
+    return values if isinstance(values, TextColumn) else TextColumn.from_strings(values)
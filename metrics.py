@@ -0,0 +1,209 @@
+"""
+Lightweight instrumentation: timing spans, counters and a metrics snapshot.
+
+Disabled unless MOVIE_BUDDY_METRICS=1. When disabled, @timed returns the
+function unchanged and span()/count() return immediately, so the hot paths
+pay nothing beyond a global lookup. When enabled:
+
+- span(name) / @timed(name) record durations into fixed-bucket histograms
+  (and into the current thread's trace, for the app's debug panel)
+- count(name) increments a counter (e.g. TMDb errors)
+- collectors registered with register_collector() contribute existing
+  counters (TMDb and response cache hits/misses, scheduler stats) at
+  snapshot time
+
+snapshot() returns everything as a dict (JSON) and prometheus_text() in the
+Prometheus text exposition format (served by service.py on /metrics).
+"""
+import bisect
+import contextlib
+import functools
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("MOVIE_BUDDY_METRICS", "") not in ("", "0", "false")
+PREFIX = "movie_buddy"
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+_collectors = {}
+
+
+class _Local(threading.local):
+    # Class defaults: a missing thread-local attribute is slow to look up
+    depth = 0
+    trace = None
+
+
+_local = _Local()
+_noop = contextlib.nullcontext()
+
+
+class _Histogram:
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        """Upper bucket bound below which a share q of the observations fall."""
+        target, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS, self.buckets):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+def observe(name, seconds):
+    """Record one duration for name."""
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = _Histogram()
+        histogram.observe(seconds)
+    trace = _local.trace
+    if trace is not None:
+        trace.append((name, seconds, _local.depth))
+
+
+class _Span:
+    __slots__ = ("name", "start", "depth")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.depth = _local.depth
+        _local.depth = self.depth + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        _local.depth = self.depth
+        observe(self.name, elapsed)
+        return False
+
+
+def span(name):
+    """Context manager timing its block as name (a no-op when disabled)."""
+    if not ENABLED:
+        return _noop
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator timing every call as name; returns the function unchanged when disabled."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        # Inlined span: decorated functions are the hot paths
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            depth = _local.depth
+            _local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                _local.depth = depth
+                observe(name, elapsed)
+        return wrapper
+    return decorate
+
+
+def count(name, amount=1):
+    """Increment a counter (a no-op when disabled)."""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def register_collector(name, fn):
+    """Add fn() -> {metric: number} to every snapshot under name."""
+    _collectors[name] = fn
+
+
+# --- Per-request traces ---
+def begin_trace():
+    """Start collecting the spans recorded by this thread (e.g. one Streamlit rerun)."""
+    if ENABLED:
+        _local.trace = []
+
+
+def trace():
+    """
+    Spans recorded by this thread since begin_trace()
+
+    Returns:
+    list: (name, seconds, depth) in completion order; empty when disabled
+    """
+    return list(_local.trace or [])
+
+
+# --- Export ---
+def snapshot():
+    """
+    Every metric as plain data
+
+    Returns:
+    dict: "spans" (name -> count, sum_s, p50_s, p99_s), "counters" and one
+    entry per collector
+    """
+    with _lock:
+        spans = {
+            name: {"count": h.count, "sum_s": round(h.sum, 6), "p50_s": h.quantile(0.5), "p99_s": h.quantile(0.99)}
+            for name, h in _histograms.items()
+        }
+        counters = dict(_counters)
+    result = {"enabled": ENABLED, "spans": spans, "counters": counters}
+    for name, fn in _collectors.items():
+        result[name] = {key: value for key, value in fn().items() if isinstance(value, (int, float))}
+    return result
+
+
+def _metric_name(*parts):
+    return "_".join([PREFIX, *parts]).replace(".", "_").replace("-", "_")
+
+
+def prometheus_text():
+    """All metrics in the Prometheus text exposition format."""
+    lines = [f"# TYPE {PREFIX}_span_seconds histogram"]
+    with _lock:
+        histograms = {name: (list(h.buckets), h.sum, h.count) for name, h in _histograms.items()}
+        counters = dict(_counters)
+    for name, (buckets, total, n) in sorted(histograms.items()):
+        cumulative = 0
+        for bound, value in zip((*BUCKETS, "+Inf"), buckets):
+            cumulative += value
+            lines.append(f'{PREFIX}_span_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{PREFIX}_span_seconds_sum{{span="{name}"}} {total}')
+        lines.append(f'{PREFIX}_span_seconds_count{{span="{name}"}} {n}')
+    for name, value in sorted(counters.items()):
+        metric = _metric_name(name, "total")
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    for collector, fn in sorted(_collectors.items()):
+        for key, value in sorted(fn().items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metric = _metric_name(collector, key)
+                lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
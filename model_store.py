@@ -0,0 +1,214 @@
+"""
+On-disk artifact format for the fitted recommender model.
+
+A model directory looks like this:
+
+    manifest.json        format version, model version, shapes, dataset fingerprint
+    vocabulary.json      TF-IDF terms in column order
+    idf.npy              IDF weight per term
+    tfidf_data.npy       CSR components of the TF-IDF matrix
+    tfidf_indices.npy
+    tfidf_indptr.npy
+    neighbors.npy        precomputed top-K neighbour rows (int32)
+    neighbor_scores.npy  matching similarity scores (float16)
+    col_<name>.npy       numeric metadata columns (id, vote_count, ...)
+    text_<name>_*.npy    text columns (title, overview, poster_path, ...) as a UTF-8
+                         buffer (_data) plus string offsets (_offsets), see metadata.TextColumn
+    ann_<name>.npy       approximate search index, if one was built (see ann.IVFIndex)
+    emb_<name>.npy       quantised dense embeddings, if built (see embeddings.Embeddings)
+    field_<name>.npy     multi-field feature blocks, if built (see features.FieldFeatures)
+    filter_<name>.npy    year/runtime/vote/genre/language filter indexes (see filters.FilterIndex)
+
+Arrays are opened with np.load(mmap_mode="r"), so every Streamlit worker on
+a host shares the same pages through the OS page cache instead of refitting
+and holding its own copy.
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+from metadata import TextColumn, as_text_column
+
+# Bump whenever the layout above changes; older artifacts are then ignored
+FORMAT_VERSION = 4
+
+MANIFEST = "manifest.json"
+
+
+def model_version(fingerprint, params):
+    """Stable identifier for a model built from the given data and parameters."""
+    payload = json.dumps({"format": FORMAT_VERSION, "data": fingerprint, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _write_json(path, value):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(value, fh, ensure_ascii=False)
+
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_model(path, vocabulary, idf, tfidf, texts, columns,
+               neighbors, neighbor_scores, fingerprint, params, ann=None, embeddings=None,
+               fields=None, filters=None, catalog=None):
+    """
+    Write a complete model directory
+
+    The directory is assembled next to its destination and swapped in with a
+    rename, so readers never observe a half-written model.
+
+    Parameters:
+    path (str): Destination directory
+    vocabulary (list): Terms in TF-IDF column order
+    idf (numpy.ndarray): IDF weight per term
+    tfidf (scipy.sparse.csr_matrix): L2-normalised TF-IDF rows
+    texts (dict): Text columns, name -> TextColumn or list of str (None for missing values)
+    columns (dict): Numeric metadata columns, name -> numpy array
+    neighbors, neighbor_scores (numpy.ndarray): Precomputed top-K table
+    fingerprint (dict): Dataset fingerprint of the source CSVs
+    params (dict): Build parameters (e.g. K) that affect the model version
+    ann (dict): Arrays of an approximate search index, name -> numpy array (optional)
+    embeddings (dict): Arrays of the dense embeddings, name -> numpy array (optional)
+    fields (dict): Arrays of the multi-field feature blocks, name -> numpy array (optional)
+    filters (dict): Arrays of the filter indexes, name -> numpy array
+    catalog (dict): Incremental-update bookkeeping (IDF drift, refit due), see catalog.py
+
+    Returns:
+    dict: The written manifest
+    """
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    _write_json(os.path.join(tmp_path, "vocabulary.json"), list(vocabulary))
+    np.save(os.path.join(tmp_path, "idf.npy"), np.asarray(idf, dtype=np.float32))
+    np.save(os.path.join(tmp_path, "tfidf_data.npy"), tfidf.data.astype(np.float32))
+    # indices and indptr share one dtype so scipy can wrap the memmaps without copying
+    index_dtype = np.int32 if tfidf.nnz < np.iinfo(np.int32).max else np.int64
+    np.save(os.path.join(tmp_path, "tfidf_indices.npy"), tfidf.indices.astype(index_dtype))
+    np.save(os.path.join(tmp_path, "tfidf_indptr.npy"), tfidf.indptr.astype(index_dtype))
+    np.save(os.path.join(tmp_path, "neighbors.npy"), np.asarray(neighbors, dtype=np.int32))
+    np.save(os.path.join(tmp_path, "neighbor_scores.npy"), np.asarray(neighbor_scores, dtype=np.float16))
+    for name, values in columns.items():
+        np.save(os.path.join(tmp_path, f"col_{name}.npy"), np.asarray(values))
+    for name, values in texts.items():
+        for part, array in as_text_column(values).arrays().items():
+            np.save(os.path.join(tmp_path, f"text_{name}_{part}.npy"), np.asarray(array))
+    for name, values in (ann or {}).items():
+        np.save(os.path.join(tmp_path, f"ann_{name}.npy"), np.asarray(values))
+    for name, values in (embeddings or {}).items():
+        np.save(os.path.join(tmp_path, f"emb_{name}.npy"), np.asarray(values))
+    for name, values in (fields or {}).items():
+        np.save(os.path.join(tmp_path, f"field_{name}.npy"), np.asarray(values))
+    for name, values in (filters or {}).items():
+        np.save(os.path.join(tmp_path, f"filter_{name}.npy"), np.asarray(values))
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_version": model_version(fingerprint, params),
+        "created_at": time.time(),
+        "n_movies": int(tfidf.shape[0]),
+        "n_terms": int(tfidf.shape[1]),
+        "columns": sorted(columns),
+        "texts": sorted(texts),
+        "ann": sorted(ann or {}),
+        "embeddings": sorted(embeddings or {}),
+        "fields": sorted(fields or {}),
+        "filters": sorted(filters or {}),
+        "params": params,
+        "fingerprint": fingerprint,
+        "catalog": catalog or {},
+    }
+    _write_json(os.path.join(tmp_path, MANIFEST), manifest)
+
+    old_path = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path):
+    """Return the manifest of a model directory, or None if it is missing or unreadable."""
+    try:
+        manifest = _read_json(os.path.join(path, MANIFEST))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def load_model(path, mmap_mode="r"):
+    """
+    Open a model directory written by save_model()
+
+    Parameters:
+    path (str): Model directory
+    mmap_mode (str or None): Passed to np.load; "r" shares pages between processes
+
+    Returns:
+    dict or None: Model components, or None if there is no compatible model at path
+    """
+    from scipy.sparse import csr_matrix
+
+    manifest = read_manifest(path)
+    if manifest is None:
+        return None
+
+    def array(name):
+        return np.load(os.path.join(path, name), mmap_mode=mmap_mode)
+
+    tfidf = csr_matrix(
+        (array("tfidf_data.npy"), array("tfidf_indices.npy"), array("tfidf_indptr.npy")),
+        shape=(manifest["n_movies"], manifest["n_terms"]),
+        copy=False,
+    )
+    return {
+        "manifest": manifest,
+        "vocabulary": _read_json(os.path.join(path, "vocabulary.json")),
+        "idf": array("idf.npy"),
+        "tfidf": tfidf,
+        "neighbors": array("neighbors.npy"),
+        "neighbor_scores": array("neighbor_scores.npy"),
+        "columns": {name: array(f"col_{name}.npy") for name in manifest["columns"]},
+        "texts": {
+            name: TextColumn(array(f"text_{name}_data.npy"), array(f"text_{name}_offsets.npy"))
+            for name in manifest["texts"]
+        },
+        "ann": {name: array(f"ann_{name}.npy") for name in manifest.get("ann", [])} or None,
+        "embeddings": {name: array(f"emb_{name}.npy") for name in manifest.get("embeddings", [])} or None,
+        "fields": {name: array(f"field_{name}.npy") for name in manifest.get("fields", [])} or None,
+        "filters": {name: array(f"filter_{name}.npy") for name in manifest["filters"]},
+    }
+
+
+def make_vectorizer(vocabulary=None):
+    """The TF-IDF vectorizer configuration shared by fitting and loading."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    if vocabulary is not None:
+        vocabulary = {term: col for col, term in enumerate(vocabulary)}
+    return TfidfVectorizer(stop_words="english", dtype=np.float32, vocabulary=vocabulary)
+
+
+def load_vectorizer(vocabulary, idf):
+    """
+    Rebuild a fitted TfidfVectorizer from stored vocabulary and IDF weights
+
+    Returns:
+    sklearn.feature_extraction.text.TfidfVectorizer: Ready for transform()
+    """
+    vectorizer = make_vectorizer(vocabulary)
+    vectorizer.idf_ = np.asarray(idf, dtype=np.float64)
+    return vectorizer
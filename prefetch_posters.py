@@ -0,0 +1,145 @@
+"""
+Resolve poster paths and key details for the whole catalog once, offline.
+
+Looks up every TMDb id in tmdb_5000_movies.csv via /movie/{id} and writes
+tmdb_5000_posters.csv (id, poster_path, backdrop_path, overview,
+release_date, vote_average, runtime) next to the dataset. The recommender
+merges that file into its model, so the UI can build poster URLs without
+any TMDb call at request time; the details fill gaps in the dataset's own
+columns.
+
+The job is rate-limited (through the shared TMDb scheduler, which also
+honours Retry-After) and resumable: every answer is appended to a JSONL
+checkpoint as it arrives, and a rerun skips ids already in the checkpoint.
+Transient failures are not checkpointed and are retried on the next run.
+
+    TMDB_API_KEY=... python prefetch_posters.py [--rate 20] [--workers 4]
+    python recommender.py build-index     # pick up the new column
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+import recommender
+import tmdb_http
+
+CHECKPOINT = recommender.POSTERS_CSV.replace(".csv", ".jsonl")
+DETAIL_FIELDS = ("overview", "release_date", "vote_average", "runtime")
+FIELDS = ("id", "poster_path", "backdrop_path") + DETAIL_FIELDS
+
+
+def read_checkpoint(path=CHECKPOINT):
+    """Results fetched by earlier runs, keyed by TMDb id."""
+    done = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write leaves a partial last line
+                    continue
+                if all(field in record for field in FIELDS):
+                    # Older runs stored only the paths; those ids are fetched again
+                    done[record["id"]] = record
+    return done
+
+
+def fetch_details(movie_id, api_key):
+    """
+    Poster paths and key details for one movie
+
+    Returns:
+    dict or None: Record to checkpoint, or None after a transient failure
+    """
+    try:
+        data = tmdb_http.get_json(f"/movie/{movie_id}", {"api_key": api_key}, cache=False)
+    except requests.HTTPError as exc:
+        if exc.response is not None and exc.response.status_code == 404:
+            # Permanently missing: record it so reruns do not ask again
+            return {"id": movie_id, **dict.fromkeys(FIELDS[1:])}
+        return None
+    except (requests.RequestException, ValueError):
+        return None
+    # TMDb reports unknown values as "" or 0 (e.g. the runtime of an unreleased film)
+    return {"id": movie_id, **{field: data.get(field) or None for field in FIELDS[1:]}}
+
+
+def write_posters_csv(records, path=recommender.POSTERS_CSV):
+    """Write the checkpointed results as the CSV the recommender merges in."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=FIELDS)
+        writer.writeheader()
+        for movie_id in sorted(records):
+            record = records[movie_id]
+            writer.writerow({field: "" if record.get(field) is None else record[field] for field in FIELDS})
+    os.replace(tmp_path, path)
+
+
+def prefetch(api_key, rate=20.0, workers=4, limit=None):
+    """
+    Fetch poster paths and details for every catalog id not yet in the checkpoint
+
+    Parameters:
+    api_key (str): TMDb API key
+    rate (float): Maximum requests per second
+    workers (int): Concurrent requests
+    limit (int): Stop after this many new ids (None for all)
+
+    Returns:
+    tuple: (number fetched this run, number still missing)
+    """
+    import pandas as pd
+
+    ids = pd.read_csv(recommender.MOVIES_CSV, usecols=["id"])["id"].astype(int).tolist()
+    done = read_checkpoint(CHECKPOINT)
+    todo = [movie_id for movie_id in ids if movie_id not in done][:limit]
+    # Batch jobs queue for as long as the rate limit requires instead of giving up
+    tmdb_http.configure_rate_limit(rate, burst=workers, max_queue_wait=None)
+    fetched = 0
+
+    with open(CHECKPOINT, "a", encoding="utf-8") as checkpoint, ThreadPoolExecutor(workers) as pool:
+        results = pool.map(lambda movie_id: fetch_details(movie_id, api_key), todo)
+        for record in results:
+            if record is None:
+                continue
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+            done[record["id"]] = record
+            fetched += 1
+            if fetched % 100 == 0:
+                print(f"  {fetched}/{len(todo)} fetched", file=sys.stderr)
+
+    write_posters_csv({movie_id: done[movie_id] for movie_id in ids if movie_id in done}, recommender.POSTERS_CSV)
+    return fetched, sum(1 for movie_id in ids if movie_id not in done)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prefetch TMDb poster paths and details for the whole catalog")
+    parser.add_argument("--api-key", default=os.environ.get("TMDB_API_KEY"), help="TMDb API key (default: $TMDB_API_KEY)")
+    parser.add_argument("--api-base", help="TMDb API base URL, e.g. a local mock server")
+    parser.add_argument("--rate", type=float, default=20.0, help="maximum requests per second")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests")
+    parser.add_argument("--limit", type=int, help="stop after this many new ids")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("a TMDb API key is required (--api-key or $TMDB_API_KEY)")
+    if args.api_base:
+        tmdb_http.API_BASE = args.api_base
+
+    fetched, missing = prefetch(args.api_key, rate=args.rate, workers=args.workers, limit=args.limit)
+    print(f"Fetched {fetched} movies; {missing} still missing. Wrote {recommender.POSTERS_CSV}")
+    if not missing:
+        print("Run `python recommender.py build-index` to add the posters to the model.")
+    return 0 if not missing else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
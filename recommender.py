@@ -0,0 +1,872 @@
+"""
+Content-based movie recommender for Movie Buddy.
+
+Movies are described by TF-IDF vectors of their overviews and compared with
+cosine similarity. The fitted model, including a compact table of the K
+nearest neighbours of every movie, is persisted offline (see model_store):
+
+    python recommender.py build-index     # (re)build the model artifacts
+    python recommender.py check-index     # exit 1 if they are stale
+
+When fresh artifacts are available they are memory-mapped and
+get_recommendations() is a plain array lookup; otherwise the model is fitted
+from the CSVs and queries are scored on the fly, either exactly or through
+an approximate IVF index (MOVIE_BUDDY_SEARCH=ivf, see ann).
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+import ann
+import metrics
+import model_store
+import similarity
+from embeddings import DTYPES, EMBEDDING_DIM, Embeddings
+from features import DEFAULT_WEIGHTS, FieldFeatures
+from filters import FilterIndex
+from metadata import TextColumn, as_text_column
+from autocomplete import PrefixIndex
+from title_index import TitleIndex
+
+# --- Locations ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("MOVIE_BUDDY_DATA_DIR", BASE_DIR)
+MOVIES_CSV = os.path.join(DATA_DIR, "tmdb_5000_movies.csv")
+CREDITS_CSV = os.path.join(DATA_DIR, "tmdb_5000_credits.csv")
+# Written by prefetch_posters.py: poster/backdrop paths and key details per TMDb id
+POSTERS_CSV = os.path.join(DATA_DIR, "tmdb_5000_posters.csv")
+# Written by catalog.py: movies added, updated or deleted since the CSVs, replayed on load
+CHANGES_JSONL = os.path.join(DATA_DIR, "catalog_changes.jsonl")
+INDEX_DIR = os.environ.get("MOVIE_BUDDY_INDEX_DIR", os.path.join(DATA_DIR, "artifacts"))
+MODEL_DIR = os.path.join(INDEX_DIR, "model")
+
+# Number of neighbours stored per movie in the precomputed table
+TOP_K = 50
+# Similarity search: "exact" scans every movie, "ivf" searches an approximate
+# index (see ann), which keeps queries in milliseconds at 1M titles
+SEARCH_BACKENDS = ("exact", "ivf")
+SEARCH_BACKEND = os.environ.get("MOVIE_BUDDY_SEARCH", "exact")
+# Movie vectors: sparse "tfidf" overview rows, dense quantised "lsa" embeddings
+# (see embeddings), or weighted overview/genre/keyword/cast/director "fields" (see features)
+VECTOR_KINDS = ("tfidf", "lsa", "fields")
+VECTORS = os.environ.get("MOVIE_BUDDY_VECTORS", "tfidf")
+
+# Numeric metadata columns persisted with the model, and their on-disk dtypes
+NUMERIC_COLUMNS = {
+    "id": np.int32,
+    "vote_count": np.int32,
+    "vote_average": np.float32,
+    "popularity": np.float32,
+    "runtime": np.float32,
+}
+# Default weight of a disliked title in get_recommendations_multi (liked titles weigh 1)
+NEGATIVE_WEIGHT = 0.5
+POSTER_BASE_URL = "https://image.tmdb.org/t/p/w500"
+# Seconds between checks of MODEL_DIR for a rebuilt model (see SharedModel.reload_if_changed)
+RELOAD_INTERVAL = 30.0
+
+
+def load_movies():
+    """
+    Load the TMDb 5000 dataset
+
+    Returns:
+    pandas.DataFrame: One row per movie with at least id, title and overview
+    """
+    import pandas as pd
+
+    movies = pd.read_csv(MOVIES_CSV)
+    if os.path.exists(CREDITS_CSV):
+        credits = pd.read_csv(CREDITS_CSV)
+        credits = credits.rename(columns={"movie_id": "id"}).drop(columns=["title"], errors="ignore")
+        movies = movies.merge(credits, on="id", how="left")
+    if os.path.exists(POSTERS_CSV):
+        # Details fetched by prefetch_posters.py only fill gaps in the dataset's own columns
+        posters = pd.read_csv(POSTERS_CSV)
+        movies = movies.merge(posters, on="id", how="left", suffixes=("", "_tmdb"))
+        for fetched in [name for name in movies.columns if name.endswith("_tmdb")]:
+            movies[fetched[:-5]] = movies[fetched[:-5]].fillna(movies.pop(fetched))
+    if os.path.exists(CHANGES_JSONL):
+        movies = apply_changelog(movies, read_changelog())
+    movies["overview"] = movies["overview"].fillna("")
+    return movies.reset_index(drop=True)
+
+
+def read_changelog(path=CHANGES_JSONL):
+    """Catalog changes recorded by catalog.py, oldest first."""
+    changes = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                changes.append(json.loads(line))
+    return changes
+
+
+def apply_changelog(movies, changes):
+    """
+    Replay catalog changes on top of the dataset
+
+    Parameters:
+    movies (pandas.DataFrame): Movies loaded from the CSVs
+    changes (list): {"op": "upsert", "movie": {...}} or {"op": "delete", "id": ...}
+
+    Returns:
+    pandas.DataFrame: The catalog with the changes applied, in the order
+    the incremental updates laid it out (upserted movies move to the end)
+    """
+    import pandas as pd
+
+    # Only the last change per id matters; dict order follows the last change
+    latest = {}
+    for change in changes:
+        movie_id = change["id"] if change["op"] == "delete" else change["movie"]["id"]
+        latest.pop(movie_id, None)
+        latest[movie_id] = change
+    movies = movies[~movies["id"].isin(list(latest))]
+    upserts = [change["movie"] for change in latest.values() if change["op"] == "upsert"]
+    if upserts:
+        movies = pd.concat([movies, pd.DataFrame(upserts)], ignore_index=True)
+    return movies
+
+
+def fit_tfidf(overviews):
+    """
+    Fit the TF-IDF vectorizer over movie overviews
+
+    Parameters:
+    overviews (iterable of str): Overview text, one entry per movie
+
+    Returns:
+    tuple: (fitted TfidfVectorizer, scipy.sparse.csr_matrix of L2-normalised rows)
+    """
+    vectorizer = model_store.make_vectorizer()
+    matrix = vectorizer.fit_transform(overviews)
+    return vectorizer, matrix.tocsr()
+
+
+# --- Dataset fingerprint (used to detect stale artifacts) ---
+def _source_files():
+    return [path for path in (MOVIES_CSV, CREDITS_CSV, POSTERS_CSV, CHANGES_JSONL) if os.path.exists(path)]
+
+
+def _file_stat(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def dataset_fingerprint():
+    """
+    Describe the source CSVs so a built index can be checked for staleness
+
+    Returns:
+    dict: File name -> {"size", "mtime_ns", "sha256"}
+    """
+    return {
+        os.path.basename(path): dict(_file_stat(path), sha256=_file_digest(path))
+        for path in _source_files()
+    }
+
+
+def index_is_stale(fingerprint, current_files=None):
+    """
+    Compare a stored fingerprint against the CSVs on disk
+
+    Size and mtime are checked first; content hashes are only recomputed
+    when those differ, so merely touching a file does not invalidate the index.
+
+    Parameters:
+    fingerprint (dict): Fingerprint stored alongside the index
+
+    Returns:
+    bool: True if the CSVs changed since the index was built
+    """
+    files = current_files if current_files is not None else _source_files()
+    if sorted(os.path.basename(p) for p in files) != sorted(fingerprint):
+        return True
+    for path in files:
+        stored = fingerprint[os.path.basename(path)]
+        stat = _file_stat(path)
+        if stat["size"] != stored["size"]:
+            return True
+        if stat["mtime_ns"] != stored["mtime_ns"] and _file_digest(path) != stored["sha256"]:
+            return True
+    return False
+
+
+# --- Model artifacts ---
+def _numeric_columns(movies):
+    """Numeric metadata columns in their compact on-disk dtypes."""
+    import pandas as pd
+
+    columns = {}
+    for name, dtype in NUMERIC_COLUMNS.items():
+        if name in movies:
+            values = pd.to_numeric(movies[name], errors="coerce")
+            fill = np.nan if np.issubdtype(dtype, np.floating) else 0
+            columns[name] = values.fillna(fill).to_numpy(dtype=dtype)
+    return columns
+
+
+def _text_columns(movies):
+    """Text columns persisted with the model (see metadata.TextColumn); missing optional values are ""."""
+    texts = {
+        "title": TextColumn.from_strings(movies["title"].astype(str)),
+        "overview": TextColumn.from_strings(movies["overview"].astype(str)),
+    }
+    if "poster_path" in movies:
+        texts["poster_path"] = TextColumn.from_strings(
+            value if isinstance(value, str) else None for value in movies["poster_path"])
+    return texts
+
+
+def build_artifacts(k=TOP_K, path=MODEL_DIR, backend=SEARCH_BACKEND, vectors=VECTORS,
+                    dim=EMBEDDING_DIM, dtype="int8"):
+    """
+    Fit the model from the CSVs and persist it, including the top-K neighbour table
+
+    Parameters:
+    k (int): Number of neighbours to keep per movie
+    path (str): Destination model directory
+    backend (str): "exact" computes the table exactly; "ivf" also builds and
+    stores the approximate index and computes the table with it
+    vectors (str): "tfidf", "lsa" to also store dense embeddings, or "fields"
+    to also store the multi-field blocks; the neighbour table is computed
+    from them (with the default field weights)
+    dim (int): Embedding size for "lsa"
+    dtype (str): Embedding storage type for "lsa", "int8" or "float16"
+
+    Returns:
+    dict: Manifest of the written model
+    """
+    fingerprint = dataset_fingerprint()
+    movies = load_movies()
+    vectorizer, tfidf = fit_tfidf(movies["overview"])
+    index = dense = fields = None
+    params = {"k": k, "backend": backend, "vectors": vectors}
+    if vectors == "fields":
+        fields = FieldFeatures.fit(movies, tfidf)
+        neighbors, scores = similarity.top_k_blocked(fields.weighted_matrix(), k)
+    elif vectors == "lsa":
+        dense = Embeddings.fit(tfidf, dim=dim, dtype=dtype)
+        neighbors, scores = dense.top_k_blocked(k)
+        params.update(dim=dense.dim, dtype=dtype)
+    elif backend == "ivf":
+        index = ann.IVFIndex.build(tfidf)
+        neighbors, scores = index.top_k_all(k)
+    else:
+        neighbors, scores = similarity.top_k_blocked(tfidf, k)
+    return model_store.save_model(
+        path,
+        vocabulary=vectorizer.get_feature_names_out(),
+        idf=vectorizer.idf_,
+        tfidf=tfidf,
+        texts=_text_columns(movies),
+        columns=_numeric_columns(movies),
+        neighbors=neighbors,
+        neighbor_scores=scores,
+        fingerprint=fingerprint,
+        params=params,
+        ann=index.arrays() if index is not None else None,
+        embeddings=dense.arrays() if dense is not None else None,
+        fields=fields.arrays() if fields is not None else None,
+        filters=FilterIndex.build(movies.to_dict("records")).arrays(),
+    )
+
+
+def artifacts_are_stale(manifest):
+    """True if the CSVs on disk no longer match the ones the model was built from."""
+    # Deployments may ship the artifacts without the CSVs; trust them in that case
+    return bool(_source_files()) and index_is_stale(manifest["fingerprint"])
+
+
+# --- Model ---
+def _read_only(array):
+    """Mark a NumPy array read-only (memory-mapped arrays already are); None passes through."""
+    if isinstance(array, np.ndarray):
+        array.flags.writeable = False
+    return array
+
+
+class Model:
+    """Everything get_recommendations() needs, loaded once per process."""
+
+    def __init__(self, tfidf, texts, columns, neighbors=None,
+                 neighbor_scores=None, version=None, ann_index=None, backend=SEARCH_BACKEND,
+                 embeddings=None, fields=None, filters=None):
+        # Shared by every session and thread: keep it read-only
+        self.tfidf = tfidf
+        for array in (tfidf.data, tfidf.indices, tfidf.indptr):
+            _read_only(array)
+        # Columnar metadata: memory-mapped UTF-8 text columns and fixed-width numeric arrays
+        self.titles = as_text_column(texts["title"])
+        self.overviews = as_text_column(texts["overview"])
+        self.poster_paths = as_text_column(texts["poster_path"]) if "poster_path" in texts else None
+        self.columns = {name: _read_only(values) for name, values in columns.items()}
+        self.movie_ids = self.columns.get("id")
+        self.neighbors = _read_only(neighbors)
+        self.neighbor_scores = _read_only(neighbor_scores)
+        self.version = version
+        self.backend = backend
+        self._ann = ann_index
+        self.embeddings = embeddings
+        self.fields = fields
+        self.filters = filters
+        self._title_index = None
+        self._prefix_index = None
+        self._lock = threading.Lock()
+
+    @property
+    def title_index(self):
+        """Title lookup index, built on first use: normalising 1M titles takes seconds, so loading skips it."""
+        if self._title_index is None:
+            with self._lock:
+                if self._title_index is None:
+                    self._title_index = TitleIndex(self.titles, weights=self.columns.get("vote_count"))
+        return self._title_index
+
+    def prepare(self):
+        """Build the title and autocomplete indexes now instead of on the first search (e.g. before serving traffic)."""
+        self.title_index.prepare()
+        return self.prefix_index
+
+    @property
+    def prefix_index(self):
+        """Autocomplete index, built on first use and then shared by every session."""
+        if self._prefix_index is None:
+            with self._lock:
+                if self._prefix_index is None:
+                    self._prefix_index = PrefixIndex(self.titles, weights=self.columns.get("vote_count"))
+        return self._prefix_index
+
+    @property
+    def ann(self):
+        """Approximate search index: the stored one, or built on first use."""
+        if self._ann is None:
+            with self._lock:
+                if self._ann is None:
+                    self._ann = ann.IVFIndex.build(self.tfidf)
+        return self._ann
+
+    def find_row(self, title):
+        return self.title_index.find_exact(title)
+
+    def filter_mask(self, filters):
+        """Candidate mask for filters (see filters.FilterIndex.mask), or None if none are active."""
+        if not filters:
+            return None
+        if self.filters is None:
+            raise ValueError("this model has no filter index; rebuild it with `python recommender.py build-index`")
+        return self.filters.mask(filters)
+
+    def _masked_top_k(self, rows, seed_weights, num, weights, mask):
+        """Top num rows for a (combined) query, scoring only the rows the mask allows."""
+        mask = mask.copy()
+        mask[rows] = False
+        candidates = None
+        if self.fields is None and self.embeddings is None and self.backend == "ivf":
+            query = np.asarray(self.tfidf[rows].T @ seed_weights, dtype=np.float32).ravel()
+            candidates = self.ann.candidates(query)
+            candidates = candidates[mask[candidates]]
+            if len(candidates) < num:
+                # The probed partitions hold too few matches: scan every match
+                candidates = None
+        if candidates is None:
+            candidates = np.flatnonzero(mask)
+        if self.fields is not None:
+            scores = self.fields.seed_scores(rows, seed_weights, weights, candidates)
+        elif self.embeddings is not None:
+            scores = self.embeddings.seed_scores(rows, seed_weights, candidates)
+        else:
+            scores = similarity.seed_scores(self.tfidf, rows, seed_weights, candidates)
+        return candidates[similarity.top_k(scores, num)].tolist()
+
+    def similar_rows(self, row, num, weights=None, mask=None):
+        """
+        Row positions of the num movies most similar to row, best first
+
+        Field weights (see features.DEFAULT_WEIGHTS) are only honoured by
+        models built with the multi-field features; non-default weights are
+        scored on the fly instead of read from the neighbour table.
+
+        With a candidate mask (see filter_mask), the neighbour table is used
+        when enough of its entries pass; otherwise only the passing movies
+        are scored, which costs at most one full scan.
+        """
+        custom = self.fields is not None and weights and dict(DEFAULT_WEIGHTS, **weights) != DEFAULT_WEIGHTS
+        if mask is not None:
+            if not custom and self.neighbors is not None:
+                hits = [r for r in self.neighbors[row].tolist() if r >= 0 and mask[r]]
+                if len(hits) >= num:
+                    return hits[:num]
+            return self._masked_top_k([row], np.ones(1, dtype=np.float32), num, weights, mask)
+        if custom:
+            best, _ = self.fields.top_k_for_row(row, num, weights)
+            return best.tolist()
+        if self.neighbors is not None and num <= self.neighbors.shape[1]:
+            # Tables built with the IVF backend are -1 padded when a partition is tiny
+            return [r for r in self.neighbors[row, :num].tolist() if r >= 0]
+        if self.fields is not None:
+            best, _ = self.fields.top_k_for_row(row, num)
+        elif self.embeddings is not None:
+            best, _ = self.embeddings.top_k_for_row(row, num)
+        elif self.backend == "ivf":
+            best, _ = self.ann.search_row(row, num)
+        else:
+            best, _ = similarity.top_k_for_row(self.tfidf, row, num)
+        return best.tolist()
+
+    def similar_rows_batch(self, rows, num, weights=None, block_bytes=similarity.DEFAULT_BLOCK_BYTES):
+        """
+        Neighbours of many movies at once (see similar_rows)
+
+        Rows covered by the neighbour table are a single gather; otherwise
+        the rows are scored in blocked matrix products of at most block_bytes.
+
+        Parameters:
+        rows (array-like): Query row positions
+        num (int): Neighbours per row
+        weights (dict): Per-field weights (multi-field models only)
+
+        Returns:
+        tuple: (neighbors int32 [len(rows), num], scores float32 [len(rows), num]),
+        -1 / -inf padded when fewer neighbours exist
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        custom = self.fields is not None and weights and dict(DEFAULT_WEIGHTS, **weights) != DEFAULT_WEIGHTS
+        if not custom and self.neighbors is not None and num <= self.neighbors.shape[1]:
+            return (np.asarray(self.neighbors[rows, :num], dtype=np.int32),
+                    np.asarray(self.neighbor_scores[rows, :num], dtype=np.float32))
+        if self.fields is not None:
+            neighbors, scores = similarity.top_k_blocked(
+                self.fields.weighted_matrix(weights), num, rows=rows, block_bytes=block_bytes)
+        elif self.embeddings is not None:
+            neighbors, scores = self.embeddings.top_k_blocked(num, rows=rows, block_bytes=block_bytes)
+        elif self.backend == "ivf":
+            neighbors = np.full((len(rows), num), -1, dtype=np.int32)
+            scores = np.full((len(rows), num), -np.inf, dtype=np.float32)
+            for i, row in enumerate(rows):
+                best, best_scores = self.ann.search_row(row, num)
+                neighbors[i, :len(best)] = best
+                scores[i, :len(best)] = best_scores
+            return neighbors, scores
+        else:
+            neighbors, scores = similarity.top_k_blocked(self.tfidf, num, rows=rows, block_bytes=block_bytes)
+        if neighbors.shape[1] < num:
+            # Fewer movies than requested: pad like the IVF table
+            pad = num - neighbors.shape[1]
+            neighbors = np.pad(neighbors, ((0, 0), (0, pad)), constant_values=-1)
+            scores = np.pad(scores, ((0, 0), (0, pad)), constant_values=-np.inf)
+        return neighbors, scores
+
+    def similar_to_seeds(self, rows, seed_weights, num, weights=None, mask=None):
+        """
+        Movies most similar to a weighted mix of seed movies, best first
+
+        The seeds are combined into one query, so scoring costs a single
+        product however many seeds there are; the seeds themselves are never
+        returned.
+
+        Parameters:
+        rows (array-like): Seed row positions
+        seed_weights (array-like): Weight per seed; negative seeds push results away
+        num (int): Number of rows wanted
+        weights (dict): Per-field weights (multi-field models only)
+        mask (numpy.ndarray): Candidate mask (see filter_mask)
+
+        Returns:
+        list: Row positions
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        seed_weights = np.asarray(seed_weights, dtype=np.float32)
+        if mask is not None:
+            return self._masked_top_k(rows, seed_weights, num, weights, mask)
+        if self.fields is not None:
+            scores = self.fields.seed_scores(rows, seed_weights, weights)
+        elif self.embeddings is not None:
+            scores = self.embeddings.seed_scores(rows, seed_weights)
+        elif self.backend == "ivf":
+            query = np.asarray(self.tfidf[rows].T @ seed_weights, dtype=np.float32).ravel()
+            best, _ = self.ann.search_vector(query, num, exclude=rows)
+            return best.tolist()
+        else:
+            scores = similarity.seed_scores(self.tfidf, rows, seed_weights)
+        scores[rows] = -np.inf
+        return similarity.top_k(scores, num).tolist()
+
+    def card(self, row):
+        poster_path = self.poster_paths[row] if self.poster_paths is not None else None
+        return {
+            "title": self.titles[row],
+            "overview": self.overviews[row],
+            "poster": f"{POSTER_BASE_URL}{poster_path}" if poster_path else None,
+        }
+
+    def memory_footprint(self):
+        """
+        Resident size of the similarity structures and the metadata columns
+
+        Memory-mapped arrays are counted in full even though their pages are
+        shared with every other process that opened the same model.
+
+        Returns:
+        dict: Bytes held by the TF-IDF matrix, the neighbour table and the
+        metadata columns
+        """
+        footprint = {"tfidf_nnz": int(self.tfidf.nnz), "tfidf_bytes": similarity.sparse_nbytes(self.tfidf)}
+        texts = [self.titles, self.overviews] + ([self.poster_paths] if self.poster_paths is not None else [])
+        footprint["metadata_bytes"] = (sum(column.nbytes() for column in texts)
+                                       + sum(int(values.nbytes) for values in self.columns.values()))
+        if self.neighbors is not None:
+            footprint["neighbor_index_bytes"] = int(self.neighbors.nbytes + self.neighbor_scores.nbytes)
+        if self._ann is not None:
+            footprint["ann_index_bytes"] = self._ann.nbytes()
+        if self.embeddings is not None:
+            footprint["embedding_bytes"] = self.embeddings.nbytes()
+        if self.fields is not None:
+            footprint["field_bytes"] = self.fields.nbytes()
+        return footprint
+
+
+def fit_model():
+    """Fit a model straight from the CSVs, without a precomputed neighbour table."""
+    movies = load_movies()
+    _, tfidf = fit_tfidf(movies["overview"])
+    dense = Embeddings.fit(tfidf) if VECTORS == "lsa" else None
+    fields = FieldFeatures.fit(movies, tfidf) if VECTORS == "fields" else None
+    filters = FilterIndex.build(movies.to_dict("records"))
+    return Model(tfidf, _text_columns(movies), _numeric_columns(movies), embeddings=dense, fields=fields,
+                 filters=filters)
+
+
+@metrics.timed("recommender.load_model")
+def load_model(path=MODEL_DIR, progress=None):
+    """
+    Open the persisted model, refitting from the CSVs if it is missing or stale
+
+    Parameters:
+    path (str): Model directory
+    progress (callable): progress(fraction, message), called as loading advances
+
+    Returns:
+    Model: The loaded model
+    """
+    progress = progress or (lambda fraction, message: None)
+    progress(0.1, "Opening the model...")
+    artifacts = model_store.load_model(path)
+    if artifacts is not None and not artifacts_are_stale(artifacts["manifest"]):
+        progress(0.4, "Mapping the model arrays...")
+        return Model(
+            artifacts["tfidf"],
+            artifacts["texts"],
+            artifacts["columns"],
+            neighbors=artifacts["neighbors"],
+            neighbor_scores=artifacts["neighbor_scores"],
+            version=artifacts["manifest"]["model_version"],
+            ann_index=ann.IVFIndex.from_arrays(artifacts["tfidf"], artifacts["ann"]) if artifacts["ann"] else None,
+            embeddings=Embeddings.from_arrays(artifacts["embeddings"]) if artifacts["embeddings"] else None,
+            fields=FieldFeatures.from_arrays(artifacts["fields"], len(artifacts["texts"]["title"])) if artifacts["fields"] else None,
+            filters=FilterIndex.from_arrays(artifacts["filters"]),
+        )
+    reason = "missing" if artifacts is None else "stale"
+    print(
+        f"recommender: model artifacts in {path} are {reason}, run "
+        "`python recommender.py build-index`; fitting from the CSVs",
+        file=sys.stderr,
+    )
+    progress(0.2, "Fitting the model from the CSVs...")
+    return fit_model()
+
+
+class SharedModel:
+    """
+    The process-wide model: loaded lazily, shared read-only, swapped atomically
+
+    Every session and worker thread reads the same Model. Readers take one
+    reference per call (get()) and keep using it, so a swap never changes
+    the model under a request in progress; the old model is freed once its
+    last reader is done. Models are never modified after loading.
+
+    Parameters:
+    path (str): Model directory watched for rebuilds
+    """
+
+    def __init__(self, path=MODEL_DIR):
+        self.path = path
+        self._model = None
+        self._lock = threading.Lock()
+        self._reloading = threading.Lock()
+        self._next_check = time.monotonic() + RELOAD_INTERVAL
+
+    def get(self, progress=None):
+        """
+        The current model, loaded on first use (concurrent first calls load it once)
+
+        Parameters:
+        progress (callable): Passed to load_model() if this call loads the model
+        """
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_model(self.path, progress=progress)
+                model = self._model
+        return model
+
+    def swap(self, model):
+        """
+        Replace the current model; new calls see it immediately
+
+        Returns:
+        Model: The previous model, or None
+        """
+        with self._lock:
+            previous, self._model = self._model, model
+        return previous
+
+    def reload(self, force=False):
+        """
+        Load the model in self.path and swap it in if its version differs
+
+        The new model is loaded while readers keep using the current one.
+        Artifacts that are missing or stale are left alone: refitting from
+        the CSVs is a job for `python recommender.py build-index`.
+
+        Returns:
+        Model: The new model, or None if nothing was swapped
+        """
+        if not self._reloading.acquire(blocking=False):
+            return None  # another thread is reloading already
+        try:
+            manifest = model_store.read_manifest(self.path)
+            if manifest is None or artifacts_are_stale(manifest):
+                return None
+            current = self._model
+            if not force and current is not None and current.version == manifest["model_version"]:
+                return None
+            model = load_model(self.path)
+            # Index the titles here, so the first searches on the new model do not wait for it
+            model.prepare()
+            self.swap(model)
+            print(f"recommender: switched to model {model.version}", file=sys.stderr)
+            return model
+        finally:
+            self._reloading.release()
+
+    def reload_if_changed(self):
+        """
+        Cheap per-request hook: every RELOAD_INTERVAL seconds, reload a
+        rebuilt model in a background thread
+
+        Returns:
+        bool: True if a check was started
+        """
+        now = time.monotonic()
+        if now < self._next_check or self._model is None:
+            return False
+        self._next_check = now + RELOAD_INTERVAL
+        threading.Thread(target=self.reload, name="model-reload", daemon=True).start()
+        return True
+
+
+_shared = SharedModel()
+
+
+def shared_model():
+    """The process-wide SharedModel (e.g. to hand to st.cache_resource)."""
+    return _shared
+
+
+def get_model():
+    """Load (once) and return the current recommender model."""
+    return _shared.get()
+
+
+def swap_model(model):
+    """Atomically replace the process-wide model; returns the previous one."""
+    return _shared.swap(model)
+
+
+def reload_model(force=False):
+    """Swap in the model in MODEL_DIR if it was rebuilt; returns it, or None."""
+    return _shared.reload(force=force)
+
+
+@metrics.timed("recommender.suggest_titles")
+def suggest_titles(prefix, limit=10):
+    """
+    As-you-type completions for the search box
+
+    Parameters:
+    prefix (str): Text typed so far
+    limit (int): Maximum number of suggestions
+
+    Returns:
+    list: Catalog titles starting with prefix, most voted first
+    """
+    model = get_model()
+    return [model.titles[row] for row in model.prefix_index.complete(prefix, limit=limit)]
+
+
+@metrics.timed("recommender.resolve_title")
+def resolve_title(query, alternatives=4):
+    """
+    Resolve free-form search text to a catalog title, tolerating typos
+
+    Parameters:
+    query (str): Text typed by the user
+    alternatives (int): Number of "did you mean" suggestions
+
+    Returns:
+    dict: {"title": best title or None, "id": TMDb id or None,
+           "exact": bool, "alternatives": list of titles}
+    """
+    model = get_model()
+    row, exact, others = model.title_index.resolve(query, alternatives=alternatives)
+    return {
+        "title": None if row is None else model.titles[row],
+        "id": None if row is None or model.movie_ids is None else int(model.movie_ids[row]),
+        "exact": exact,
+        "alternatives": [model.titles[r] for r in others],
+    }
+
+
+def field_weights():
+    """
+    Default per-field weights if the model supports tuning them, else {}
+
+    Returns:
+    dict: Field name -> weight, for models built with --vectors fields
+    """
+    return dict(DEFAULT_WEIGHTS) if get_model().fields is not None else {}
+
+
+def filter_options():
+    """
+    Values to offer for each filter
+
+    Returns:
+    dict: "genres" and "languages" (lists), "year" and "runtime" ((min, max))
+    """
+    return get_model().filters.options()
+
+
+@metrics.timed("recommender.get_recommendations")
+def get_recommendations(title, num=6, weights=None, filters=None, model=None):
+    """
+    Recommend movies similar to the given title
+
+    Parameters:
+    title (str): Title of a movie in the dataset (case-insensitive)
+    num (int): Number of recommendations to return
+    weights (dict): Per-field weights (see field_weights); None for the defaults
+    filters (dict): Restrict the results, e.g. {"year": (1990, 2005),
+    "genres": ["Action"], "languages": ["en"], "runtime": (90, 150),
+    "min_votes": 100} (see filters.FilterIndex.mask)
+    model (Model): Model to score with; None for the current one
+
+    Returns:
+    list: Dicts with "title", "overview" and "poster" (URL of a prefetched poster
+    or None), or an empty list if the title is unknown
+    """
+    model = model or get_model()
+    row = model.find_row(title)
+    if row is None:
+        return []
+    mask = model.filter_mask(filters)
+    return [model.card(r) for r in model.similar_rows(row, num, weights=weights, mask=mask)]
+
+
+def _seed_weights(seeds, default):
+    """Title -> weight from a list of titles or a {title: weight} dict."""
+    if isinstance(seeds, str):
+        seeds = [seeds]
+    return dict(seeds) if isinstance(seeds, dict) else {title: default for title in seeds}
+
+
+@metrics.timed("recommender.get_recommendations_multi")
+def get_recommendations_multi(seeds, num=6, negative=(), weights=None, filters=None):
+    """
+    "Because you liked X, Y and Z": recommend movies similar to several titles
+
+    Parameters:
+    seeds (list or dict): Liked titles, or {title: weight} to favour some of them
+    num (int): Number of recommendations to return
+    negative (list or dict): Disliked titles, or {title: weight}; movies
+    similar to them are pushed down (default weight NEGATIVE_WEIGHT)
+    weights (dict): Per-field weights (see field_weights); None for the defaults
+    filters (dict): Restrict the results (see get_recommendations)
+
+    Returns:
+    list: Dicts with "title", "overview" and "poster", never including a seed;
+    an empty list if none of the liked titles is known
+    """
+    model = get_model()
+    combined = {}
+    for sign, titles, default in ((1.0, seeds, 1.0), (-1.0, negative, NEGATIVE_WEIGHT)):
+        for title, weight in _seed_weights(titles, default).items():
+            row = model.find_row(title)
+            if row is not None:
+                combined[row] = combined.get(row, 0.0) + sign * abs(float(weight))
+    if not any(weight > 0 for weight in combined.values()):
+        return []
+    rows = list(combined)
+    mask = model.filter_mask(filters)
+    similar = model.similar_to_seeds(rows, list(combined.values()), num, weights=weights, mask=mask)
+    return [model.card(r) for r in similar]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Movie Buddy recommender maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build-index", help="fit the model and precompute the top-K neighbour table")
+    build.add_argument("--k", type=int, default=TOP_K, help="neighbours per movie")
+    build.add_argument("--backend", choices=SEARCH_BACKENDS, default=SEARCH_BACKEND,
+                       help="exact neighbour table, or approximate (IVF) for large catalogs")
+    build.add_argument("--vectors", choices=VECTOR_KINDS, default=VECTORS,
+                       help="sparse TF-IDF rows, dense quantised LSA embeddings, or weighted multi-field features")
+    build.add_argument("--dim", type=int, default=EMBEDDING_DIM, help="embedding size (--vectors lsa)")
+    build.add_argument("--dtype", choices=DTYPES, default="int8", help="embedding storage type (--vectors lsa)")
+    sub.add_parser("check-index", help="exit with status 1 if the model artifacts are missing, stale or due a refit")
+    sub.add_parser("stats", help="report the resident size of the loaded model")
+    args = parser.parse_args(argv)
+
+    if args.command == "build-index":
+        manifest = build_artifacts(k=args.k, backend=args.backend, vectors=args.vectors,
+                                   dim=args.dim, dtype=args.dtype)
+        print(f"Wrote model {manifest['model_version']} ({manifest['n_movies']} movies) to {MODEL_DIR}")
+        return 0
+    if args.command == "stats":
+        for name, value in get_model().memory_footprint().items():
+            print(f"{name}: {value:,}")
+        return 0
+    manifest = model_store.read_manifest(MODEL_DIR)
+    if manifest is None:
+        print(f"Model artifacts in {MODEL_DIR} are missing or use an old format")
+        return 1
+    stale = artifacts_are_stale(manifest)
+    print(f"Model {manifest['model_version']} is {'STALE' if stale else 'up to date'}")
+    if manifest.get("catalog", {}).get("refit_due"):
+        # Set by catalog.py once incremental updates drifted too far from the fit
+        import catalog
+        reasons = catalog.status(MODEL_DIR)["reasons"]
+        print(f"A full refit is due after incremental updates: {'; '.join(reasons)}")
+        return 1
+    return 1 if stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
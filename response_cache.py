@@ -0,0 +1,162 @@
+"""
+Process-wide cache of complete recommendation responses.
+
+A handful of titles (the sidebar's sample movies above all) make up most of
+the traffic, so the final card data of a results page (titles, overviews
+and poster URLs, including posters fetched from TMDb) is cached per
+
+    (normalised title, num, field weights, filters)
+
+in a bounded LRU shared by every session in the process. Entries belong to
+one model version: when a different model is loaded the cache is emptied,
+so a rebuild or catalog update never serves stale lists, and pages still
+being computed on a model when it is swapped out are dropped. warm() fills it
+for the sample movies at startup.
+"""
+import threading
+
+import metrics
+import recommender
+from features import DEFAULT_WEIGHTS
+from filters import normalize_filters
+from title_index import normalize_title
+from tmdb_http import TTLCache
+
+CACHE_SIZE = 1024
+# Entries are dropped on a model change anyway; the TTL only bounds poster staleness
+CACHE_TTL = 24 * 60 * 60
+# The sidebar's sample movies, warmed at startup
+SAMPLE_TITLES = ("Inception", "The Dark Knight", "Interstellar", "The Matrix",
+                 "Pulp Fiction", "Avatar", "Titanic", "The Godfather")
+
+
+def _freeze(value):
+    """Hashable form of weights/filters dicts: keys are sorted, sequences keep their order."""
+    if isinstance(value, dict):
+        return tuple(sorted((name, _freeze(item)) for name, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def cache_key(title, num=6, weights=None, filters=None):
+    """
+    Key of a response; inactive filters and default weights are left out so equal pages share it
+
+    Raises:
+    filters.FilterError: On invalid filters (see filters.normalize_filters)
+    """
+    # Canonical filters: genre order does not matter, but (low, high) ranges keep theirs
+    filters = normalize_filters(filters)
+    if not weights or dict(DEFAULT_WEIGHTS, **weights) == DEFAULT_WEIGHTS:
+        weights = {}
+    return (normalize_title(title), int(num), _freeze(weights), _freeze(filters))
+
+
+class ResponseCache:
+    """
+    Bounded LRU of responses, tied to one model version
+
+    Parameters:
+    maxsize (int): Maximum number of responses kept
+    ttl (float): Seconds a response stays valid
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _accepts(self, version):
+        """True if entries of version may be read and stored; the current model's version replaces the entries."""
+        if version == self._version:
+            return True
+        # Requests still running on a swapped-out model neither store their
+        # pages nor switch the cache back to their version
+        current = recommender.get_model().version
+        with self._lock:
+            if version == self._version:
+                return True
+            if version != current:
+                return False
+            self._entries.clear()
+            self._version = version
+            return True
+
+    def get(self, key, version):
+        if not self._accepts(version):
+            return None
+        cards = self._entries.get(key)
+        return None if cards is None else [dict(card) for card in cards]
+
+    def set(self, key, version, cards):
+        if self._accepts(version):
+            self._entries.set(key, [dict(card) for card in cards])
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        return dict(self._entries.stats(), model_version=self._version)
+
+
+_cache = ResponseCache()
+
+
+def get_page(title, num=6, weights=None, filters=None, model=None):
+    """
+    Recommendations for a catalog title, from the cache when possible
+
+    Parameters:
+    title (str): Catalog title (e.g. resolve_title()["title"])
+    num, weights, filters, model: As for recommender.get_recommendations
+
+    Returns:
+    list: Card dicts (copies, safe to modify); posters stored with put_page()
+    are included
+    """
+    # One model for the lookup, the computation and the store, even across a hot swap
+    model = model or recommender.get_model()
+    key = cache_key(title, num, weights, filters)
+    cards = _cache.get(key, model.version)
+    if cards is None:
+        cards = recommender.get_recommendations(title, num=num, weights=weights, filters=filters, model=model)
+        _cache.set(key, model.version, cards)
+    return cards
+
+
+def put_page(title, num, weights, filters, cards, version):
+    """
+    Store the final cards of a page, e.g. once its posters were fetched
+
+    Parameters:
+    version (str): Version of the model the cards were computed with (the
+    model passed to get_page); pages of a swapped-out model are not stored
+    """
+    _cache.set(cache_key(title, num, weights, filters), version, cards)
+
+
+def warm(titles=SAMPLE_TITLES, num=6):
+    """
+    Compute the default pages of the given titles ahead of the first click
+
+    Returns:
+    int: Number of titles found in the catalog
+    """
+    warmed = 0
+    for title in titles:
+        if get_page(title, num):
+            warmed += 1
+    return warmed
+
+
+def stats():
+    """Hit/miss counters, size and the model version the entries belong to."""
+    return _cache.stats()
+
+
+def clear():
+    _cache.clear()
+
+
+metrics.register_collector("response_cache", stats)
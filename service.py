@@ -0,0 +1,224 @@
+"""
+HTTP recommendation API for services other than the Streamlit UI.
+
+A small Starlette app over the same recommender model:
+
+    GET  /health                        model version and size
+    GET  /metrics[?format=json]         timings and counters (MOVIE_BUDDY_METRICS=1)
+    GET  /search?q=inceptoin&limit=5    title resolution and completions
+    GET  /recommend?title=Inception&num=6
+    POST /recommend  {"title": ..., "num": 6, "filters": {...}, "weights": {...}}
+                     {"seeds": [...], "negative": [...], ...} for several titles
+    POST /batch      {"titles": [...], "num": 6}
+
+Scoring is CPU-bound, so every request runs in the thread pool and the event
+loop stays free for other connections. Each worker process opens the
+memory-mapped model at startup; with --workers N the processes share its
+pages through the OS page cache, so N workers cost about one model in RAM.
+A model rebuilt with `python recommender.py build-index` is picked up within
+recommender.RELOAD_INTERVAL seconds, without a restart.
+
+    python service.py [--host 127.0.0.1] [--port 8000] [--workers 4]
+    python loadtest.py --url http://127.0.0.1:8000 --concurrency 32
+"""
+import argparse
+import asyncio
+import contextlib
+import sys
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import batch
+import metrics
+import recommender
+import response_cache
+from filters import FilterError
+
+# Seeds accepted by one /batch request; larger jobs should use batch.py
+MAX_BATCH = 10000
+MAX_NUM = 100
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _int(value, name, default, high):
+    # int() would truncate 1.9 to 1 (and accept true as 1)
+    if isinstance(value, (bool, float)):
+        raise BadRequest(f"{name} must be an integer")
+    try:
+        value = default if value is None else int(value)
+    except (TypeError, ValueError):
+        raise BadRequest(f"{name} must be an integer")
+    if not 1 <= value <= high:
+        raise BadRequest(f"{name} must be between 1 and {high}")
+    return value
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _weights(value, name="weights"):
+    """value if it is a {name: number} object (or absent), else BadRequest."""
+    if value is not None and (not isinstance(value, dict) or not all(_is_number(w) for w in value.values())):
+        raise BadRequest(f"{name} must be an object of numbers")
+    return value
+
+
+def _titles(value, name):
+    """value if it is a list of titles or a {title: weight} object (or absent), else BadRequest."""
+    if value is None:
+        return value
+    if isinstance(value, dict):
+        return _weights(value, name)
+    if not isinstance(value, list) or not all(isinstance(title, str) for title in value):
+        raise BadRequest(f"{name} must be a list of titles or an object of title weights")
+    return value
+
+
+async def _json_body(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise BadRequest("request body must be JSON")
+    if not isinstance(body, dict):
+        raise BadRequest("request body must be a JSON object")
+    return body
+
+
+def _recommend(params):
+    """
+    Response for one recommendation request (runs in a worker thread)
+
+    Returns:
+    tuple: (HTTP status, JSON body); 404 with "did you mean" alternatives
+    for an unknown title
+    """
+    num = _int(params.get("num"), "num", 6, MAX_NUM)
+    weights, filters = _weights(params.get("weights")), params.get("filters")
+    if filters is not None and not isinstance(filters, dict):
+        raise BadRequest("filters must be an object")
+    seeds, negative = _titles(params.get("seeds"), "seeds"), _titles(params.get("negative"), "negative")
+    if seeds:
+        results = recommender.get_recommendations_multi(
+            seeds, num=num, negative=negative or (), weights=weights, filters=filters)
+        return 200, {"seeds": seeds, "results": results}
+    title = params.get("title")
+    if not title:
+        raise BadRequest("title (or seeds) is required")
+    if not isinstance(title, str):
+        raise BadRequest("title must be a string")
+    match = recommender.resolve_title(title)
+    if match["title"] is None:
+        return 404, {"error": "unknown title", "alternatives": match["alternatives"]}
+    results = response_cache.get_page(match["title"], num=num, weights=weights, filters=filters)
+    return 200, {"match": match, "results": results}
+
+
+async def recommend(request):
+    if request.method == "POST":
+        params = await _json_body(request)
+    else:
+        params = dict(request.query_params)
+    status, body = await run_in_threadpool(_recommend, params)
+    return JSONResponse(body, status_code=status)
+
+
+def _search(query, limit):
+    return {
+        "match": recommender.resolve_title(query, alternatives=limit),
+        "completions": recommender.suggest_titles(query, limit=limit),
+    }
+
+
+async def search(request):
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        raise BadRequest("q is required")
+    limit = _int(request.query_params.get("limit"), "limit", 5, 50)
+    return JSONResponse(await run_in_threadpool(_search, query, limit))
+
+
+def _batch(titles, num, weights):
+    return list(batch.recommend_batch(titles, num=num, weights=weights))
+
+
+async def batch_recommend(request):
+    body = await _json_body(request)
+    titles = body.get("titles")
+    if not isinstance(titles, list) or not all(isinstance(title, str) for title in titles):
+        raise BadRequest("titles must be a list of strings")
+    if len(titles) > MAX_BATCH:
+        raise BadRequest(f"at most {MAX_BATCH} titles per request; use batch.py for larger jobs")
+    num = _int(body.get("num"), "num", 6, MAX_NUM)
+    results = await run_in_threadpool(_batch, titles, num, _weights(body.get("weights")))
+    return JSONResponse({"results": results})
+
+
+async def health(request):
+    model = recommender.get_model()
+    return JSONResponse({"status": "ok", "model_version": model.version, "movies": len(model.titles),
+                         "response_cache": response_cache.stats()})
+
+
+async def metrics_endpoint(request):
+    if request.query_params.get("format") == "json":
+        return JSONResponse(metrics.snapshot())
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+async def bad_request(request, exc):
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+async def _watch_model():
+    """Swap in rebuilt models while the service runs (requests keep the model they started with)."""
+    while True:
+        await asyncio.sleep(recommender.RELOAD_INTERVAL)
+        await run_in_threadpool(recommender.reload_model)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Open the model, index its titles and warm the popular pages before accepting traffic
+    await run_in_threadpool(lambda: recommender.get_model().prepare())
+    await run_in_threadpool(response_cache.warm)
+    watcher = asyncio.create_task(_watch_model())
+    yield
+    watcher.cancel()
+
+
+app = Starlette(
+    routes=[
+        Route("/health", health),
+        Route("/metrics", metrics_endpoint),
+        Route("/search", search),
+        Route("/recommend", recommend, methods=["GET", "POST"]),
+        Route("/batch", batch_recommend, methods=["POST"]),
+    ],
+    # Only the client's mistakes are 400s; any other error is a 500 without internal details
+    exception_handlers={BadRequest: bad_request, FilterError: bad_request},
+    lifespan=lifespan,
+)
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Movie Buddy recommendation API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="worker processes sharing the memory-mapped model")
+    args = parser.parse_args(argv)
+    uvicorn.run("service:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
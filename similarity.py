@@ -0,0 +1,127 @@
+"""
+Sparse, memory-bounded cosine similarity search.
+
+TF-IDF rows are L2-normalised, so cosine similarity is a plain dot product.
+Instead of materialising the dense N x N similarity matrix, scores are
+computed one query row (or one block of rows) at a time from the sparse
+matrix and reduced to the top K with argpartition. Peak memory is the sparse
+matrix itself plus one bounded block of scores.
+"""
+import numpy as np
+
+# Upper bound for the dense score block produced by a blocked product
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def top_k(scores, k):
+    """
+    Indices of the k largest scores, best first
+
+    Parameters:
+    scores (numpy.ndarray): 1-D score vector (-inf marks excluded entries)
+    k (int): Number of results wanted
+
+    Returns:
+    numpy.ndarray: Indices sorted by descending score
+    """
+    k = min(k, int(np.count_nonzero(scores > -np.inf)))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+def row_scores(matrix, row):
+    """
+    Cosine similarity of one row against every row of the matrix
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): L2-normalised feature rows
+    row (int): Query row position
+
+    Returns:
+    numpy.ndarray: Dense float32 score vector of length N
+    """
+    return np.asarray((matrix @ matrix[row].T).todense(), dtype=np.float32).ravel()
+
+
+def seed_scores(matrix, rows, weights, candidates=None):
+    """
+    Weighted sum of the score vectors of several rows, in one product
+
+    Scores are linear in the query, so the seeds are first combined into a
+    single (dense) query vector; any number of seeds costs one product.
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): L2-normalised feature rows
+    rows (array-like): Seed row positions
+    weights (array-like): Weight per seed (negative to push results away)
+    candidates (array-like): Only score these rows (default: every row)
+
+    Returns:
+    numpy.ndarray: Dense float32 scores, one per row (or per candidate)
+    """
+    query = matrix[rows].T @ np.asarray(weights, dtype=np.float32)
+    target = matrix if candidates is None else matrix[candidates]
+    return np.asarray(target @ query, dtype=np.float32).ravel()
+
+
+def top_k_for_row(matrix, row, k, exclude_self=True):
+    """
+    The k rows most similar to row, computed without touching other queries
+
+    Returns:
+    tuple: (indices, scores) as numpy arrays, best first
+    """
+    scores = row_scores(matrix, row)
+    if exclude_self:
+        scores[row] = -np.inf
+    best = top_k(scores, k)
+    return best, scores[best]
+
+
+def block_rows(n_rows, block_bytes=DEFAULT_BLOCK_BYTES):
+    """Number of query rows per block so one dense float32 block fits block_bytes."""
+    return max(1, int(block_bytes // (4 * max(n_rows, 1))))
+
+
+def top_k_blocked(matrix, k, rows=None, block_bytes=DEFAULT_BLOCK_BYTES, exclude_self=True):
+    """
+    Top-k neighbours for many query rows using blocked sparse products
+
+    Parameters:
+    matrix (scipy.sparse.csr_matrix): L2-normalised feature rows
+    k (int): Neighbours per query row
+    rows (array-like): Query row positions (default: every row)
+    block_bytes (int): Memory budget for one dense block of scores
+
+    Returns:
+    tuple: (neighbors int32 [len(rows), k], scores float32 [len(rows), k]),
+    with k capped at the number of other rows
+    """
+    n = matrix.shape[0]
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = max(0, min(k, n - 1 if exclude_self else n))
+    neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    if k == 0:
+        return neighbors, scores
+
+    matrix_t = matrix.T.tocsc()
+    step = block_rows(n, block_bytes)
+    for start in range(0, len(rows), step):
+        block = rows[start:start + step]
+        sims = np.asarray((matrix[block] @ matrix_t).todense(), dtype=np.float32)
+        if exclude_self:
+            sims[np.arange(len(block)), block] = -np.inf
+        part = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        neighbors[start:start + len(block)] = np.take_along_axis(part, order, axis=1)
+        scores[start:start + len(block)] = np.take_along_axis(part_scores, order, axis=1)
+    return neighbors, scores
+
+
+def sparse_nbytes(matrix):
+    """Resident size in bytes of a CSR/CSC matrix (data + indices + indptr)."""
+    return int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
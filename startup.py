@@ -0,0 +1,78 @@
+"""
+Deferred startup for the Streamlit app.
+
+Importing the recommender (NumPy, SciPy) and the TMDb client (requests) and
+opening the model take from about a second to several seconds on large
+catalogs. app.py runs all of it in a background thread, once per process,
+and renders its shell (title, search box, sidebar) meanwhile, with a
+progress bar until the model is ready. This module itself only imports the
+standard library.
+"""
+import threading
+
+
+class BackgroundLoad:
+    """
+    Run a loader once in a daemon thread and report how far it got
+
+    Parameters:
+    loader (callable): loader(progress) -> result, where progress(fraction,
+    message) reports a stage
+    """
+
+    def __init__(self, loader):
+        self.progress = (0.0, "Starting...")
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(loader,), name="startup", daemon=True)
+        self._thread.start()
+
+    def _report(self, fraction, message):
+        self.progress = (fraction, message)
+
+    def _run(self, loader):
+        try:
+            self._result = loader(self._report)
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            self._done.set()
+
+    @property
+    def ready(self):
+        """True once the loader finished (successfully or not)."""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block up to timeout seconds; True if the loader finished."""
+        return self._done.wait(timeout)
+
+    def result(self):
+        """The loader's return value, waiting for it; re-raises the loader's exception."""
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def load_recommender(progress):
+    """
+    Import the model-backed modules, open the model, index its titles and
+    warm the popular pages
+
+    Returns:
+    recommender.SharedModel: The process-wide model holder
+    """
+    progress(0.05, "Loading libraries...")
+    import recommender
+    import response_cache
+    import tmdb_api  # imported here so the first search does not pay for requests
+
+    shared = recommender.shared_model()
+    model = shared.get(progress=progress)
+    progress(0.7, "Indexing titles...")
+    model.prepare()
+    progress(0.9, "Preparing popular movies...")
+    response_cache.warm()
+    return shared
@@ -0,0 +1,57 @@
+"""
+Shared test setup: a small synthetic catalog and its built model.
+
+The project modules read their data, index and cache locations from the
+environment at import time, so these are pointed at a scratch directory
+before any of them is imported.
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+WORKDIR = tempfile.mkdtemp(prefix="movie-buddy-tests-")
+atexit.register(shutil.rmtree, WORKDIR, True)
+os.environ["MOVIE_BUDDY_DATA_DIR"] = os.path.join(WORKDIR, "data")
+os.environ["MOVIE_BUDDY_INDEX_DIR"] = os.path.join(WORKDIR, "index")
+os.environ["MOVIE_BUDDY_TMDB_CACHE"] = os.path.join(WORKDIR, "tmdb.sqlite3")
+for name in ("MOVIE_BUDDY_SEARCH", "MOVIE_BUDDY_VECTORS", "MOVIE_BUDDY_METRICS", "TMDB_API_KEY"):
+    os.environ.pop(name, None)
+
+CATALOG_SIZE = 400
+
+
+@pytest.fixture(scope="session")
+def model():
+    """The process-wide model, built from a synthetic catalog of CATALOG_SIZE movies."""
+    import benchmark
+    import recommender
+
+    benchmark.synthetic_catalog(CATALOG_SIZE, recommender.DATA_DIR, n_words=10000)
+    recommender.build_artifacts()
+    model = recommender.load_model()
+    recommender.swap_model(model)
+    return model
+
+
+@pytest.fixture
+def model_dir(model, tmp_path, monkeypatch):
+    """A private copy of the built model, with its own changelog."""
+    import recommender
+
+    path = str(tmp_path / "model")
+    shutil.copytree(recommender.MODEL_DIR, path)
+    monkeypatch.setattr(recommender, "MODEL_DIR", path)
+    monkeypatch.setattr(recommender, "CHANGES_JSONL", str(tmp_path / "catalog_changes.jsonl"))
+    return path
+
+
+def movie_years(model, cards):
+    """Release year of each card's movie."""
+    return [model.filters.values["year"][model.find_row(card["title"])] for card in cards]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import ann
+import similarity
+
+
+@pytest.fixture(scope="module")
+def matrix():
+    return ann.synthetic_matrix(3000, n_terms=5000, n_topics=60, seed=1)
+
+
+@pytest.fixture(scope="module")
+def index(matrix):
+    return ann.IVFIndex.build(matrix, n_lists=30, nprobe=4)
+
+
+def test_every_row_is_in_exactly_one_partition(matrix, index):
+    assert sorted(index.rows.tolist()) == list(range(matrix.shape[0]))
+    assert index.offsets[0] == 0 and index.offsets[-1] == matrix.shape[0]
+
+
+def test_probing_every_partition_is_exact(matrix, index):
+    for row in range(0, matrix.shape[0], 251):
+        _, scores = index.search_row(row, 10, nprobe=index.n_lists)
+        _, exact = similarity.top_k_for_row(matrix, row, 10)
+        np.testing.assert_allclose(scores, exact, atol=1e-6)
+
+
+def test_default_probes_find_most_true_neighbours(matrix, index):
+    rows = range(0, matrix.shape[0], 31)
+    found = 0
+    for row in rows:
+        approximate, _ = index.search_row(row, 10)
+        exact, _ = similarity.top_k_for_row(matrix, row, 10)
+        found += len(set(approximate.tolist()) & set(exact.tolist()))
+    assert found / (10 * len(rows)) > 0.8
+
+
+def test_batched_table_matches_single_searches(matrix, index):
+    neighbors, scores = index.top_k_all(8)
+    for row in range(0, matrix.shape[0], 97):
+        best, best_scores = index.search_row(row, 8)
+        np.testing.assert_allclose(scores[row][:len(best)], best_scores, atol=1e-6)
+        assert row not in neighbors[row]
+
+
+def test_round_trip_through_arrays(matrix, index):
+    restored = ann.IVFIndex.from_arrays(matrix, index.arrays(), nprobe=4)
+    assert restored.n_lists == index.n_lists
+    assert restored.search_row(5, 10)[0].tolist() == index.search_row(5, 10)[0].tolist()
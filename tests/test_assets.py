@@ -0,0 +1,42 @@
+import os
+
+import pytest
+
+import assets
+
+
+@pytest.fixture
+def build_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "BUILD_DIR", str(tmp_path))
+    assets.build_stylesheet.cache_clear()
+    yield tmp_path
+    assets.build_stylesheet.cache_clear()
+
+
+def test_minify_css():
+    css = "/* card */\na :hover ,\n.card > img {\n  color: red ;\n  margin: 0 auto;\n}\n"
+    assert assets.minify_css(css) == "a :hover,.card>img{color:red;margin:0 auto}"
+
+
+def test_stylesheet_is_built_once_under_its_content_hash(build_dir):
+    url = assets.build_stylesheet()
+    name = url.rsplit("/", 1)[1]
+    assert url == f"{assets.STATIC_URL}/build/{name}" and os.listdir(build_dir) == [name]
+    with open(build_dir / name, encoding="utf-8") as fh:
+        assert fh.read() == assets.minify_css(assets._read_sources())
+    assert assets.build_stylesheet() == url
+
+
+def test_changed_sources_get_a_new_name(build_dir, monkeypatch):
+    url = assets.build_stylesheet()
+    assets.build_stylesheet.cache_clear()
+    monkeypatch.setattr(assets, "_read_sources", lambda: "body { color: blue; }")
+    assert assets.build_stylesheet() != url
+    assert len(os.listdir(build_dir)) == 2
+
+
+def test_links_reference_every_stylesheet(build_dir):
+    links = assets.stylesheet_links()
+    for href in assets.EXTERNAL_STYLESHEETS + (assets.build_stylesheet(),):
+        assert f'<link rel="stylesheet" href="{href}">' in links
+    assert "{" not in links
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+
+from autocomplete import ARTICLES, HEAVY_RANGE, PrefixIndex
+from title_index import normalize_title
+
+TITLES = ["Star Wars", "Stardust", "Star Trek", "The Dark Knight", "Dark City", "Solaris", "Solaris", "Amélie"]
+VOTES = [900, 50, 800, 1000, 300, 40, 60, 500]
+
+
+def titles(rows):
+    return [TITLES[row] for row in rows]
+
+
+def test_completions_are_ranked_by_popularity():
+    index = PrefixIndex(TITLES, weights=VOTES)
+    assert titles(index.complete("sta")) == ["Star Wars", "Star Trek", "Stardust"]
+    assert titles(index.complete("Sta", limit=1)) == ["Star Wars"]
+    assert index.complete("") == [] and index.complete("zz") == []
+
+
+def test_trailing_space_ends_the_word():
+    index = PrefixIndex(TITLES, weights=VOTES)
+    assert titles(index.complete("star ")) == ["Star Wars", "Star Trek"]
+
+
+def test_leading_articles_are_optional():
+    index = PrefixIndex(TITLES, weights=VOTES)
+    assert titles(index.complete("dark")) == ["The Dark Knight", "Dark City"]
+    assert titles(index.complete("ame")) == ["Amélie"]
+
+
+def test_remakes_are_suggested_once():
+    index = PrefixIndex(TITLES, weights=VOTES)
+    assert index.complete("solaris") == [6]
+
+
+def test_precomputed_prefixes_match_a_full_ranking():
+    rng = random.Random(0)
+    words = ["the", "star", "stone", "storm", "a", "night", "dark", "king", "river", "man"]
+    catalog = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f" {i}" for i in range(3000)]
+    weights = np.arange(len(catalog), dtype=np.float32)
+    rng.shuffle(weights)
+    index = PrefixIndex(catalog, weights=weights)
+    assert any(hi - lo > HEAVY_RANGE for lo, hi in (index._range("st"), index._range("the ")))
+
+    def expected(prefix, limit):
+        keys = [normalize_title(title) for title in catalog]
+        aliases = [[key] + [key[len(a):] for a in ARTICLES if key.startswith(a) and len(key) > len(a)]
+                   for key in keys]
+        rows = [row for row, names in enumerate(aliases) if any(name.startswith(prefix) for name in names)]
+        return sorted(rows, key=lambda row: -weights[row])[:limit]
+
+    for prefix in ("s", "st", "sto", "the ", "dark k", "man 1"):
+        assert index.complete(prefix, limit=7) == expected(prefix, 7), prefix
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+import batch
+import recommender
+from conftest import ROOT
+
+
+def test_batch_matches_single_queries(model):
+    titles = [model.titles[0], "no such movie", model.titles[3], model.titles[0]]
+    records = list(batch.recommend_batch(titles, num=5))
+    assert [record["query"] for record in records] == titles
+    assert records[1]["title"] is None and records[1]["recommendations"] == []
+    for record in (records[0], records[2]):
+        expected = [card["title"] for card in recommender.get_recommendations(record["title"], num=5)]
+        assert [rec["title"] for rec in record["recommendations"]] == expected
+    assert records[3] == dict(records[0])
+
+
+def test_closed_pipe_exits_quietly(model, tmp_path):
+    seeds = tmp_path / "seeds.txt"
+    seeds.write_text("\n".join(list(model.titles) * 20), encoding="utf-8")
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "batch.py"), str(seeds), "--workers", "1"],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=ROOT)
+    assert proc.stdout.readline().startswith(b"{")
+    proc.stdout.close()
+    stderr = proc.stderr.read()
+    assert proc.wait(timeout=60) == 0
+    assert b"Traceback" not in stderr and b"BrokenPipe" not in stderr
@@ -0,0 +1,31 @@
+import pandas as pd
+
+import benchmark
+
+
+def test_synthetic_catalog_is_reproducible(tmp_path):
+    benchmark.synthetic_catalog(50, str(tmp_path / "a"), n_words=2000)
+    benchmark.synthetic_catalog(50, str(tmp_path / "b"), n_words=2000)
+    for name in ("tmdb_5000_movies.csv", "tmdb_5000_credits.csv"):
+        first, second = pd.read_csv(tmp_path / "a" / name), pd.read_csv(tmp_path / "b" / name)
+        pd.testing.assert_frame_equal(first, second)
+    movies = pd.read_csv(tmp_path / "a" / "tmdb_5000_movies.csv")
+    assert len(movies) == 50 and movies["title"].is_unique and movies["id"].is_unique
+
+
+def test_latency_stats_are_reported_in_milliseconds():
+    stats = benchmark.latency_stats([0.001] * 99 + [0.1])
+    assert stats["n"] == 100 and stats["p50_ms"] == 1.0 and stats["p99_ms"] > 1.0
+
+
+def test_compare_flags_regressions_in_the_right_direction():
+    base = {"git": "abc", "catalogs": {"5000": {"recommend": {"p50_ms": 1.0, "n": 500}, "batch_seeds_per_s": 1000.0,
+                                                "footprint_bytes": 100}}}
+    new = {"git": "def", "catalogs": {"5000": {"recommend": {"p50_ms": 1.05, "n": 500}, "batch_seeds_per_s": 800.0,
+                                               "footprint_bytes": 200}}}
+    rows = {metric: regressed for metric, _, _, _, regressed in benchmark.compare(base, new)}
+    assert rows == {
+        "catalogs.5000.batch_seeds_per_s": True,
+        "catalogs.5000.footprint_bytes": True,
+        "catalogs.5000.recommend.p50_ms": False,
+    }
@@ -0,0 +1,38 @@
+import os
+
+import catalog
+import recommender
+
+
+def test_upserted_movie_is_recommended_like_its_twin(model, model_dir):
+    overview = model.overviews[0]
+    report = catalog.apply_changes(upserts=[{"id": 10 ** 6, "title": "Twin Picture", "overview": overview}],
+                                   path=model_dir)
+    assert report["upserted"] == 1 and not report["refit_due"]
+    updated = recommender.load_model(model_dir)
+    cards = recommender.get_recommendations("Twin Picture", num=3, model=updated)
+    assert cards[0]["title"] == model.titles[0]
+    assert os.path.exists(recommender.CHANGES_JSONL)
+
+
+def test_deleted_movie_leaves_every_list(model, model_dir):
+    title = model.titles[1]
+    catalog.apply_changes(deletes=[int(model.columns["id"][1])], path=model_dir)
+    updated = recommender.load_model(model_dir)
+    assert updated.find_row(title) is None
+    for row in range(len(updated.titles)):
+        assert title not in {updated.titles[other] for other in updated.similar_rows(row, 6)}
+
+
+def test_status_names_the_threshold_that_was_passed(model_dir, capsys):
+    assert catalog.status(model_dir)["reasons"] == []
+    gibberish = " ".join(f"zzq{i}" for i in range(40))
+    report = catalog.apply_changes(upserts=[{"id": 10 ** 6, "title": "Noise", "overview": gibberish}],
+                                   path=model_dir)
+    assert report["refit_due"] and report["oov_rate"] > catalog.OOV_THRESHOLD
+    reasons = catalog.status(model_dir)["reasons"]
+    assert len(reasons) == 1 and reasons[0].startswith("out-of-vocabulary words")
+
+    assert recommender.main(["check-index"]) == 1
+    out = capsys.readouterr().out
+    assert "out-of-vocabulary words" in out and "IDF drift" not in out
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import ann
+from embeddings import Embeddings, fit_lsa, quantize
+
+
+@pytest.fixture(scope="module")
+def tfidf():
+    return ann.synthetic_matrix(1500, n_terms=3000, n_topics=40, seed=2)
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("int8", 0.01), ("float16", 0.002)])
+def test_quantisation_error_is_small(dtype, tolerance):
+    vectors = np.random.default_rng(0).normal(size=(200, 64)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    codes, scales = quantize(vectors, dtype)
+    assert codes.dtype == np.dtype(dtype)
+    restored = codes.astype(np.float32) * scales[:, None]
+    assert np.abs(restored - vectors).max() < tolerance
+
+
+def test_unknown_dtype_is_rejected():
+    with pytest.raises(ValueError):
+        quantize(np.ones((2, 2), dtype=np.float32), "int4")
+
+
+def test_quantised_scores_follow_the_float_vectors(tfidf):
+    _, vectors = fit_lsa(tfidf, dim=32)
+    embeddings = Embeddings.fit(tfidf, dim=32)
+    exact = vectors @ vectors[7]
+    np.testing.assert_allclose(embeddings.scores(embeddings.vectors([7]))[:, 0], exact, atol=0.02)
+    best, _ = embeddings.top_k_for_row(7, 10)
+    exact[7] = -np.inf
+    assert len(set(best.tolist()) & set(np.argsort(-exact)[:10].tolist())) >= 8
+
+
+def test_blocked_table_matches_single_rows_and_seeds(tfidf):
+    embeddings = Embeddings.fit(tfidf, dim=32, dtype="float16")
+    neighbors, scores = embeddings.top_k_blocked(5, rows=[3, 400], block_bytes=4 * 1500 * 1)
+    for i, row in enumerate((3, 400)):
+        _, best_scores = embeddings.top_k_for_row(row, 5)
+        np.testing.assert_allclose(scores[i], best_scores, atol=1e-5)
+    first, second = embeddings.scores(embeddings.vectors([3, 400])).T
+    expected = first - 0.5 * second
+    np.testing.assert_allclose(embeddings.seed_scores([3, 400], [1.0, -0.5]), expected, atol=1e-5)
+    candidates = embeddings.seed_scores([3, 400], [1.0, -0.5], candidates=[0, 9])
+    np.testing.assert_allclose(candidates, expected[[0, 9]], atol=1e-5)
+
+
+def test_new_documents_project_next_to_their_twins(tfidf):
+    embeddings = Embeddings.fit(tfidf, dim=32)
+    projected = embeddings.transform(tfidf[[11]])
+    assert embeddings.scores(projected)[:, 0].argmax() == 11
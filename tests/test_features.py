@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pytest
+
+import recommender
+from features import DEFAULT_WEIGHTS, FIELDS, FieldFeatures, parse_names
+
+
+@pytest.fixture(scope="module")
+def catalog(model):
+    movies = recommender.load_movies()
+    _, tfidf = recommender.fit_tfidf(movies["overview"])
+    return movies, tfidf, FieldFeatures.fit(movies, tfidf)
+
+
+def test_parse_names():
+    cast = json.dumps([{"name": "B", "order": 1}, {"name": "A", "order": 0}, {"name": "C", "order": 2}])
+    assert parse_names(cast, limit=2) == ["a", "b"]
+    crew = json.dumps([{"name": "Ridley Scott", "job": "Director"}, {"name": "X", "job": "Editor"}])
+    assert parse_names(crew, job="Director", casefold=False) == ["Ridley Scott"]
+    assert parse_names("not json") == [] and parse_names(None) == []
+
+
+def test_scores_are_the_weighted_mean_of_field_cosines(catalog):
+    _, _, features = catalog
+    weights = {"overview": 2.0, "genres": 1.0, "keywords": 0.0, "cast": 0.5, "director": 0.5}
+    total = sum(weights.values())
+    expected = np.zeros(features.matrix.shape[0], dtype=np.float32)
+    for position, field in enumerate(FIELDS):
+        block = features.matrix[:, features.column_field == position]
+        expected += weights[field] / total * (block @ block[4].T).toarray().ravel()
+    np.testing.assert_allclose(features.scores(4, weights), expected, atol=1e-5)
+    weighted = features.weighted_matrix(weights)
+    np.testing.assert_allclose((weighted @ weighted[4].T).toarray().ravel(), expected, atol=1e-5)
+
+
+def test_missing_or_zero_weights_fall_back_to_the_defaults(catalog):
+    _, _, features = catalog
+    default = features.column_weights()
+    np.testing.assert_allclose(features.column_weights(dict.fromkeys(FIELDS, 0)), default)
+    np.testing.assert_allclose(features.column_weights({"genres": DEFAULT_WEIGHTS["genres"]}), default)
+    genres = features.column_field == FIELDS.index("genres")
+    assert not features.column_weights({"genres": 0})[genres].any()
+
+
+def test_transform_reproduces_fitted_rows(catalog):
+    movies, tfidf, features = catalog
+    rows = features.transform(movies.iloc[[3, 8]].to_dict("records"), tfidf[[3, 8]])
+    np.testing.assert_allclose(rows.toarray(), features.matrix[[3, 8]].toarray(), atol=1e-6)
+
+
+def test_round_trip_through_arrays(catalog):
+    _, _, features = catalog
+    restored = FieldFeatures.from_arrays(features.arrays(), features.matrix.shape[0])
+    np.testing.assert_allclose(restored.scores(2), features.scores(2))
+    assert restored.vocabularies == features.vocabularies
@@ -0,0 +1,88 @@
+import json
+
+import numpy as np
+import pytest
+
+import recommender
+from conftest import movie_years
+from filters import FilterError, FilterIndex, normalize_filters
+
+
+def genres(*names):
+    return json.dumps([{"id": i, "name": name} for i, name in enumerate(names)])
+
+
+MOVIES = [
+    {"release_date": "1950-05-01", "runtime": 90, "vote_count": 10, "original_language": "en", "genres": genres("Drama")},
+    {"release_date": "1995-01-01", "runtime": 120, "vote_count": 500, "original_language": "fr",
+     "genres": genres("Action", "Drama")},
+    {"release_date": "2010-07-16", "runtime": 148, "vote_count": 20000, "original_language": "en",
+     "genres": genres("Action", "Science Fiction")},
+    {"release_date": None, "runtime": None, "vote_count": None, "original_language": None, "genres": "[]"},
+]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return FilterIndex.build(MOVIES)
+
+
+def rows(index, filters):
+    mask = index.mask(filters)
+    return None if mask is None else np.flatnonzero(mask).tolist()
+
+
+@pytest.mark.parametrize("filters, expected", [
+    ({"year": (1950, 1995)}, [0, 1]),
+    ({"year": (None, 1949)}, []),
+    ({"year": (1951, None)}, [1, 2]),
+    ({"runtime": (100, None)}, [1, 2]),
+    ({"min_votes": 500}, [1, 2]),
+    ({"genres": ["drama"]}, [0, 1]),
+    ({"genres": ["Drama", "Science Fiction"]}, [0, 1, 2]),
+    ({"languages": ["en"]}, [0, 2]),
+    ({"genres": ["Action"], "languages": ["en"], "year": (2000, 2020)}, [2]),
+    ({"genres": ["Western"]}, []),
+])
+def test_mask(index, filters, expected):
+    assert rows(index, filters) == expected
+
+
+def test_inactive_filters(index):
+    assert rows(index, None) is None
+    assert rows(index, {"genres": [], "languages": "", "year": None}) is None
+
+
+@pytest.mark.parametrize("filters", [
+    {"genres": "Drama"},
+    {"languages": "en"},
+    {"genres": [1]},
+    {"min_votes": "ten"},
+    {"min_votes": True},
+    {"year": 1990},
+    {"year": [1990]},
+    {"year": ["a", None]},
+    {"decade": [1990, 2000]},
+    [("year", (1990, 2000))],
+])
+def test_malformed_filters_are_rejected(index, filters):
+    with pytest.raises(FilterError):
+        index.mask(filters)
+
+
+def test_normalize_filters():
+    assert normalize_filters({"year": [2000, None], "genres": ["drama", "Action", "Drama"], "languages": ["fr", "en"],
+                              "runtime": (), "min_votes": None}) == {
+        "year": (2000, None), "genres": ("action", "drama"), "languages": ("en", "fr")}
+
+
+def test_filtered_recommendations_fill_a_page(model):
+    title = model.titles[0]
+    for num, filters in [(6, {"year": (1990, 2024)}), (recommender.TOP_K + 20, {"year": (1990, 2024)}),
+                         (6, {"year": (1920, 1925), "min_votes": 2})]:
+        cards = recommender.get_recommendations(title, num=num, filters=filters)
+        passing = int(model.filter_mask(filters).sum()) - bool(model.filter_mask(filters)[0])
+        assert len(cards) == min(num, passing)
+        low, high = filters["year"]
+        assert all(low <= year <= high for year in movie_years(model, cards))
+        assert title not in [card["title"] for card in cards]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from metadata import TextColumn
+
+STRINGS = ["Alien", "", "Amélie", None, "千と千尋の神隠し", "Heat"]
+EXPECTED = [value or "" for value in STRINGS]
+
+
+def test_rows_decode_to_the_original_strings():
+    column = TextColumn.from_strings(STRINGS)
+    assert len(column) == len(STRINGS)
+    assert [column[row] for row in range(len(column))] == EXPECTED
+    assert column[-1] == "Heat" and column[1:3] == EXPECTED[1:3]
+    assert column.tolist() == EXPECTED
+    with pytest.raises(IndexError):
+        column[len(STRINGS)]
+
+
+def test_take_and_select_keep_the_requested_order():
+    column = TextColumn.from_strings(STRINGS)
+    rows = [4, 0, 2, 0, 3]
+    assert column.take(rows) == [EXPECTED[row] for row in rows]
+    assert column.select(rows).tolist() == [EXPECTED[row] for row in rows]
+    ascii_only = TextColumn.from_strings(["Heat", "Alien", "Up"])
+    assert ascii_only.take([2, 0]) == ["Up", "Heat"]
+    assert column.take([]) == []
+
+
+def test_extend_and_round_trip_through_arrays(tmp_path):
+    column = TextColumn.from_strings(STRINGS).extend(["Ran", None])
+    for name, values in column.arrays().items():
+        np.save(tmp_path / f"{name}.npy", values)
+    loaded = TextColumn.from_arrays({name: np.load(tmp_path / f"{name}.npy", mmap_mode="r")
+                                     for name in ("data", "offsets")})
+    assert loaded.tolist() == EXPECTED + ["Ran", ""]
+    assert loaded.nbytes() == len("".join(EXPECTED + ["Ran"]).encode("utf-8")) + 8 * (len(STRINGS) + 3)
@@ -0,0 +1,52 @@
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.reset()
+    yield
+    metrics.reset()
+    metrics._local.trace = None
+
+
+def test_disabled_instrumentation_is_free():
+    assert not metrics.ENABLED
+
+    def work():
+        return 1
+
+    assert metrics.timed("work")(work) is work
+    assert metrics.span("work") is metrics.span("other")
+    metrics.count("errors")
+    assert metrics.snapshot()["counters"] == {}
+
+
+def test_spans_counters_and_traces(enabled):
+    @metrics.timed("outer")
+    def outer():
+        with metrics.span("inner"):
+            pass
+        return "done"
+
+    metrics.begin_trace()
+    assert outer() == "done" and outer() == "done"
+    metrics.count("errors", 2)
+    snapshot = metrics.snapshot()
+    assert snapshot["spans"]["outer"]["count"] == 2 and snapshot["spans"]["inner"]["count"] == 2
+    assert snapshot["counters"] == {"errors": 2}
+    assert [(name, depth) for name, _, depth in metrics.trace()] == [("inner", 1), ("outer", 0)] * 2
+
+
+def test_prometheus_buckets_are_cumulative(enabled, monkeypatch):
+    for seconds in (0.0002, 0.003, 0.003, 20.0):
+        metrics.observe("lookup", seconds)
+    monkeypatch.setitem(metrics._collectors, "test_cache", lambda: {"hits": 3, "enabled": True, "name": "x"})
+    text = metrics.prometheus_text()
+    assert 'movie_buddy_span_seconds_bucket{span="lookup",le="0.00025"} 1' in text
+    assert 'movie_buddy_span_seconds_bucket{span="lookup",le="0.005"} 3' in text
+    assert 'movie_buddy_span_seconds_bucket{span="lookup",le="+Inf"} 4' in text
+    assert 'movie_buddy_span_seconds_count{span="lookup"} 4' in text
+    assert "movie_buddy_test_cache_hits 3" in text and "test_cache_enabled" not in text
@@ -0,0 +1,61 @@
+import json
+import mmap
+import os
+import shutil
+
+import numpy as np
+
+import model_store
+import recommender
+
+
+def is_mapped(array):
+    """True if array is a view of a memory-mapped file (scipy wraps the memmaps in plain views)."""
+    while array is not None:
+        if isinstance(array, (np.memmap, mmap.mmap)):
+            return True
+        array = getattr(array, "base", None)
+    return False
+
+
+def test_loaded_model_is_memory_mapped_and_matches_a_fresh_fit(model):
+    artifacts = model_store.load_model(recommender.MODEL_DIR)
+    assert all(is_mapped(array) for array in (artifacts["tfidf"].data, artifacts["tfidf"].indices,
+                                               artifacts["neighbors"], artifacts["columns"]["id"]))
+    assert not artifacts["neighbors"].flags.writeable
+    fitted = recommender.fit_model()
+    assert (artifacts["tfidf"] != fitted.tfidf).nnz == 0
+    assert artifacts["texts"]["title"].tolist() == fitted.titles.tolist()
+    for row in range(0, len(fitted.titles), 37):
+        assert model.similar_rows(row, 5) == fitted.similar_rows(row, 5)
+
+
+def test_missing_or_older_artifacts_are_ignored(model, tmp_path):
+    assert model_store.read_manifest(str(tmp_path)) is None
+    path = str(tmp_path / "model")
+    shutil.copytree(recommender.MODEL_DIR, path)
+    manifest_path = os.path.join(path, model_store.MANIFEST)
+    with open(manifest_path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    manifest["format_version"] = model_store.FORMAT_VERSION - 1
+    with open(manifest_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+    assert model_store.load_model(path) is None
+
+
+def test_touching_a_csv_keeps_the_model_but_editing_it_does_not(model, tmp_path, monkeypatch):
+    csv_path = str(tmp_path / "movies.csv")
+    shutil.copy(recommender.MOVIES_CSV, csv_path)
+    monkeypatch.setattr(recommender, "_source_files", lambda: [csv_path])
+    fingerprint = recommender.dataset_fingerprint()
+    assert not recommender.index_is_stale(fingerprint)
+
+    stat = os.stat(csv_path)
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert not recommender.index_is_stale(fingerprint)
+
+    with open(csv_path, "r+b") as fh:
+        first = fh.read(1)
+        fh.seek(0)
+        fh.write(b"X" if first != b"X" else b"Y")
+    assert recommender.index_is_stale(fingerprint)
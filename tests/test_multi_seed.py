@@ -0,0 +1,49 @@
+import numpy as np
+
+import recommender
+from conftest import movie_years
+
+
+def brute_force(model, seed_weights, num):
+    """Titles ranked by the weighted sum of cosine similarities to the seeds."""
+    dense = model.tfidf.toarray()
+    rows = [model.find_row(title) for title in seed_weights]
+    scores = sum(weight * dense @ dense[row] for row, weight in zip(rows, seed_weights.values()))
+    scores[rows] = -np.inf
+    return [model.titles[row] for row in np.argsort(-scores, kind="stable")[:num]]
+
+
+def titles(cards):
+    return [card["title"] for card in cards]
+
+
+def test_one_seed_matches_single_recommendations(model):
+    title = model.titles[5]
+    expected = titles(recommender.get_recommendations(title, num=8))
+    assert titles(recommender.get_recommendations_multi([title], num=8)) == expected
+
+
+def test_seeds_are_combined_and_never_returned(model):
+    seeds = {model.titles[0]: 1.0, model.titles[1]: 2.0, model.titles[2]: 0.5}
+    result = titles(recommender.get_recommendations_multi(seeds, num=10))
+    assert result == brute_force(model, seeds, 10)
+    assert not set(result) & set(seeds)
+
+
+def test_negative_seeds_push_results_away(model):
+    liked, disliked = model.titles[0], model.titles[3]
+    result = titles(recommender.get_recommendations_multi([liked], num=10, negative={disliked: 1.5}))
+    assert result == brute_force(model, {liked: 1.0, disliked: -1.5}, 10)
+    assert disliked not in result
+
+
+def test_unknown_or_only_negative_seeds_give_nothing(model):
+    assert recommender.get_recommendations_multi(["no such movie"]) == []
+    assert recommender.get_recommendations_multi([], negative=[model.titles[0]]) == []
+
+
+def test_filters_apply_to_the_combined_query(model):
+    cards = recommender.get_recommendations_multi([model.titles[0], model.titles[1]], num=6,
+                                                  filters={"year": [2000, None]})
+    assert len(cards) == 6
+    assert all(year >= 2000 for year in movie_years(model, cards))
@@ -0,0 +1,63 @@
+import csv
+import json
+
+import pytest
+
+import prefetch_posters
+import recommender
+import tmdb_http
+from benchmark import MockTMDb
+
+
+@pytest.fixture
+def job(model, tmp_path, monkeypatch):
+    """Point the job at a private checkpoint and CSV, and restore the TMDb schedule afterwards."""
+    monkeypatch.setattr(prefetch_posters, "CHECKPOINT", str(tmp_path / "posters.jsonl"))
+    monkeypatch.setattr(recommender, "POSTERS_CSV", str(tmp_path / "posters.csv"))
+    monkeypatch.setattr(tmdb_http, "MAX_QUEUE_WAIT", tmdb_http.MAX_QUEUE_WAIT)
+    yield tmp_path
+    tmdb_http.configure_rate_limit(tmdb_http.RATE_LIMIT, tmdb_http.RATE_BURST, tmdb_http.MAX_QUEUE_WAIT)
+
+
+def serve(monkeypatch, **options):
+    mock = MockTMDb(latency=0, **options)
+    monkeypatch.setattr(tmdb_http, "API_BASE", mock.url)
+    return mock
+
+
+def read_csv(path):
+    with open(path, newline="", encoding="utf-8") as fh:
+        return list(csv.DictReader(fh))
+
+
+def test_details_are_stored(job, monkeypatch):
+    n_movies = len(recommender.get_model().titles)
+    with serve(monkeypatch):
+        assert prefetch_posters.prefetch("key", rate=1000, limit=3) == (3, n_movies - 3)
+    rows = read_csv(recommender.POSTERS_CSV)
+    assert rows[0] == {"id": "1", "poster_path": "/1.jpg", "backdrop_path": "", "overview": "Overview of movie 1",
+                       "release_date": "1999-03-31", "vote_average": "7.5", "runtime": "120"}
+
+
+def test_rerun_resumes_from_the_checkpoint(job, monkeypatch):
+    n_movies = len(recommender.get_model().titles)
+    with serve(monkeypatch) as mock:
+        assert prefetch_posters.prefetch("key", rate=1000, limit=10) == (10, n_movies - 10)
+        with open(prefetch_posters.CHECKPOINT, "a", encoding="utf-8") as fh:
+            # A run killed mid-write, and a record from before details were stored
+            fh.write(json.dumps({"id": 11, "poster_path": "/11.jpg", "backdrop_path": None}) + "\n")
+            fh.write('{"id": 12, "poster_pa')
+        assert prefetch_posters.prefetch("key", rate=1000) == (n_movies - 10, 0)
+        assert mock.server.requests == n_movies
+    assert len(read_csv(recommender.POSTERS_CSV)) == n_movies
+
+
+def test_rate_limited_answers_are_retried(job, monkeypatch):
+    n_movies = len(recommender.get_model().titles)
+    throttled = tmdb_http.scheduler_stats()["throttled"]
+    with serve(monkeypatch, throttle_every=4) as mock:
+        assert prefetch_posters.prefetch("key", rate=1000, workers=2, limit=30) == (30, n_movies - 30)
+        requests = mock.server.requests
+    # Every 429 was retried until the movie was fetched
+    assert tmdb_http.scheduler_stats()["throttled"] - throttled == requests - 30 > 0
+    assert all(row["overview"] for row in read_csv(recommender.POSTERS_CSV))
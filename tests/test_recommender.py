@@ -0,0 +1,28 @@
+import numpy as np
+
+import recommender
+import similarity
+
+
+def test_neighbour_table_holds_the_exact_top_k(model):
+    assert model.neighbors.shape == (len(model.titles), recommender.TOP_K)
+    for row in range(0, len(model.titles), 41):
+        _, exact = similarity.top_k_for_row(model.tfidf, row, recommender.TOP_K)
+        # Scores are stored as float16
+        np.testing.assert_allclose(model.neighbor_scores[row], exact, atol=1e-3)
+        assert row not in model.neighbors[row]
+
+
+def test_titles_are_matched_case_insensitively(model):
+    title = model.titles[10]
+    cards = recommender.get_recommendations(title.upper(), num=4)
+    assert [card["title"] for card in cards] == [model.titles[r] for r in model.neighbors[10, :4]]
+    assert set(cards[0]) == {"title", "overview", "poster"}
+    assert recommender.get_recommendations("no such movie") == []
+
+
+def test_longer_lists_than_the_table_are_scored(model):
+    num = recommender.TOP_K + 20
+    rows = model.similar_rows(12, num)
+    assert len(rows) == num and 12 not in rows
+    assert rows[:recommender.TOP_K] == model.neighbors[12].tolist()
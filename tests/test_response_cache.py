@@ -0,0 +1,48 @@
+import pytest
+
+import response_cache
+from conftest import movie_years
+
+
+def test_ranges_keep_their_order():
+    keys = {response_cache.cache_key("Alien", filters={"year": year})
+            for year in ([None, 1950], [1950, None], [1950, 2000], [2000, 1950])}
+    assert len(keys) == 4
+
+
+def test_equivalent_filters_share_a_key():
+    key = response_cache.cache_key("Alien", filters={"genres": ["Drama", "Action"], "languages": ["fr", "en"]})
+    assert key == response_cache.cache_key(
+        "alien", filters={"genres": ["action", "drama", "Drama"], "languages": ("en", "fr"), "runtime": None})
+    assert response_cache.cache_key("Alien") == response_cache.cache_key("Alien", filters={"genres": []})
+
+
+def test_default_weights_share_a_key():
+    assert response_cache.cache_key("Alien", weights={"genres": 0.5}) == response_cache.cache_key("Alien")
+    assert response_cache.cache_key("Alien", weights={"genres": 2.0}) != response_cache.cache_key("Alien")
+
+
+def test_invalid_filters_are_rejected():
+    with pytest.raises(ValueError):
+        response_cache.cache_key("Alien", filters={"year": 1950})
+
+
+def test_half_open_ranges_get_their_own_pages(model):
+    response_cache.clear()
+    title = model.titles[0]
+    before = response_cache.get_page(title, num=6, filters={"year": [None, 1950]})
+    after = response_cache.get_page(title, num=6, filters={"year": [1950, None]})
+    assert before and after
+    assert all(year <= 1950 for year in movie_years(model, before))
+    assert all(year >= 1950 for year in movie_years(model, after))
+
+
+def test_pages_of_other_versions_are_not_stored(model):
+    response_cache.clear()
+    title = model.titles[1]
+    cards = response_cache.get_page(title, num=3, model=model)
+    response_cache.put_page(title, 3, None, None, [{"title": "stale"}], "previous-version")
+    assert response_cache.get_page(title, num=3) == cards
+    assert response_cache.stats()["model_version"] == model.version
+    response_cache.put_page(title, 3, None, None, [{"title": "with posters"}], model.version)
+    assert response_cache.get_page(title, num=3) == [{"title": "with posters"}]
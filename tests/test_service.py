@@ -0,0 +1,106 @@
+import asyncio
+import json
+from urllib.parse import urlencode
+
+import pytest
+
+import recommender
+import response_cache
+import service
+
+
+def call(method, path, body=None, **query):
+    """Drive the ASGI app directly: (status, decoded body)."""
+    payload = b"" if body is None else json.dumps(body).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": urlencode(query).encode(), "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+    }
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    async def run():
+        try:
+            await service.app(scope, receive, send)
+        except Exception:
+            pass  # re-raised after the 500 response was sent
+
+    asyncio.run(run())
+    status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+    data = b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+    try:
+        return status, json.loads(data)
+    except ValueError:
+        return status, data.decode()
+
+
+@pytest.mark.parametrize("body", [
+    {"weights": [1]},
+    {"weights": "x"},
+    {"weights": {"genres": "x"}},
+    {"filters": [1]},
+    {"filters": {"year": 1990}},
+    {"filters": {"genres": "Drama"}},
+    {"filters": {"min_votes": "ten"}},
+    {"filters": {"decade": [1990]}},
+    {"num": 1.9},
+    {"num": True},
+    {"num": 0},
+])
+def test_malformed_recommend_requests_are_400(model, body):
+    status, response = call("POST", "/recommend", dict({"title": model.titles[0]}, **body))
+    assert status == 400
+    assert response["error"]
+
+
+@pytest.mark.parametrize("body", [{"seeds": 5}, {"seeds": ["a"], "negative": 3}, {"title": 5}, {}])
+def test_malformed_seeds_and_titles_are_400(model, body):
+    assert call("POST", "/recommend", body)[0] == 400
+
+
+def test_recommend(model):
+    status, response = call("GET", "/recommend", title=model.titles[0], num="3")
+    assert status == 200
+    assert response["match"]["title"] == model.titles[0]
+    assert len(response["results"]) == 3
+    status, response = call("POST", "/recommend", {"seeds": {model.titles[0]: 2}, "negative": [model.titles[1]]})
+    assert status == 200 and response["results"]
+
+
+def test_unknown_title_resolves_once(model, monkeypatch):
+    calls = []
+
+    def resolve_title(query):
+        calls.append(query)
+        return {"title": None, "id": None, "exact": False, "alternatives": ["Alien"]}
+
+    monkeypatch.setattr(recommender, "resolve_title", resolve_title)
+    status, response = call("GET", "/recommend", title="zzzz")
+    assert status == 404
+    assert response == {"error": "unknown title", "alternatives": ["Alien"]}
+    assert calls == ["zzzz"]
+
+
+def test_internal_errors_are_500_without_details(model, monkeypatch):
+    def get_page(*args, **kwargs):
+        raise ValueError("internal detail")
+
+    monkeypatch.setattr(response_cache, "get_page", get_page)
+    status, response = call("GET", "/recommend", title=model.titles[0])
+    assert status == 500
+    assert "internal detail" not in str(response)
+
+
+def test_batch(model):
+    status, response = call("POST", "/batch", {"titles": [model.titles[0], "zzzz"], "num": 2})
+    assert status == 200
+    assert [len(record["recommendations"]) for record in response["results"]] == [2, 0]
+    assert call("POST", "/batch", {"titles": [model.titles[0]], "weights": [1]})[0] == 400
+    assert call("POST", "/batch", {"titles": "x"})[0] == 400
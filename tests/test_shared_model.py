@@ -0,0 +1,50 @@
+import threading
+
+import catalog
+import recommender
+
+
+def test_concurrent_first_calls_load_once(model_dir, monkeypatch):
+    loads = []
+    load_model = recommender.load_model
+
+    def counting_load(path, progress=None):
+        loads.append(path)
+        return load_model(path, progress=progress)
+
+    monkeypatch.setattr(recommender, "load_model", counting_load)
+    shared = recommender.SharedModel(model_dir)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(shared.get())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loads == [model_dir]
+    assert len(results) == 4 and all(result is results[0] for result in results)
+
+
+def test_reload_swaps_in_a_rebuilt_model_only(model, model_dir):
+    shared = recommender.SharedModel(model_dir)
+    current = shared.get()
+    assert shared.reload() is None
+    catalog.apply_changes(deletes=[int(model.columns["id"][0])], path=model_dir)
+    updated = shared.reload()
+    assert updated is not None and updated.version != current.version
+    assert shared.get() is updated and updated.title_index._postings is not None
+    # Readers holding the previous model keep a working one
+    assert current.find_row(model.titles[0]) == 0 and updated.find_row(model.titles[0]) is None
+    assert shared.reload() is None
+
+
+def test_reload_checks_are_rate_limited(model_dir, monkeypatch):
+    shared = recommender.SharedModel(model_dir)
+    assert not shared.reload_if_changed()  # nothing loaded yet
+    shared.get()
+    assert not shared.reload_if_changed()
+    monkeypatch.setattr(shared, "_next_check", 0)
+    assert shared.reload_if_changed()
+    assert not shared.reload_if_changed()
+    for thread in threading.enumerate():
+        if thread.name == "model-reload":
+            thread.join()
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from scipy.sparse import random as sparse_random
+
+import similarity
+
+
+@pytest.fixture(scope="module")
+def matrix():
+    rows = sparse_random(300, 500, density=0.02, format="csr", dtype=np.float32, random_state=0)
+    norms = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return (rows.multiply(1 / norms[:, None])).tocsr().astype(np.float32)
+
+
+def dense_top_k(matrix, row, k):
+    scores = (matrix @ matrix[row].T).toarray().ravel()
+    scores[row] = -np.inf
+    return scores, np.sort(scores)[::-1][:k]
+
+
+def test_top_k_orders_and_skips_excluded_scores():
+    scores = np.array([0.5, -np.inf, 0.9, 0.1, -np.inf], dtype=np.float32)
+    assert similarity.top_k(scores, 2).tolist() == [2, 0]
+    assert similarity.top_k(scores, 10).tolist() == [2, 0, 3]
+    assert similarity.top_k(scores, 0).tolist() == []
+
+
+@pytest.mark.parametrize("block_bytes", [4 * 300 * 7, similarity.DEFAULT_BLOCK_BYTES])
+def test_blocked_products_match_dense_scores(matrix, block_bytes):
+    neighbors, scores = similarity.top_k_blocked(matrix, 10, block_bytes=block_bytes)
+    assert neighbors.shape == (300, 10)
+    for row in range(0, 300, 23):
+        dense, best = dense_top_k(matrix, row, 10)
+        np.testing.assert_allclose(scores[row], best, atol=1e-6)
+        np.testing.assert_allclose(dense[neighbors[row]], scores[row], atol=1e-6)
+        assert row not in neighbors[row]
+
+
+def test_single_row_search_matches_the_blocked_table(matrix):
+    neighbors, scores = similarity.top_k_blocked(matrix, 5, rows=[7, 42])
+    for i, row in enumerate((7, 42)):
+        _, best_scores = similarity.top_k_for_row(matrix, row, 5)
+        np.testing.assert_allclose(best_scores, scores[i], atol=1e-6)
+
+
+def test_seed_scores_are_the_weighted_sum_of_row_scores(matrix):
+    expected = 2 * similarity.row_scores(matrix, 3) - 0.5 * similarity.row_scores(matrix, 9)
+    np.testing.assert_allclose(similarity.seed_scores(matrix, [3, 9], [2, -0.5]), expected, atol=1e-6)
+    candidates = np.array([1, 5, 200])
+    np.testing.assert_allclose(similarity.seed_scores(matrix, [3, 9], [2, -0.5], candidates),
+                               expected[candidates], atol=1e-6)
@@ -0,0 +1,47 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+
+import startup
+from conftest import ROOT
+
+
+def test_loader_runs_in_the_background_and_reports_progress():
+    release = threading.Event()
+
+    def loader(progress):
+        progress(0.5, "Halfway...")
+        release.wait()
+        return "model"
+
+    load = startup.BackgroundLoad(loader)
+    assert not load.wait(0.05) and not load.ready
+    assert load.progress == (0.5, "Halfway...")
+    release.set()
+    assert load.result() == "model" and load.ready
+
+
+def test_loader_errors_are_raised_to_the_caller():
+    def loader(progress):
+        raise RuntimeError("no model")
+
+    load = startup.BackgroundLoad(loader)
+    assert load.wait(5)
+    with pytest.raises(RuntimeError, match="no model"):
+        load.result()
+
+
+def test_importing_startup_stays_light():
+    heavy = ("numpy", "scipy", "pandas", "sklearn", "requests", "recommender")
+    code = f"import startup, sys; print([m for m in {heavy!r} if m in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_load_recommender_prepares_the_shared_model(model):
+    stages = []
+    shared = startup.load_recommender(lambda fraction, message: stages.append(fraction))
+    assert shared.get() is model and model.title_index._postings is not None
+    assert stages == sorted(stages) and stages[-1] == 0.9
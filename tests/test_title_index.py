@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from title_index import TitleIndex, bounded_edit_distance, normalize_title, trigrams
+
+TITLES = ["The Host", "The Hours", "The Ghost", "The Host", "Amélie", "Spider-Man 2", "Batman Begins",
+          "Batman Returns", "Fast & Furious", ""]
+
+
+def levenshtein(a, b):
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def test_normalize_title():
+    assert normalize_title("  Amélie!") == "amelie"
+    assert normalize_title("Spider-Man 2") == "spider man 2"
+    assert normalize_title("Fast & Furious") == "fast and furious"
+
+
+def test_bounded_edit_distance_matches_levenshtein():
+    rng = random.Random(0)
+    for _ in range(2000):
+        a = "".join(rng.choice("ab c") for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice("ab c") for _ in range(rng.randint(0, 12)))
+        distance = levenshtein(a, b)
+        for max_distance in (1, 3, 20):
+            expected = distance if distance <= max_distance else None
+            assert bounded_edit_distance(a, b, max_distance) == expected
+
+
+def test_trigram_index_matches_the_trigram_sets():
+    index = TitleIndex(TITLES)
+    index.prepare()
+    assert index._trigram_counts.tolist() == [len(trigrams(text)) for text in index.normalized]
+    assert len(index._postings) == sum(len(trigrams(text)) for text in index.normalized)
+    for row, text in enumerate(index.normalized):
+        if text:
+            assert (row, 1.0) in index.search(text, limit=len(TITLES))
+
+
+def test_exact_match_prefers_the_most_popular_duplicate():
+    index = TitleIndex(TITLES, weights=[1, 0, 0, 5, 0, 0, 0, 0, 0, 0])
+    assert index.resolve("the host!") == (3, True, [])
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("batmn begins", "Batman Begins"),
+    ("amelei", "Amélie"),
+    ("spiderman 2", "Spider-Man 2"),
+    ("fast and furous", "Fast & Furious"),
+])
+def test_typos_resolve(query, expected):
+    index = TitleIndex(TITLES)
+    row, exact, _ = index.resolve(query)
+    assert TITLES[row] == expected and not exact
+
+
+def test_alternatives_skip_the_answer_and_duplicates():
+    index = TitleIndex(TITLES)
+    row, exact, others = index.resolve("the hosst", alternatives=4)
+    assert index.normalized[row] == "the host"
+    titles = [index.normalized[r] for r in others]
+    assert "the host" not in titles
+    assert len(titles) == len(set(titles))
+
+
+def test_no_match():
+    assert TitleIndex(TITLES).resolve("qqqq") == (None, False, [])
+    assert TitleIndex([]).resolve("anything") == (None, False, [])
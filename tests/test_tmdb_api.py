@@ -0,0 +1,50 @@
+import time
+
+import pytest
+
+import tmdb_api
+import tmdb_http
+from benchmark import MockTMDb
+
+
+@pytest.fixture
+def tmdb(monkeypatch):
+    """A mock TMDb behind empty caches, with an API key configured."""
+    monkeypatch.setattr(tmdb_http, "_disk", None)
+    monkeypatch.setattr(tmdb_api, "_api_key", lambda: "key")
+    tmdb_http.clear_cache()
+    mock = MockTMDb(latency=0.05)
+    with mock:
+        monkeypatch.setattr(tmdb_http, "API_BASE", mock.url)
+        yield mock
+    tmdb_http.clear_cache()
+
+
+def test_posters_are_fetched_once_per_title(tmdb):
+    titles = ["Alien", "Heat", "Alien", "Ran"]
+    posters = tmdb_api.fetch_posters(titles)
+    assert list(posters) == ["Alien", "Heat", "Ran"]
+    assert not any(tmdb_api.is_placeholder(url) for url in posters.values())
+    assert tmdb.server.requests == 3
+
+
+def test_late_posters_become_placeholders_and_warm_the_cache(tmdb):
+    tmdb.server.latency = 0.5
+    titles = [f"Movie {i}" for i in range(tmdb_api.MAX_CONCURRENT_REQUESTS + 4)]
+    started = time.perf_counter()
+    posters = tmdb_api.fetch_posters(titles, deadline=0.05)
+    assert time.perf_counter() - started < 0.4
+    assert all(tmdb_api.is_placeholder(url) for url in posters.values())
+    time.sleep(0.8)
+    # Lookups in flight at the deadline finished; the queued ones were cancelled
+    assert tmdb.server.requests == tmdb_api.MAX_CONCURRENT_REQUESTS
+    posters = tmdb_api.fetch_posters(titles, deadline=2)
+    assert not any(tmdb_api.is_placeholder(url) for url in posters.values())
+    assert tmdb.server.requests == len(titles)
+
+
+def test_no_api_key_means_placeholders_without_requests(tmdb, monkeypatch):
+    monkeypatch.setattr(tmdb_api, "_api_key", lambda: None)
+    posters = tmdb_api.fetch_posters(["Alien", "Heat"])
+    assert all(tmdb_api.is_placeholder(url) for url in posters.values())
+    assert tmdb.server.requests == 0
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import tmdb_http
+from benchmark import MockTMDb
+
+
+@pytest.fixture
+def tmdb(monkeypatch):
+    """A mock TMDb behind an empty in-memory cache and no disk cache."""
+    monkeypatch.setattr(tmdb_http, "_disk", None)
+    tmdb_http.clear_cache()
+    with MockTMDb(latency=0.2) as mock:
+        monkeypatch.setattr(tmdb_http, "API_BASE", mock.url)
+        yield mock
+    tmdb_http.clear_cache()
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = tmdb_http.TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_entries_expire():
+    cache = tmdb_http.TTLCache(ttl=0.05)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_key_ignores_api_key_and_query_spelling():
+    key = tmdb_http.cache_key("/search/movie", {"query": "The  Matrix", "api_key": "a"})
+    assert key == tmdb_http.cache_key("/search/movie", {"api_key": "b", "query": "the matrix"})
+
+
+def test_responses_are_cached(tmdb):
+    first = tmdb_http.get_json("/movie/603", {"api_key": "key"})
+    assert tmdb_http.get_json("/movie/603", {"api_key": "other"}) == first
+    assert tmdb.server.requests == 1
+    assert tmdb_http.cache_stats()["hits"] == 1
+
+
+def test_concurrent_identical_requests_share_one_call(tmdb):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(tmdb_http.get_json("/movie/550", cache=False)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 5 and all(result == results[0] for result in results)
+    assert tmdb.server.requests == 1
+
+
+def test_errors_are_not_cached(tmdb):
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            tmdb_http.get_json("/unknown/path")
+    assert tmdb.server.requests == 2
@@ -0,0 +1,78 @@
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+
+import tmdb_scheduler
+from tmdb_scheduler import Coalescer, RateLimited, TokenBucket
+
+
+class Response:
+    def __init__(self, retry_after=None):
+        self.headers = {} if retry_after is None else {"Retry-After": retry_after}
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=10, burst=3)
+    waits = [bucket.reserve() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] == pytest.approx(0.1, abs=0.02)
+    assert waits[4] == pytest.approx(0.2, abs=0.02)
+
+
+def test_bucket_refuses_long_waits_without_reserving():
+    bucket = TokenBucket(rate=10, burst=1)
+    bucket.reserve()
+    with pytest.raises(RateLimited):
+        bucket.reserve(max_wait=0.05)
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_pause_holds_back_every_caller():
+    bucket = TokenBucket(rate=100, burst=10)
+    bucket.pause(0.5)
+    assert bucket.reserve() == pytest.approx(0.5, abs=0.02)
+
+
+def test_retry_after_accepts_seconds_and_dates():
+    assert tmdb_scheduler.retry_after(Response("3"), 1.0) == 3.0
+    assert tmdb_scheduler.retry_after(Response(), 1.0) == 1.0
+    assert tmdb_scheduler.retry_after(Response("soon"), 1.0) == 1.0
+    date = formatdate(time.time() + 5, usegmt=True)
+    assert tmdb_scheduler.retry_after(Response(date), 1.0) == pytest.approx(5, abs=1.5)
+
+
+def test_backoff_is_jittered_and_capped():
+    assert all(0 <= tmdb_scheduler.backoff(attempt) <= min(8.0, 0.5 * 2 ** attempt) for attempt in range(8))
+
+
+def test_concurrent_callers_share_one_call_and_its_error():
+    coalescer = Coalescer()
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    outcomes = []
+
+    def caller():
+        try:
+            coalescer.run("key", slow)
+        except ValueError as exc:
+            outcomes.append(str(exc))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader] + followers:
+        thread.join()
+    assert calls == [1] and outcomes == ["boom"] * 4
+    assert coalescer.run("key", lambda: 42) == (42, False)
@@ -0,0 +1,39 @@
+import os
+import time
+
+import tmdb_store
+
+
+def test_values_round_trip_until_they_expire(tmp_path):
+    cache = tmdb_store.DiskCache(str(tmp_path / "tmdb.sqlite3"))
+    cache.set("/movie/603", {"poster_path": "/603.jpg"})
+    cache.set("/movie/550", {"poster_path": None}, ttl=-1)
+    assert cache.get("/movie/603") == {"poster_path": "/603.jpg"}
+    assert cache.get("/movie/550") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "errors": 0}
+
+
+def test_entries_are_shared_across_instances(tmp_path):
+    path = str(tmp_path / "tmdb.sqlite3")
+    tmdb_store.DiskCache(path).set("/movie/603", {"id": 603})
+    assert tmdb_store.DiskCache(path).get("/movie/603") == {"id": 603}
+
+
+def test_eviction_drops_the_oldest_entries_first(tmp_path):
+    cache = tmdb_store.DiskCache(str(tmp_path / "tmdb.sqlite3"), max_bytes=1000)
+    for i in range(10):
+        cache.set(f"/movie/{i}", {"overview": "x" * 180})
+        time.sleep(0.001)
+    cache.evict()
+    kept = [i for i in range(10) if cache.get(f"/movie/{i}") is not None]
+    assert kept == list(range(10 - len(kept), 10))
+    assert 0 < len(kept) * 200 <= 1000
+
+
+def test_filesystem_errors_are_misses(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    cache = tmdb_store.DiskCache(os.path.join(str(blocker), "tmdb.sqlite3"))
+    cache.set("/movie/603", {"id": 603})
+    assert cache.get("/movie/603") is None
+    assert cache.stats()["errors"] == 2
@@ -0,0 +1,287 @@
+"""
+Title resolution for the search box.
+
+Maps free-form user text to a catalog row in three steps:
+
+1. exact lookup of the normalised title in a hash map,
+2. candidate generation from a character-trigram inverted index,
+3. re-ranking of the best candidates with a bounded edit distance,
+   computed bit-parallel (Myers/Hyyrö), one word operation per character.
+
+Normalised titles only contain [0-9a-z ], so every trigram is an integer
+below 37**3. Postings are stored as one int32 array plus an offsets array
+indexed by that integer, and the index is built with a handful of array
+operations over all titles at once. A query only touches the posting
+lists of its own trigrams and counts only the rows found there, never the
+whole catalog.
+"""
+import re
+import threading
+import unicodedata
+
+import numpy as np
+
+# Candidates taken from the trigram counts before edit-distance re-ranking
+RERANK_CANDIDATES = 24
+# Trigrams shared by more than this fraction of titles are skipped when the
+# query has enough rarer ones ("the", " th", ...)
+COMMON_TRIGRAM_FRACTION = 0.05
+# Postings read per query, beyond the two rarest lists (which are always read)
+MAX_POSTINGS = 100000
+# Minimum score (0..1) for a fuzzy match to be accepted as the answer, and
+# for a title to be offered as a "did you mean" alternative
+MIN_FUZZY_SCORE = 0.3
+MIN_ALTERNATIVE_SCORE = 0.2
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# Characters of normalised titles; a trigram's id is its three codes in base len(_ALPHABET)
+_ALPHABET = " 0123456789abcdefghijklmnopqrstuvwxyz"
+_CODES = np.zeros(256, dtype=np.int32)
+_CODES[np.frombuffer(_ALPHABET.encode("ascii"), dtype=np.uint8)] = np.arange(len(_ALPHABET))
+N_TRIGRAMS = len(_ALPHABET) ** 3
+
+
+def normalize_title(title):
+    """
+    Canonical form of a title: case-folded, accents stripped, punctuation removed
+
+    Parameters:
+    title (str): Raw title or user input
+
+    Returns:
+    str: Normalised title, e.g. "Amélie" -> "amelie", "Spider-Man" -> "spider man"
+    """
+    text = unicodedata.normalize("NFKD", str(title).casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.replace("&", " and ")
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(text):
+    """Set of character trigrams of a normalised string, each word padded like pg_trgm."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _padded(text):
+    """text with every word padded as in trigrams(): "ab cd" -> "  ab   cd "."""
+    return "  " + text.replace(" ", "   ") + " "
+
+
+def _trigram_ids(padded):
+    """
+    Trigram ids of every window of one or more concatenated _padded() strings
+
+    Returns:
+    tuple: (ids, valid); windows ending in two spaces ("b  ", "   ") span two
+    padded words or strings and are not trigrams of any word (valid is False)
+    """
+    codes = _CODES[np.frombuffer(padded.encode("ascii"), dtype=np.uint8)]
+    base = len(_ALPHABET)
+    ids = (codes[:-2] * base + codes[1:-1]) * base + codes[2:]
+    valid = (codes[1:-1] != 0) | (codes[2:] != 0)
+    return ids, valid
+
+
+def char_masks(text):
+    """Bit mask of the positions of each character in text, for bounded_edit_distance()."""
+    masks = {}
+    for i, ch in enumerate(text):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def bounded_edit_distance(a, b, max_distance, masks=None):
+    """
+    Levenshtein distance between a and b, or None if it exceeds max_distance
+
+    Uses Myers' bit-vector algorithm (in Hyyrö's form for the global
+    distance): the DP column for a is held in two integers, so each
+    character of b costs a few word operations instead of a row of cells.
+
+    Parameters:
+    masks (dict): char_masks(a), when the same a is compared many times
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if not a:
+        return len(b)
+    masks = char_masks(a) if masks is None else masks
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    # Vertical deltas +1 (pv) and -1 (mv) down the current column
+    pv, mv, distance = full, 0, len(a)
+    for ch in b:
+        eq = masks.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            distance += 1
+        elif mh & last:
+            distance -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return distance if distance <= max_distance else None
+
+
+class TitleIndex:
+    """
+    Exact and fuzzy title lookup over a fixed list of titles
+
+    Parameters:
+    titles (list of str): Catalog titles, indexed by row position
+    weights (array-like): Popularity per row (e.g. vote_count), used to break ties
+    """
+
+    def __init__(self, titles, weights=None):
+        self.normalized = [normalize_title(title) for title in titles]
+        n = len(self.normalized)
+        self.weights = np.zeros(n, dtype=np.float32) if weights is None else np.asarray(weights, dtype=np.float32)
+        self.exact = {}
+        # Visit rows from most to least popular so duplicates resolve to the best known one
+        for row in np.argsort(-self.weights, kind="stable").tolist():
+            self.exact.setdefault(self.normalized[row], row)
+        self._postings = None
+        self._offsets = None
+        self._trigram_counts = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.normalized)
+
+    def _build_trigram_index(self):
+        padded = [_padded(text) for text in self.normalized]
+        ids, valid = _trigram_ids("".join(padded))
+        # Row of each window, by where it starts
+        lengths = np.fromiter((len(text) for text in padded), dtype=np.int64, count=len(padded))
+        rows = np.repeat(np.arange(len(padded), dtype=np.int64), lengths)[:len(ids)]
+        # One entry per distinct (trigram, row), sorted by trigram then row
+        keys = np.sort(ids[valid].astype(np.int64) * len(self.normalized) + rows[valid])
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
+        grams, rows = np.divmod(keys, max(len(self.normalized), 1))
+        self._postings = rows.astype(np.int32)
+        self._offsets = np.searchsorted(grams, np.arange(N_TRIGRAMS + 1))
+        self._trigram_counts = np.bincount(rows, minlength=len(self.normalized)).astype(np.int32)
+
+    def _ensure_trigram_index(self):
+        if self._postings is None:
+            with self._lock:
+                if self._postings is None:
+                    self._build_trigram_index()
+
+    def prepare(self):
+        """Build the trigram index now (otherwise the first fuzzy search does), e.g. before serving traffic."""
+        self._ensure_trigram_index()
+
+    def find_exact(self, query):
+        """Row of the title whose normalised form equals the query's, or None."""
+        return self.exact.get(normalize_title(query))
+
+    def search(self, query, limit=5):
+        """
+        Fuzzy-rank catalog titles against the query
+
+        Parameters:
+        query (str): User input
+        limit (int): Maximum number of matches to return
+
+        Returns:
+        list: (row, score) tuples, best first; score in 0..1, 1.0 for an exact match
+        """
+        text = normalize_title(query)
+        if not text:
+            return []
+        self._ensure_trigram_index()
+
+        ids, valid = _trigram_ids(_padded(text))
+        query_grams = np.unique(ids[valid])
+        starts, ends = self._offsets[query_grams], self._offsets[query_grams + 1]
+        spans = sorted(
+            ((start, end) for start, end in zip(starts.tolist(), ends.tolist()) if end > start),
+            key=lambda span: span[1] - span[0],
+        )
+        if not spans:
+            return []
+        common = COMMON_TRIGRAM_FRACTION * len(self.normalized)
+        # Rarest lists first, within a postings budget: rare trigrams carry
+        # most of the signal, and the budget bounds the work per query
+        kept, read = [], 0
+        for i, (start, end) in enumerate(spans):
+            if i >= 2 and (end - start > common or read + end - start > MAX_POSTINGS):
+                break
+            kept.append((start, end))
+            read += end - start
+        hits = np.concatenate([self._postings[start:end] for start, end in kept])
+        # Count only the rows that were hit (runs in the sorted hits), so the
+        # cost follows the postings read, not the catalog size
+        hits.sort()
+        starts = np.flatnonzero(np.concatenate(([True], hits[1:] != hits[:-1])))
+        rows, counts = hits[starts], np.diff(np.append(starts, len(hits)))
+        # Titles sharing fewer than a third of the query's trigrams cannot score well
+        close = counts >= max(1, len(kept) // 3)
+        candidates, shared = rows[close], counts[close]
+        if not len(candidates):
+            return []
+
+        # Average of query containment and Jaccard similarity of the trigram
+        # sets, estimated from the kept trigrams: rewards titles that cover
+        # the query while penalising much longer ones
+        union = len(kept) + self._trigram_counts[candidates] - shared
+        overlap = 0.5 * (shared / len(kept) + shared / np.maximum(union, 1))
+        if len(candidates) > RERANK_CANDIDATES:
+            top = np.argpartition(-overlap, RERANK_CANDIDATES - 1)[:RERANK_CANDIDATES]
+            candidates, overlap = candidates[top], overlap[top]
+
+        max_distance = max(1, min(4, len(text) // 4))
+        masks = char_masks(text)
+        scored = []
+        for row, similarity in zip(candidates.tolist(), overlap.tolist()):
+            title = self.normalized[row]
+            if title == text:
+                score = 2.0
+            else:
+                distance = bounded_edit_distance(text, title, max_distance, masks)
+                bonus = 0.0 if distance is None else 1.0 - distance / (max_distance + 1)
+                score = similarity + bonus
+            scored.append((score, float(self.weights[row]), row))
+        scored.sort(key=lambda item: (-item[0], -item[1], item[2]))
+        return [(row, min(score / 2.0, 1.0)) for score, _, row in scored[:limit]]
+
+    def resolve(self, query, alternatives=4):
+        """
+        Best catalog row for the query plus "did you mean" alternatives
+
+        Parameters:
+        query (str): User input
+        alternatives (int): Number of alternative rows to suggest
+
+        Returns:
+        tuple: (row or None, exact (bool), list of alternative rows)
+        """
+        row = self.find_exact(query)
+        if row is not None:
+            return row, True, []
+        # Extra candidates make up for alternatives dropped as duplicate titles
+        matches = self.search(query, limit=2 * alternatives + 1)
+        if not matches:
+            return None, False, []
+        best, score = matches[0]
+        if score < MIN_FUZZY_SCORE:
+            best, others = None, matches
+        else:
+            others = matches[1:]
+        # Remakes share a title: suggest each title once, never the resolved one
+        seen = set() if best is None else {self.normalized[best]}
+        rows = []
+        for r, s in others:
+            if s >= MIN_ALTERNATIVE_SCORE and self.normalized[r] not in seen and len(rows) < alternatives:
+                seen.add(self.normalized[r])
+                rows.append(r)
+        return best, False, rows
@@ -1,118 +1,209 @@
-import requests
 import random
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import requests
 import streamlit as st
 
-def fetch_poster(movie_title):
+import metrics
+import tmdb_http
+
+# Poster lookups running at once across all sessions in this process
+MAX_CONCURRENT_REQUESTS = 8
+# Seconds a results page waits for its posters before using placeholders
+POSTER_DEADLINE = 2.0
+PLACEHOLDER_BASE_URL = "https://via.placeholder.com"
+
+_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="tmdb")
+
+
+def placeholder_poster(movie_title):
     """
-    Fetch movie poster from TMDb API
-    
+    Build a placeholder poster URL with a random background color
+
     Parameters:
-    movie_title (str): Title of the movie to fetch poster for
-    
+    movie_title (str): Title printed on the placeholder
+
     Returns:
-    str: URL of the movie poster or a placeholder if not found
+    str: URL of a placeholder image
     """
-    # Get API key from session state
+    color = "%06x" % random.randint(0, 0xFFFFFF)
+    return f"{PLACEHOLDER_BASE_URL}/300x450/{color}/FFFFFF?text={movie_title.replace(' ', '+')}"
+
+
+def is_placeholder(poster_url):
+    """True if the URL is a generated placeholder rather than a real poster"""
+    return poster_url.startswith(PLACEHOLDER_BASE_URL)
+
+
+def _api_key():
+    """TMDb API key from session state, or None if it is not configured"""
     API_KEY = st.session_state.get('TMDB_API_KEY')
-    
-    # If no API key, return placeholder
     if not API_KEY or API_KEY == "your_tmdb_api_key_here":
-        color = "%06x" % random.randint(0, 0xFFFFFF)
-        return f"https://via.placeholder.com/300x450/{color}/FFFFFF?text={movie_title.replace(' ', '+')}"
-    
+        return None
+    return API_KEY
+
+
+def _search_params(API_KEY, query):
+    """Query parameters for /search/movie, shared so poster and search lookups hit the same cache entry"""
+    return {
+        "api_key": API_KEY,
+        "language": "en-US",
+        "query": query,
+        "page": 1,
+        "include_adult": False
+    }
+
+
+@metrics.timed("tmdb_api.poster_for")
+def _poster_for(movie_title, API_KEY):
+    """Poster URL for one title; safe to call from worker threads (no session state access)"""
     try:
-        # Make API request
-        url = f"https://api.themoviedb.org/3/search/movie?api_key={API_KEY}&query={movie_title}"
-        response = requests.get(url)
-        data = response.json()
-        
-        # Check if the API key is valid
-        if 'success' in data and data['success'] == False:
-            # Generate random color for the placeholder
-            color = "%06x" % random.randint(0, 0xFFFFFF)
-            return f"https://via.placeholder.com/300x450/{color}/FFFFFF?text={movie_title.replace(' ', '+')}"
-        
+        # Make API request (answered from the shared cache when possible)
+        data = tmdb_http.get_json("/search/movie", _search_params(API_KEY, movie_title))
+
         # Check if we have results
-        if 'results' in data and data['results']:
+        if data.get('results'):
             poster_path = data['results'][0].get('poster_path', '')
             if poster_path:
                 return f"https://image.tmdb.org/t/p/w500{poster_path}"
-        
+
         # No poster found, create a nice placeholder
-        color = "%06x" % random.randint(0, 0xFFFFFF)
-        return f"https://via.placeholder.com/300x450/{color}/FFFFFF?text={movie_title.replace(' ', '+')}"
-        
-    except Exception as e:
-        # In case of any error, return a placeholder
-        color = "%06x" % random.randint(0, 0xFFFFFF)
-        return f"https://via.placeholder.com/300x450/{color}/FFFFFF?text={movie_title.replace(' ', '+')}"
+        return placeholder_poster(movie_title)
+
+    except (requests.RequestException, ValueError):
+        metrics.count("tmdb_api_errors")
+        # In case of any error (including an invalid API key), return a placeholder
+        return placeholder_poster(movie_title)
+
+
+@metrics.timed("tmdb_api.fetch_poster")
+def fetch_poster(movie_title):
+    """
+    Fetch movie poster from TMDb API
+
+    Parameters:
+    movie_title (str): Title of the movie to fetch poster for
+
+    Returns:
+    str: URL of the movie poster or a placeholder if not found
+    """
+    # Get API key from session state
+    API_KEY = _api_key()
 
+    # If no API key, return placeholder
+    if not API_KEY:
+        return placeholder_poster(movie_title)
+
+    return _poster_for(movie_title, API_KEY)
+
+@metrics.timed("tmdb_api.fetch_posters")
+def fetch_posters(movie_titles, deadline=POSTER_DEADLINE):
+    """
+    Fetch posters for several movies concurrently
+
+    Lookups share one process-wide thread pool, which caps the number of
+    TMDb requests in flight. Titles whose poster is not resolved within the
+    deadline get a placeholder. Lookups already running finish and warm the
+    cache for the next rerun; ones still queued are cancelled to shed load.
+
+    Parameters:
+    movie_titles (list): Titles of the movies to fetch posters for
+    deadline (float): Seconds to wait for the whole batch
+
+    Returns:
+    dict: Title -> poster URL (or placeholder URL)
+    """
+    # Read the API key here: worker threads cannot see the session state
+    API_KEY = _api_key()
+    titles = list(dict.fromkeys(movie_titles))
+    if not API_KEY:
+        return {title: placeholder_poster(title) for title in titles}
+
+    futures = {title: _executor.submit(_poster_for, title, API_KEY) for title in titles}
+    wait(futures.values(), timeout=deadline)
+    posters = {}
+    for title, future in futures.items():
+        if future.done():
+            posters[title] = future.result()
+        else:
+            # Still queued behind other sessions' lookups: drop it to shed load
+            future.cancel()
+            posters[title] = placeholder_poster(title)
+    return posters
+
+@metrics.timed("tmdb_api.fetch_movie_details")
 def fetch_movie_details(movie_id):
     """
     Fetch detailed movie information from TMDb API
-    
+
     Parameters:
     movie_id (int): TMDb ID of the movie
-    
+
     Returns:
     dict: Movie details or None if not found
     """
     # Get API key from session state
-    API_KEY = st.session_state.get('TMDB_API_KEY')
-    
+    API_KEY = _api_key()
+
     # If no API key, return None
-    if not API_KEY or API_KEY == "your_tmdb_api_key_here":
+    if not API_KEY:
         return None
-    
+
     try:
         # Make API request
-        url = f"https://api.themoviedb.org/3/movie/{movie_id}"
         params = {
             "api_key": API_KEY,
             "language": "en-US"
         }
-        
-        response = requests.get(url, params=params)
-        
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except:
+        return tmdb_http.get_json(f"/movie/{movie_id}", params)
+    except (requests.RequestException, ValueError):
+        metrics.count("tmdb_api_errors")
         return None
 
+@metrics.timed("tmdb_api.search_movie")
 def search_movie(query):
     """
     Search for movies by title
-    
+
     Parameters:
     query (str): Movie title to search for
-    
+
     Returns:
     list: List of matching movies or empty list if none found
     """
     # Get API key from session state
-    API_KEY = st.session_state.get('TMDB_API_KEY')
-    
+    API_KEY = _api_key()
+
     # If no API key, return empty list
-    if not API_KEY or API_KEY == "your_tmdb_api_key_here":
+    if not API_KEY:
         return []
-    
+
     try:
         # Make API request
-        url = "https://api.themoviedb.org/3/search/movie"
-        params = {
-            "api_key": API_KEY,
-            "language": "en-US",
-            "query": query,
-            "page": 1,
-            "include_adult": False
-        }
-        
-        response = requests.get(url, params=params)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("results", [])
+        data = tmdb_http.get_json("/search/movie", _search_params(API_KEY, query))
+        return data.get("results", [])
+    except (requests.RequestException, ValueError):
+        metrics.count("tmdb_api_errors")
         return []
-    except:
-        return []
\ No newline at end of file
+
+def cache_stats():
+    """
+    Hit/miss counters of the shared TMDb response cache
+
+    Returns:
+    dict: hits, misses, size and maxsize
+    """
+    return tmdb_http.cache_stats()
+
+def scheduler_stats():
+    """
+    Counters of the shared TMDb request scheduler
+
+    Returns:
+    dict: requests, queued, coalesced, throttled, retries and errors
+    """
+    return tmdb_http.scheduler_stats()
+
+
+metrics.register_collector("tmdb_cache", cache_stats)
+metrics.register_collector("tmdb_scheduler", scheduler_stats)
\ No newline at end of file
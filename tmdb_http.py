@@ -0,0 +1,271 @@
+"""
+Shared HTTP layer for the TMDb client.
+
+All TMDb calls in the process go through one pooled requests.Session (so
+connections are kept alive and reused) and a bounded in-memory LRU cache
+with a TTL, keyed on the normalised request. Below that sits a durable
+SQLite cache (tmdb_store) shared by every worker on the host and kept
+across restarts. Repeated lookups for the same title are answered without
+touching the network.
+
+Requests that do reach TMDb are scheduled (see tmdb_scheduler): a shared
+token bucket keeps the process under the rate limit, concurrent callers
+asking for the same thing share one in-flight request, 429 responses pause
+everyone for Retry-After, and transient failures are retried with jittered
+backoff.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tmdb_store
+from tmdb_scheduler import Coalescer, TokenBucket, backoff, retry_after
+
+logger = logging.getLogger(__name__)
+
+# Overridable so jobs and benchmarks can point at a local mock server
+API_BASE = os.environ.get("TMDB_API_BASE", "https://api.themoviedb.org/3")
+
+# Seconds before a TMDb request gives up
+TIMEOUT = 5
+# In-memory response cache bounds
+CACHE_SIZE = 2048
+CACHE_TTL = 6 * 60 * 60
+# Connections kept open to TMDb per process
+POOL_SIZE = 16
+# Client-side rate limit for the whole process (TMDb allows roughly 40-50 req/s)
+RATE_LIMIT = 35.0
+RATE_BURST = 10
+# Longest a caller queues for a token before giving up with RateLimited
+MAX_QUEUE_WAIT = 3.0
+# Retries after 429, 5xx and connection errors
+MAX_RETRIES = 2
+
+# Query parameters that do not change the response and are left out of cache keys
+_UNKEYED_PARAMS = {"api_key"}
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a fixed time
+
+    Parameters:
+    maxsize (int): Maximum number of entries kept
+    ttl (float): Seconds an entry stays valid
+    """
+
+    def __init__(self, maxsize=CACHE_SIZE, ttl=CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+_cache = TTLCache()
+# Set MOVIE_BUDDY_TMDB_CACHE to an empty string to disable the disk cache
+_disk = tmdb_store.DiskCache() if tmdb_store.DB_PATH else None
+_session = None
+_session_lock = threading.Lock()
+_bucket = TokenBucket(RATE_LIMIT, RATE_BURST)
+_coalescer = Coalescer()
+_metrics = {"requests": 0, "queued": 0, "coalesced": 0, "throttled": 0, "retries": 0, "errors": 0}
+_metrics_lock = threading.Lock()
+
+
+def _count(name, amount=1):
+    with _metrics_lock:
+        _metrics[name] += amount
+
+
+def configure_rate_limit(rate, burst=RATE_BURST, max_queue_wait=MAX_QUEUE_WAIT):
+    """
+    Change the process-wide request schedule (e.g. for offline batch jobs)
+
+    Parameters:
+    rate (float): Requests per second
+    burst (int): Requests allowed back to back
+    max_queue_wait (float or None): Longest wait for a token; None waits as long as needed
+    """
+    global MAX_QUEUE_WAIT
+    _bucket.configure(rate, burst)
+    MAX_QUEUE_WAIT = max_queue_wait
+
+
+def get_session():
+    """Process-wide requests.Session with a keep-alive connection pool."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _normalize_value(value):
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    return value
+
+
+def cache_key(path, params):
+    """
+    Cache key for a TMDb request: the path plus its normalised parameters
+
+    Parameters:
+    path (str): API path, e.g. "/search/movie"
+    params (dict): Query parameters
+
+    Returns:
+    tuple: Hashable key; the API key and parameter order/case do not matter
+    """
+    items = tuple(sorted(
+        (name, _normalize_value(value))
+        for name, value in (params or {}).items()
+        if name not in _UNKEYED_PARAMS
+    ))
+    return (path, items)
+
+
+def _disk_key(key):
+    """String form of a cache key for the disk store, e.g. "/movie/603?language=en-us"."""
+    path, items = key
+    return f"{path}?{urlencode(items)}" if items else path
+
+
+def _request(path, params):
+    """One scheduled TMDb request, with rate limiting and retries."""
+    for attempt in range(MAX_RETRIES + 1):
+        wait = _bucket.reserve(max_wait=MAX_QUEUE_WAIT)
+        if wait > 0:
+            _count("queued")
+            time.sleep(wait)
+        _count("requests")
+        try:
+            response = get_session().get(API_BASE + path, params=params, timeout=TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            _count("retries")
+            time.sleep(backoff(attempt))
+            continue
+        if response.status_code == 429 or response.status_code >= 500:
+            if attempt == MAX_RETRIES:
+                response.raise_for_status()
+            _count("retries")
+            delay = retry_after(response, backoff(attempt))
+            if response.status_code == 429:
+                # Everyone in the process backs off, not just this caller
+                _count("throttled")
+                _bucket.pause(delay)
+            else:
+                time.sleep(delay)
+            continue
+        response.raise_for_status()
+        return response.json()
+
+
+def get_json(path, params=None, cache=True):
+    """
+    GET a TMDb API path and return the decoded JSON body
+
+    Successful responses are cached; errors are raised to the caller and
+    never cached.
+
+    Parameters:
+    path (str): API path, e.g. "/search/movie" or "/movie/603"
+    params (dict): Query parameters including api_key
+    cache (bool): Whether to use the response cache
+
+    Returns:
+    dict: Decoded JSON response
+
+    Raises:
+    requests.RequestException: On network errors or non-2xx responses
+    """
+    key = cache_key(path, params)
+    if cache:
+        hit = _cache.get(key)
+        if hit is not None:
+            return hit
+        if _disk is not None:
+            hit = _disk.get(_disk_key(key))
+            if hit is not None:
+                _cache.set(key, hit)
+                return hit
+    try:
+        data, coalesced = _coalescer.run(key, lambda: _request(path, params))
+    except (requests.RequestException, ValueError) as exc:
+        _count("errors")
+        logger.warning("TMDb request %s failed: %s", path, exc)
+        raise
+    if coalesced:
+        _count("coalesced")
+        return data
+    # TMDb reports some failures (e.g. an invalid key) as {"success": false}
+    if cache and data.get("success", True) is not False:
+        _cache.set(key, data)
+        if _disk is not None:
+            _disk.set(_disk_key(key), data)
+    return data
+
+
+def cache_stats():
+    """Hit/miss counters of the in-memory and disk response caches."""
+    stats = _cache.stats()
+    if _disk is not None:
+        stats.update({f"disk_{name}": value for name, value in _disk.stats().items()})
+    return stats
+
+
+def scheduler_stats():
+    """Counters of requests sent, queued for a token, coalesced, throttled (429), retried and failed."""
+    with _metrics_lock:
+        return dict(_metrics)
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,130 @@
+"""
+Client-side scheduling for TMDb requests.
+
+TokenBucket spaces requests so the whole process stays under TMDb's rate
+limit (and pauses everyone when TMDb answers 429 with Retry-After), and
+Coalescer makes concurrent callers asking for the same thing share one
+in-flight request. Both are used by tmdb_http for every TMDb call.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+
+class RateLimited(requests.RequestException):
+    """Raised when a request would have to queue longer than allowed for a token."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket (implemented as GCRA virtual scheduling)
+
+    Parameters:
+    rate (float): Tokens added per second
+    burst (int): Maximum tokens available at once
+    """
+
+    def __init__(self, rate, burst):
+        self.configure(rate, burst)
+        self._tat = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._interval = 1.0 / rate
+        self._tolerance = self._interval * (self.burst - 1)
+
+    def reserve(self, max_wait=None):
+        """
+        Reserve a token and return how long to sleep before using it
+
+        Parameters:
+        max_wait (float): Refuse (without reserving) if the wait would be longer
+
+        Returns:
+        float: Seconds to wait, 0 if a token is available now
+
+        Raises:
+        RateLimited: If the wait would exceed max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            tat = max(self._tat, now, self._paused_until)
+            wait = max(tat - self._tolerance - now, self._paused_until - now, 0.0)
+            if max_wait is not None and wait > max_wait:
+                raise RateLimited(f"TMDb request queue is full (would wait {wait:.1f}s)")
+            self._tat = tat + self._interval
+            return wait
+
+    def pause(self, seconds):
+        """Hold back every caller for the given time (e.g. after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Coalescer:
+    """One in-flight call per key; concurrent callers wait for and share its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn):
+        """
+        Call fn() unless a call for key is already running, then share its outcome
+
+        Returns:
+        tuple: (result, coalesced) where coalesced is True for callers that waited
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+def retry_after(response, default):
+    """Seconds to wait according to a Retry-After header (seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def backoff(attempt, base=0.5, cap=8.0):
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
@@ -0,0 +1,133 @@
+"""
+Durable TMDb response cache shared by every process on the host.
+
+Responses (poster searches, movie details) are stored as JSON in a SQLite
+database in WAL mode: readers never block each other or the writer, so
+several Streamlit workers can share one file. Entries carry an expiry
+timestamp, and the file is kept under a byte budget by evicting the oldest
+entries. Reads never write (no access-time updates), which keeps
+concurrent readers free of lock contention.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("MOVIE_BUDDY_TMDB_CACHE", os.path.join(BASE_DIR, ".cache", "tmdb.sqlite3"))
+
+# Seconds a stored response stays valid
+DISK_TTL = 7 * 24 * 60 * 60
+# Size budget for stored values; eviction trims to EVICT_TO of it
+MAX_BYTES = 64 * 1024 * 1024
+EVICT_TO = 0.9
+# Writes between eviction passes
+EVICT_EVERY = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    stored_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at);
+"""
+
+
+class DiskCache:
+    """
+    Key/value store of JSON values with expiry and size-bounded eviction
+
+    Errors from SQLite or the filesystem (read-only disk, unwritable cache
+    directory, locked database past the busy timeout, ...) are swallowed:
+    the cache then behaves as a miss.
+
+    Parameters:
+    path (str): SQLite database file
+    ttl (float): Default seconds an entry stays valid
+    max_bytes (int): Budget for the total size of stored values
+    """
+
+    def __init__(self, path=DB_PATH, ttl=DISK_TTL, max_bytes=MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """One connection per thread; sqlite3 connections must not be shared."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Stored value for key, or None if missing or expired."""
+        try:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return None
+        if row is None or row[1] < time.time():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        """Store a JSON-serialisable value."""
+        payload = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, stored_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now + (self.ttl if ttl is None else ttl), now, len(payload)),
+            )
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones until under the byte budget."""
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            excess = total - int(self.max_bytes * EVICT_TO)
+            # Find the stored_at cut-off that frees `excess` bytes, oldest first
+            freed = 0
+            cutoff = None
+            for stored_at, size in conn.execute("SELECT stored_at, size FROM entries ORDER BY stored_at"):
+                freed += size
+                cutoff = stored_at
+                if freed >= excess:
+                    break
+            if cutoff is not None:
+                conn.execute("DELETE FROM entries WHERE stored_at <= ?", (cutoff,))
+        except (sqlite3.Error, OSError):
+            self.errors += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}